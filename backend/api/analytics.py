@@ -0,0 +1,97 @@
+"""
+API endpoints for the Optimization dashboard analytics
+"""
+
+import re
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from api.auth import require_permission
+from api.schemas import CurrencyValueQuery
+from database.database import get_db
+from services.analytics_rollups import DIMENSIONS, query_rollups
+from services.currency_values import TEMPLATE_DIMENSIONS, query_currency_values
+from services.rbac import Permission
+
+router = APIRouter()
+
+MONTH_PATTERN = re.compile(r"^\d{4}-\d{2}$")
+
+
+def _check_month(value: Optional[str], name: str):
+    if value is not None and not MONTH_PATTERN.match(value):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{name} must be YYYY-MM, got '{value}'"
+        )
+
+
+@router.get("/analytics/rollups",
+            dependencies=[Depends(require_permission(Permission.VIEW_OPTIMIZATION))])
+def get_rollups(
+    group_by: str = ",".join(DIMENSIONS),
+    from_month: Optional[str] = None,
+    to_month: Optional[str] = None,
+    provider: Optional[str] = None,
+    bonus_type: Optional[str] = None,
+    trigger_type: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Template count and average percentage, wagering multiplier and EUR
+    maximum amount per month/provider/bonus_type/trigger_type.
+
+    group_by: comma-separated subset of month, provider, bonus_type,
+    trigger_type (e.g. "month" for a monthly trend across providers).
+    Reads the pre-aggregated template_rollups table only.
+    """
+    dimensions = [d.strip() for d in group_by.split(",") if d.strip()]
+    unknown = [d for d in dimensions if d not in DIMENSIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown group_by: {', '.join(unknown)}. Use: {', '.join(DIMENSIONS)}"
+        )
+    _check_month(from_month, "from_month")
+    _check_month(to_month, "to_month")
+
+    rows = query_rollups(db, dimensions, from_month, to_month, provider=provider,
+                         bonus_type=bonus_type, trigger_type=trigger_type)
+    return {"group_by": [d for d in DIMENSIONS if d in dimensions], "rows": rows}
+
+
+# ============= PER-CURRENCY VALUES =============
+
+@router.post("/analytics/currency-values/query",
+             dependencies=[Depends(require_permission(Permission.VIEW_OPTIMIZATION))])
+def query_template_currency_values(query: CurrencyValueQuery, db: Session = Depends(get_db)):
+    """
+    Templates whose per-currency values match every filter, e.g.
+    {"bonus_type": "reload", "filters": [{"field": "maximum_amount",
+    "currency": "EUR", "op": "gt", "value": 300}]}, plus optional
+    aggregates (count/sum/avg/min/max) of one field/currency over them,
+    grouped by a template column.
+
+    Runs on the indexed template_currency_values table.
+    """
+    if not 1 <= query.limit <= 1000 or query.offset < 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="limit must be between 1 and 1000 and offset not negative"
+        )
+    try:
+        return query_currency_values(
+            db,
+            [item.dict() for item in query.filters],
+            {dimension: getattr(query, dimension) for dimension in TEMPLATE_DIMENSIONS},
+            aggregate=query.aggregate.dict() if query.aggregate else None,
+            limit=query.limit,
+            offset=query.offset,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid query: {e}"
+        )
@@ -10,6 +10,7 @@ import os
 from database.database import get_db
 from database.models import User
 from api.schemas import UserLogin, UserRegister, UserResponse, TokenResponse
+from services.rbac import Permission, has_permission
 
 router = APIRouter()
 
@@ -53,6 +54,18 @@ def require_auth(
     return user
 
 
+def require_permission(permission: Permission):
+    """Dependency factory: the authenticated user's role must grant `permission`"""
+    def dependency(user: User = Depends(require_auth)) -> User:
+        if not has_permission(user.role, permission):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Permission '{permission.value}' required",
+            )
+        return user
+    return dependency
+
+
 # Get JWT secret from environment or use default for development
 SECRET_KEY = os.getenv(
     "JWT_SECRET_KEY", "your-secret-key-change-in-production")
@@ -2,26 +2,113 @@
 API endpoints for Bonus Templates
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional, Dict, Any
 from datetime import datetime
+import hashlib
 import json as json_lib
+import logging
 import os
 
 from database.database import get_db
-from database.models import BonusTemplate, BonusTranslation
-from api.schemas import BonusTemplateCreate, BonusTemplateResponse, BonusTranslationCreate, BonusTranslationResponse, BonusJSONOutput
+from database.models import BonusTemplate, BonusTemplateCountry, BonusTemplateSegment, BonusTranslation, StableConfig
+from api.schemas import BonusTemplateCreate, BonusTemplateResponse, BonusTranslationCreate, BonusTranslationResponse, BonusJSONOutput, CampaignSeriesCreate
+from services.analytics_rollups import remove_template_rollup
+from services.bonus_sweep import maximum_withdraw_for_percentage
+from services.campaign_series import create_series, series_summary
+from services.locale_service import collect_texts, default_text, get_locale_resolver
 from services.json_generator import generate_bonus_json_with_currencies
+from services.currency_registry import get_currency_snapshot
+from services.conflict_service import find_series_conflicts, find_template_conflicts, get_conflict_index
+from services.duplicate_service import duplicate_report, duplicate_summary, find_duplicates, sync_content_hash
+from services.event_bus import get_event_bus, publish_template_event, template_month
+from services.pricing_lineage import validate_pricing_sources
+from services.proportions_resolver import normalize_proportions
+from services.proportions_sets import parse_proportions, proportions_fragment
+from services.schedule_service import parse_schedule_datetime, validate_schedule
+from services.template_sync import sync_template_derived
+from services.translation_memory import remember_translation
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# What PATCH may change: the create form's fields (everything else is derived)
+PATCHABLE_FIELDS = set(BonusTemplateCreate.model_fields) - {"id"}
+
+
+def _check_schedule(template: BonusTemplate):
+    """400 if the recurring schedule or trigger cron cannot be compiled"""
+    try:
+        validate_schedule(template.schedule_type,
+                          template.schedule_value, template.trigger_schedule)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid schedule: {e}"
+        )
+
+
+def _check_pricing_sources(template: BonusTemplate):
+    """400 if pricing_sources does not name a known table per priced field"""
+    try:
+        template.pricing_sources = validate_pricing_sources(
+            template.pricing_sources)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid pricing sources: {e}"
+        )
+
+
+def _check_proportions(template: BonusTemplate) -> List[str]:
+    """
+    Normalize newly given proportions (stripped keys, case/space duplicates
+    merged) and return warnings about them; 400 only for values that are not
+    0-100 numbers
+    """
+    entries = parse_proportions(template.proportions_inline)
+    if entries is None:
+        return []
+    try:
+        cleaned, warnings = normalize_proportions(entries)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid proportions: {e}"
+        )
+    if cleaned != entries:
+        template.proportions_inline = cleaned
+    return warnings
+
+
+def _check_conflicts(db: Session, template: BonusTemplate):
+    """409 if the template's window collides with another campaign (check_conflicts=true)"""
+    conflicts = find_template_conflicts(db, template)
+    if conflicts:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=jsonable_encoder({
+                "message": f"Template '{template.id}' overlaps {len(conflicts)} scheduled campaign(s)",
+                "conflicts": conflicts,
+            })
+        )
 
 
 # ============= BONUS TEMPLATES =============
 
 @router.post("/bonus-templates", response_model=BonusTemplateResponse, status_code=status.HTTP_201_CREATED)
-def create_bonus_template(template: BonusTemplateCreate, db: Session = Depends(get_db)):
-    """Create a new bonus template"""
+def create_bonus_template(template: BonusTemplateCreate, check_conflicts: bool = False,
+                          check_duplicates: bool = False, db: Session = Depends(get_db)):
+    """Create a new bonus template
+
+    With check_conflicts=true the template is rejected (409) when its schedule
+    window overlaps another template with the same trigger type and segments.
+    With check_duplicates=true it is still created, but duplicate_of lists the
+    templates with the same content (everything except id and dates).
+    """
 
     # Check if template with this ID already exists
     existing = db.query(BonusTemplate).filter(
@@ -38,9 +125,12 @@ def create_bonus_template(template: BonusTemplateCreate, db: Session = Depends(g
         schedule_type=template.schedule_type,
         schedule_from=template.schedule_from,
         schedule_to=template.schedule_to,
+        schedule_value=template.schedule_value,
+        schedule_timezone=template.schedule_timezone,
         trigger_type=template.trigger_type,
         trigger_iterations=template.trigger_iterations,
         trigger_duration=template.trigger_duration,
+        trigger_schedule=template.trigger_schedule,
         trigger_name=template.trigger_name,
         trigger_description=template.trigger_description,
         minimum_amount=template.minimum_amount,
@@ -69,16 +159,29 @@ def create_bonus_template(template: BonusTemplateCreate, db: Session = Depends(g
         expiry=template.expiry,
         config_extra=template.config_extra,
         notes=template.notes,
+        pricing_sources=template.pricing_sources,
     )
 
+    _check_schedule(db_template)
+    _check_pricing_sources(db_template)
+    warnings = _check_proportions(db_template)
+    sync_template_derived(db, db_template)
+    if check_conflicts:
+        _check_conflicts(db, db_template)
+    duplicates = find_duplicates(db, db_template) if check_duplicates else []
     db.add(db_template)
     db.commit()
     db.refresh(db_template)
+    publish_template_event("template.created", db_template)
+    if check_duplicates:
+        db_template.duplicate_of = [t.id for t in duplicates]
+    db_template.warnings = warnings or None
     return db_template
 
 
 @router.post("/bonus-templates/simple", status_code=status.HTTP_201_CREATED)
-def create_bonus_template_simple(payload: Dict[str, Any], db: Session = Depends(get_db)):
+def create_bonus_template_simple(payload: Dict[str, Any], check_conflicts: bool = False,
+                                 check_duplicates: bool = False, db: Session = Depends(get_db)):
     """Create a bonus template using simple JSON format (deposit form)
 
     Accepts the simplified format:
@@ -184,6 +287,7 @@ def create_bonus_template_simple(payload: Dict[str, Any], db: Session = Depends(
             provider=config.get("provider", "PRAGMATIC"),
             brand=config.get("brand", "PRAGMATIC"),
             bonus_type=config.get("type", "cost"),
+            pricing_sources=payload.get("pricing_sources"),
         )
 
         # Handle optional schedule
@@ -192,15 +296,24 @@ def create_bonus_template_simple(payload: Dict[str, Any], db: Session = Depends(
             db_template.schedule_from = schedule.get("from")
             db_template.schedule_to = schedule.get("to")
 
+        _check_pricing_sources(db_template)
+        sync_template_derived(db, db_template)
+        if check_conflicts:
+            _check_conflicts(db, db_template)
+        duplicates = find_duplicates(db, db_template) if check_duplicates else []
         db.add(db_template)
         db.commit()
         db.refresh(db_template)
+        publish_template_event("template.created", db_template)
 
-        return {
+        response = {
             "status": "created",
             "message": f"Bonus template '{template_id}' created successfully",
             "json_output": final_json
         }
+        if check_duplicates:
+            response["duplicate_of"] = [t.id for t in duplicates]
+        return response
 
     except HTTPException:
         raise
@@ -212,14 +325,102 @@ def create_bonus_template_simple(payload: Dict[str, Any], db: Session = Depends(
         )
 
 
+@router.post("/bonus-templates/{template_id}/series", status_code=status.HTTP_201_CREATED)
+def create_campaign_series(template_id: str, series: CampaignSeriesCreate, check_conflicts: bool = False,
+                           db: Session = Depends(get_db)):
+    """
+    Generate dated copies of a template from a recurrence rule, e.g. a year
+    of Monday reloads:
+    {"recurrence": {"start": "05-01-2026 10:00", "duration": "23h59m", "count": 52}}
+
+    Copies get ids from id_pattern, a period schedule per occurrence and the
+    template's translations with {date}/{date_to}/{n}/{week} filled in. All
+    are written in one transaction (nothing is created if any id exists:
+    409); the created campaigns are streamed back as JSON lines. A duration
+    longer than the gap between two starts is a 400 unless the recurrence
+    sets allow_overlap; check_conflicts=true also compares the copies with
+    each other.
+    """
+    base = db.query(BonusTemplate).filter(
+        BonusTemplate.id == template_id).first()
+    if not base:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Template '{template_id}' not found"
+        )
+
+    try:
+        copies = create_series(db, base, series.recurrence.dict(),
+                               series.id_pattern, series.date_format)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid series: {e}"
+        )
+    except LookupError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=jsonable_encoder({
+                "message": "Templates with these ids already exist",
+                "existing": e.args[0],
+            })
+        )
+    if check_conflicts:
+        conflicts = find_series_conflicts(db, copies)
+        if conflicts:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=jsonable_encoder({
+                    "message": f"{len({c['with_template_id'] for c in conflicts})} campaign(s) of the "
+                               "series overlap scheduled campaigns or each other",
+                    "conflicts": conflicts,
+                })
+            )
+    summaries = [series_summary(campaign) for campaign in copies]
+    db.commit()
+
+    for campaign in copies:
+        publish_template_event("template.created", campaign)
+
+    def stream():
+        for summary in summaries:
+            yield json_lib.dumps(summary, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(stream(), status_code=status.HTTP_201_CREATED,
+                             media_type="application/x-ndjson",
+                             headers={"X-Series-Count": str(len(summaries))})
+
+
 @router.get("/bonus-templates")
-def list_bonus_templates(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """List all bonus templates"""
-    templates = db.query(BonusTemplate).offset(skip).limit(limit).all()
+def list_bonus_templates(skip: int = 0, limit: int = 100, segment: Optional[str] = None,
+                         country: Optional[str] = None, db: Session = Depends(get_db)):
+    """List bonus templates
+
+    Parameters:
+    - segment: Only templates targeting this segment
+    - country: Only templates available in this country (not in restricted_countries)
+
+    Both filters use the bonus_template_segments/bonus_template_countries index tables.
+    """
+    query = db.query(BonusTemplate)
+    if segment:
+        query = query.filter(BonusTemplate.id.in_(
+            db.query(BonusTemplateSegment.template_id).filter(
+                BonusTemplateSegment.segment == segment)
+        ))
+    if country:
+        query = query.filter(~BonusTemplate.id.in_(
+            db.query(BonusTemplateCountry.template_id).filter(
+                BonusTemplateCountry.country == country.upper())
+        ))
+    templates = query.order_by(BonusTemplate.id).offset(skip).limit(limit).all()
     return [{"id": t.id, "provider": t.provider, "bonus_type": t.bonus_type, "created_at": t.created_at} for t in templates]
 
 
-@router.get("/bonus-templates/search")
+@router.get("/bonus-templates/search", response_model=List[BonusTemplateResponse])
 def search_bonus_template(query: str, db: Session = Depends(get_db)):
     """Search for bonus templates by ID (partial match), date, or other fields"""
     from sqlalchemy import or_, func
@@ -287,34 +488,236 @@ def search_bonus_template(query: str, db: Session = Depends(get_db)):
     return templates
 
 
+def _month_range(year: int, month: int):
+    """[start, end) datetimes of a calendar month, for index-friendly created_at filters"""
+    if not 1 <= month <= 12:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid month: {month}"
+        )
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return start, end
+
+
+def _template_summary(t: BonusTemplate) -> Dict[str, Any]:
+    return {"id": t.id, "provider": t.provider, "bonus_type": t.bonus_type, "created_at": t.created_at}
+
+
 @router.get("/bonus-templates/dates/{year}/{month}")
 def get_bonuses_by_month(year: int, month: int, skip: int = 0, limit: int = 50, db: Session = Depends(get_db)):
     """Get bonus templates created in a specific month with pagination"""
-    from sqlalchemy import desc, func
+    from sqlalchemy import desc
 
-    print(
-        f"[DEBUG] Fetching bonuses for {year}-{month}, skip={skip}, limit={limit}")
+    # Range predicate on created_at works the same on PostgreSQL and SQLite and uses the index
+    start, end = _month_range(year, month)
+    templates = db.query(BonusTemplate).filter(
+        BonusTemplate.created_at >= start,
+        BonusTemplate.created_at < end
+    ).order_by(desc(BonusTemplate.created_at)).offset(skip).limit(limit).all()
 
-    # PostgreSQL uses to_char, SQLite uses strftime
-    database_url = os.getenv("DATABASE_URL", "")
-    is_postgres = database_url.startswith("postgresql")
+    logger.debug("%d bonuses for %d-%02d (skip=%d, limit=%d)", len(templates), year, month, skip, limit)
+    return [_template_summary(t) for t in templates]
+
+
+@router.get("/bonus-templates/overview/{year}/{month}")
+def get_month_overview(year: int, month: int, limit: int = 50, db: Session = Depends(get_db)):
+    """
+    Faceted overview of a month for the calendar/browser views.
+
+    Counts per day, provider, bonus_type and trigger_type come from a single
+    GROUP BY over the indexed created_at range; the first page of summaries
+    (same shape as /dates/{year}/{month}) is included so the view needs no
+    further requests to render.
+    """
+    from sqlalchemy import desc, extract, func
+
+    start, end = _month_range(year, month)
+    in_month = [BonusTemplate.created_at >= start,
+                BonusTemplate.created_at < end]
+
+    day = extract("day", BonusTemplate.created_at)
+    rows = db.query(
+        day,
+        BonusTemplate.provider,
+        BonusTemplate.bonus_type,
+        BonusTemplate.trigger_type,
+        func.count(BonusTemplate.id),
+    ).filter(*in_month).group_by(
+        day, BonusTemplate.provider, BonusTemplate.bonus_type, BonusTemplate.trigger_type
+    ).all()
 
-    if is_postgres:
-        templates = db.query(BonusTemplate).filter(
-            func.to_char(
-                BonusTemplate.created_at, 'YYYY-MM') == f"{year:04d}-{month:02d}"
-        ).order_by(desc(BonusTemplate.created_at)).offset(skip).limit(limit).all()
+    # Roll the grouped combinations up into one facet per dimension
+    by_day: Dict[str, int] = {}
+    by_provider: Dict[str, int] = {}
+    by_bonus_type: Dict[str, int] = {}
+    by_trigger_type: Dict[str, int] = {}
+    total = 0
+    for day_value, provider, bonus_type, trigger_type, count in rows:
+        date_key = f"{year:04d}-{month:02d}-{int(day_value):02d}"
+        by_day[date_key] = by_day.get(date_key, 0) + count
+        by_provider[provider or "unset"] = by_provider.get(
+            provider or "unset", 0) + count
+        by_bonus_type[bonus_type or "unset"] = by_bonus_type.get(
+            bonus_type or "unset", 0) + count
+        by_trigger_type[trigger_type or "unset"] = by_trigger_type.get(
+            trigger_type or "unset", 0) + count
+        total += count
+
+    items = []
+    if total:
+        items = db.query(BonusTemplate).filter(*in_month).order_by(
+            desc(BonusTemplate.created_at)).limit(limit).all()
+
+    return {
+        "year": year,
+        "month": month,
+        "total": total,
+        "by_day": dict(sorted(by_day.items())),
+        "by_provider": by_provider,
+        "by_bonus_type": by_bonus_type,
+        "by_trigger_type": by_trigger_type,
+        "items": [_template_summary(t) for t in items],
+        "limit": limit,
+        "has_more": total > len(items),
+    }
+
+
+def _parse_query_datetime(value: str, param: str) -> datetime:
+    parsed = parse_schedule_datetime(value, "UTC")
+    if parsed is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid {param}: '{value}'. Use ISO 8601 or DD-MM-YYYY HH:MM"
+        )
+    return parsed
+
+
+@router.get("/bonus-templates/active")
+def get_active_bonuses(at: Optional[str] = None, between: Optional[str] = None,
+                       skip: int = 0, limit: int = 200, db: Session = Depends(get_db)):
+    """
+    Templates whose schedule window is live at a point in time or overlaps a range.
+
+    Parameters:
+    - at: Point in time (ISO 8601, or DD-MM-YYYY HH:MM in UTC). Defaults to now.
+    - between: "from,to" range; returns every window overlapping it.
+
+    Backed by the indexed schedule_from_at/schedule_to_at columns.
+    """
+    if at and between:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either 'at' or 'between', not both"
+        )
+
+    if between:
+        parts = [p.strip() for p in between.split(",")]
+        if len(parts) != 2:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="'between' must be 'from,to'"
+            )
+        range_from = _parse_query_datetime(parts[0], "between")
+        range_to = _parse_query_datetime(parts[1], "between")
+        if range_to < range_from:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="'between' end is before its start"
+            )
     else:
-        templates = db.query(BonusTemplate).filter(
-            func.strftime(
-                '%Y-%m', BonusTemplate.created_at) == f"{year:04d}-{month:02d}"
-        ).order_by(desc(BonusTemplate.created_at)).offset(skip).limit(limit).all()
+        range_from = range_to = _parse_query_datetime(
+            at, "at") if at else datetime.utcnow()
+
+    # Window [from, to] overlaps [range_from, range_to]
+    templates = db.query(BonusTemplate).filter(
+        BonusTemplate.schedule_from_at <= range_to,
+        BonusTemplate.schedule_to_at >= range_from
+    ).order_by(BonusTemplate.schedule_from_at, BonusTemplate.id).offset(skip).limit(limit).all()
+
+    return {
+        "from": range_from,
+        "to": range_to,
+        "count": len(templates),
+        "items": [
+            {
+                **_template_summary(t),
+                "trigger_type": t.trigger_type,
+                "schedule_from": t.schedule_from,
+                "schedule_to": t.schedule_to,
+                "schedule_from_at": t.schedule_from_at,
+                "schedule_to_at": t.schedule_to_at,
+            }
+            for t in templates
+        ],
+    }
 
-    print(f"[DEBUG] Found {len(templates)} bonuses")
-    return [{"id": t.id, "provider": t.provider, "bonus_type": t.bonus_type, "created_at": t.created_at} for t in templates]
 
+@router.get("/bonus-templates/conflicts")
+def get_conflict_report(trigger_type: Optional[str] = None, db: Session = Depends(get_db)):
+    """
+    Every pair of templates whose schedule windows collide (same trigger type,
+    overlapping segments). Each entry names both templates, the overlapping
+    window and the countries excluded by either of them.
+    """
+    pairs = get_conflict_index(db).report()
+    if trigger_type:
+        pairs = [p for p in pairs if p["trigger_type"] == trigger_type]
+    return {"count": len(pairs), "conflicts": pairs}
 
-@router.get("/bonus-templates/{template_id}")
+
+@router.get("/bonus-templates/duplicates")
+def get_duplicate_report(provider: Optional[str] = None, bonus_type: Optional[str] = None,
+                         trigger_type: Optional[str] = None, skip: int = 0, limit: int = 100,
+                         db: Session = Depends(get_db)):
+    """
+    Groups of templates with identical content (trigger, config and
+    translations, ignoring id and dates), largest groups first.
+    """
+    return duplicate_report(db, limit=limit, offset=skip, provider=provider,
+                            bonus_type=bonus_type, trigger_type=trigger_type)
+
+
+@router.get("/bonus-templates/{template_id}/duplicates")
+def get_template_duplicates(template_id: str, db: Session = Depends(get_db)):
+    """Templates with the same content as this one"""
+    template = db.query(BonusTemplate).filter(
+        BonusTemplate.id == template_id).first()
+    if not template:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Template '{template_id}' not found"
+        )
+    duplicates = find_duplicates(db, template)
+    return {
+        "template_id": template.id,
+        "content_hash": template.content_hash,
+        "count": len(duplicates),
+        "duplicates": [duplicate_summary(t) for t in duplicates],
+    }
+
+
+@router.get("/bonus-templates/{template_id}/conflicts")
+def get_template_conflicts(template_id: str, db: Session = Depends(get_db)):
+    """Templates whose schedule windows collide with this one"""
+    template = db.query(BonusTemplate).filter(
+        BonusTemplate.id == template_id).first()
+    if not template:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Template '{template_id}' not found"
+        )
+    conflicts = find_template_conflicts(db, template)
+    return {
+        "template_id": template.id,
+        "schedule_from_at": template.schedule_from_at,
+        "schedule_to_at": template.schedule_to_at,
+        "count": len(conflicts),
+        "conflicts": conflicts,
+    }
+
+
+@router.get("/bonus-templates/{template_id}", response_model=BonusTemplateResponse)
 def get_bonus_template(template_id: str, db: Session = Depends(get_db)):
     """Get a specific bonus template"""
     template = db.query(BonusTemplate).filter(
@@ -328,8 +731,15 @@ def get_bonus_template(template_id: str, db: Session = Depends(get_db)):
 
 
 @router.patch("/bonus-templates/{template_id}", response_model=BonusTemplateResponse)
-def patch_bonus_template(template_id: str, template_patch: dict, db: Session = Depends(get_db)):
-    """Partially update a bonus template"""
+def patch_bonus_template(template_id: str, template_patch: dict, check_conflicts: bool = False, db: Session = Depends(get_db)):
+    """
+    Partially update a bonus template.
+
+    Only the fields of the create form can be changed; derived and internal
+    columns (schedule_*_at, rollup_contribution, content_hash,
+    proportions_set_id, ...) are recomputed from them and rejected with 400.
+    Fields the template does not have are ignored.
+    """
     template = db.query(BonusTemplate).filter(
         BonusTemplate.id == template_id).first()
     if not template:
@@ -338,19 +748,35 @@ def patch_bonus_template(template_id: str, template_patch: dict, db: Session = D
             detail=f"Template '{template_id}' not found"
         )
 
+    protected = [field for field in template_patch
+                 if field not in PATCHABLE_FIELDS and hasattr(template, field)]
+    if protected:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Fields cannot be patched: {', '.join(protected)}"
+        )
+
     # Update only provided fields
     for field, value in template_patch.items():
-        if hasattr(template, field):
+        if field in PATCHABLE_FIELDS:
             setattr(template, field, value)
 
     template.updated_at = datetime.utcnow()
+    _check_schedule(template)
+    _check_pricing_sources(template)
+    warnings = _check_proportions(template)
+    sync_template_derived(db, template)
+    if check_conflicts:
+        _check_conflicts(db, template)
     db.commit()
     db.refresh(template)
+    publish_template_event("template.updated", template)
+    template.warnings = warnings or None
     return template
 
 
 @router.put("/bonus-templates/{template_id}", response_model=BonusTemplateResponse)
-def update_bonus_template(template_id: str, template_update: BonusTemplateCreate, db: Session = Depends(get_db)):
+def update_bonus_template(template_id: str, template_update: BonusTemplateCreate, check_conflicts: bool = False, db: Session = Depends(get_db)):
     """Update a bonus template"""
     template = db.query(BonusTemplate).filter(
         BonusTemplate.id == template_id).first()
@@ -365,8 +791,16 @@ def update_bonus_template(template_id: str, template_update: BonusTemplateCreate
         setattr(template, field, value)
 
     template.updated_at = datetime.utcnow()
+    _check_schedule(template)
+    _check_pricing_sources(template)
+    warnings = _check_proportions(template)
+    sync_template_derived(db, template)
+    if check_conflicts:
+        _check_conflicts(db, template)
     db.commit()
     db.refresh(template)
+    publish_template_event("template.updated", template)
+    template.warnings = warnings or None
     return template
 
 
@@ -381,8 +815,12 @@ def delete_bonus_template(template_id: str, db: Session = Depends(get_db)):
             detail=f"Template '{template_id}' not found"
         )
 
+    event_fields = {"template_id": template.id, "provider": template.provider,
+                    "month": template_month(template)}
+    remove_template_rollup(db, template)
     db.delete(template)
     db.commit()
+    get_event_bus().publish("template.deleted", **event_fields)
     return None
 
 
@@ -419,8 +857,12 @@ def add_translation(template_id: str, translation: BonusTranslationCreate, db: S
         existing_translation.name = translation.name
         existing_translation.description = translation.description
         existing_translation.currency = translation.currency
+        remember_translation(db, existing_translation)
+        sync_content_hash(template)
         db.commit()
         db.refresh(existing_translation)
+        publish_template_event("translation.saved", template,
+                               language=translation.language)
         print(f"[DEBUG] Updated translation: {existing_translation.name}")
         return existing_translation
     else:
@@ -433,10 +875,14 @@ def add_translation(template_id: str, translation: BonusTranslationCreate, db: S
             name=translation.name,
             description=translation.description,
         )
+        remember_translation(db, db_translation)
+        sync_content_hash(template, [*template.translations, db_translation])
 
         db.add(db_translation)
         db.commit()
         db.refresh(db_translation)
+        publish_template_event("translation.saved", template,
+                               language=translation.language)
         print(f"[DEBUG] Created translation: {db_translation.name}")
         return db_translation
 
@@ -478,8 +924,13 @@ def delete_translation(template_id: str, language: str, db: Session = Depends(ge
     ).first()
 
     if translation:
+        template = translation.template
+        sync_content_hash(
+            template, [t for t in template.translations if t is not translation])
         db.delete(translation)
         db.commit()
+        publish_template_event("translation.deleted",
+                               template, language=language)
         print(f"[DEBUG] Deleted translation for {language}")
     else:
         print(f"[DEBUG] Translation for {language} not found")
@@ -487,6 +938,47 @@ def delete_translation(template_id: str, language: str, db: Session = Depends(ge
     return None
 
 
+@router.get("/bonus-templates/{template_id}/resolved")
+def get_resolved_translations(template_id: str, locale: Optional[str] = None, db: Session = Depends(get_db)):
+    """
+    Translated name/description after locale fallback (GBP_en -> en -> *).
+
+    With ?locale=GBP_en returns that locale's texts and where each came from;
+    without it returns fully resolved maps for every known locale.
+    """
+    template = db.query(BonusTemplate).filter(
+        BonusTemplate.id == template_id).first()
+    if not template:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Template '{template_id}' not found"
+        )
+
+    translations = db.query(BonusTranslation).filter(
+        BonusTranslation.template_id == template_id).all()
+    names, descriptions = collect_texts(translations)
+    resolver = get_locale_resolver(db)
+
+    if locale:
+        name, name_source = resolver.resolve(names, locale)
+        description, description_source = resolver.resolve(descriptions, locale)
+        return {
+            "template_id": template_id,
+            "locale": locale,
+            "chain": list(resolver.chain(locale)),
+            "name": name,
+            "name_source": name_source,
+            "description": description,
+            "description_source": description_source,
+        }
+
+    return {
+        "template_id": template_id,
+        "name": resolver.resolve_all(names),
+        "description": resolver.resolve_all(descriptions),
+    }
+
+
 # ============= JSON GENERATION =============
 
 @router.get("/bonus-templates/{template_id}/json")
@@ -504,24 +996,34 @@ def generate_template_json(template_id: str, db: Session = Depends(get_db)):
         )
 
     # Fetch admin config to get maximumWithdraw in proper format
-    from database.models import StableConfig
     admin_config = db.query(StableConfig).filter(
         StableConfig.provider == template.provider
     ).first()
 
+    # Fetch translations for this template
+    translations = db.query(BonusTranslation).filter(
+        BonusTranslation.template_id == template_id
+    ).all()
+
+    json_str = build_template_json(template, translations, admin_config)
+
+    return Response(content=json_str, media_type="application/json")
+
+
+def build_template_json(template: BonusTemplate, translations: List[BonusTranslation],
+                        admin_config: Optional[StableConfig]) -> str:
+    """
+    Render the final bonus JSON string from already-loaded rows.
+    Shared by the /json endpoint and the bundle endpoint so both stay byte-identical.
+    """
+
     # Build maximumWithdraw format based on bonus type
     # For reload bonuses: use flat numbers (no "cap" wrapper)
     # For other bonuses: use nested format with "cap"
     maximum_withdraw_formatted = {}
 
-    print(f"DEBUG: template.maximum_withdraw = {template.maximum_withdraw}")
-    print(
-        f"DEBUG: template.maximum_withdraw type = {type(template.maximum_withdraw)}")
-    print(f"DEBUG: template.bonus_type = {template.bonus_type}")
-
     if template.maximum_withdraw:
         stored_data = template.maximum_withdraw
-        print(f"DEBUG: Using stored data: {stored_data}")
         # If stored as flat dict/JSON, convert based on bonus type
         if isinstance(stored_data, dict):
             for curr, val in stored_data.items():
@@ -542,7 +1044,6 @@ def generate_template_json(template_id: str, db: Session = Depends(get_db)):
                         maximum_withdraw_formatted[curr] = {"cap": val}
     # Fallback to admin config if stored data is empty
     elif admin_config and admin_config.maximum_withdraw:
-        print(f"DEBUG: Using admin config data")
         # Admin stores it as list of dicts with currency and cap
         for item in admin_config.maximum_withdraw:
             if isinstance(item, dict):
@@ -556,35 +1057,17 @@ def generate_template_json(template_id: str, db: Session = Depends(get_db)):
                         # Nested format for other bonuses
                         maximum_withdraw_formatted[currency] = {"cap": cap}
 
-    print(
-        f"DEBUG: Final maximum_withdraw_formatted = {maximum_withdraw_formatted}")
-
-    # Fetch translations for this template
-    translations = db.query(BonusTranslation).filter(
-        BonusTranslation.template_id == template_id
-    ).all()
+    logger.debug("%s: maximumWithdraw %s", template.id, maximum_withdraw_formatted)
 
     # Build multilingual name and description from translations
-    trigger_name = {}
-    trigger_description = {}
-
-    for translation in translations:
-        if translation.language:
-            if translation.name:
-                trigger_name[translation.language] = translation.name
-            if translation.description:
-                trigger_description[translation.language] = translation.description
-
-    # Set "*" (default) to English or first available translation
-    if "en" in trigger_name:
-        trigger_name["*"] = trigger_name["en"]
-    elif trigger_name:
-        trigger_name["*"] = next(iter(trigger_name.values()))
-
-    if "en" in trigger_description:
-        trigger_description["*"] = trigger_description["en"]
-    elif trigger_description:
-        trigger_description["*"] = next(iter(trigger_description.values()))
+    # (currency-variant rows keep their variant key, e.g. GBP_en)
+    trigger_name, trigger_description = collect_texts(translations)
+
+    # Set "*" (default): explicit "*", then English, then LANGUAGES order
+    for texts in (trigger_name, trigger_description):
+        default = default_text(texts)
+        if default:
+            texts["*"] = default
 
     # Build the full JSON from stored data with correct field ordering
     # Structure: 1) id 2) schedule 3) trigger 4) config 5) type
@@ -592,11 +1075,6 @@ def generate_template_json(template_id: str, db: Session = Depends(get_db)):
         "id": template.id,
     }
 
-    # DEBUG: Check schedule fields
-    print(f"DEBUG: template.schedule_from = {template.schedule_from}")
-    print(f"DEBUG: template.schedule_to = {template.schedule_to}")
-    print(f"DEBUG: template.schedule_type = {template.schedule_type}")
-
     # Add schedule right after id if it exists
     if template.schedule_from and template.schedule_to:
         json_output["schedule"] = {
@@ -604,10 +1082,9 @@ def generate_template_json(template_id: str, db: Session = Depends(get_db)):
             "from": template.schedule_from,
             "to": template.schedule_to
         }
-        print(f"DEBUG: Added schedule to JSON: {json_output['schedule']}")
     else:
-        print(
-            f"DEBUG: Schedule NOT added - schedule_from: {bool(template.schedule_from)}, schedule_to: {bool(template.schedule_to)}")
+        logger.debug("%s: no schedule (from=%r, to=%r)", template.id,
+                     template.schedule_from, template.schedule_to)
 
     # Add trigger section
     json_output["trigger"] = {}
@@ -642,31 +1119,8 @@ def generate_template_json(template_id: str, db: Session = Depends(get_db)):
         "game": template.game if template.game else template.bonus_type,
     }
 
-    # Fetch proportions if present (stored as separate DB field now)
-    proportions_text = None
-
-    if template.proportions:
-        import json as json_parser
-        try:
-            # Proportions can be dict or string (JSON)
-            if isinstance(template.proportions, str):
-                proportions_obj = json_parser.loads(template.proportions)
-            else:
-                proportions_obj = template.proportions
-
-            # Convert proportions object to JSON string format
-            if isinstance(proportions_obj, dict):
-                proportions_items = []
-                for key, value in proportions_obj.items():
-                    proportions_items.append(f'"{key}": {value}')
-                if proportions_items:
-                    proportions_text = ', '.join(proportions_items)
-                    print(
-                        f"✅ Loaded proportions from template field: {len(proportions_items)} items")
-        except Exception as e:
-            print(f"❌ ERROR parsing proportions: {e}")
-            import traceback
-            traceback.print_exc()
+    # Proportions: pre-serialized fragment of the shared set (cached per process)
+    proportions_text = proportions_fragment(template)
 
     if template.config_extra:
         import json as json_parser
@@ -679,14 +1133,10 @@ def generate_template_json(template_id: str, db: Session = Depends(get_db)):
             # Get game name from config_extra if it exists
             if config_extra_parsed.get('game'):
                 extra_data["game"] = config_extra_parsed.get('game')
-        except Exception as e:
-            print(f"ERROR parsing config_extra: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("%s: cannot parse config_extra", template.id)
 
     # Build the config section manually as a string
-    import json as json_lib
-
     # Build config JSON manually with correct field ordering
     # to ensure compensateOverspending always comes before maximumAmount
     config_json = '{\n'
@@ -785,24 +1235,13 @@ def generate_template_json(template_id: str, db: Session = Depends(get_db)):
     else:
         # Reload/Cashback: calculate based on percentage tiers
         if template.percentage:
-            # Percentage to multiplier mapping
-            if template.percentage >= 200:
-                multiplier = 3
-            elif template.percentage >= 150:
-                multiplier = 6
-            elif template.percentage >= 120:
-                multiplier = 8
-            elif template.percentage >= 100:
-                multiplier = 10
-            else:  # 25-99
-                multiplier = 12
+            # Percentage to multiplier mapping (200%+ -> 3 ... 25-99% -> 12)
+            multiplier = maximum_withdraw_for_percentage(template.percentage)
 
             calculated_withdraw = {}
 
             # Create withdraw object with the multiplier for all currencies
-            for currency in ['EUR', 'USD', 'CAD', 'AUD', 'NZD', 'BRL', 'NOK', 'PEN',
-                             'CLP', 'MXN', 'GBP', 'CHF', 'ZAR', 'PLN', 'JPY', 'AZN',
-                             'TRY', 'KZT', 'RUB', 'UZS', '*']:
+            for currency in [*get_currency_snapshot().currencies, '*']:
                 calculated_withdraw[currency] = multiplier
 
             if calculated_withdraw:
@@ -856,7 +1295,6 @@ def generate_template_json(template_id: str, db: Session = Depends(get_db)):
         json_str += '  "schedule": ' + \
             json_lib.dumps(json_output["schedule"], indent=2).replace(
                 '\n', '\n  ') + ',\n'
-        print(f"DEBUG: Schedule added to JSON string")
 
     json_str += '  "trigger": ' + \
         json_lib.dumps(json_output["trigger"], indent=2).replace(
@@ -865,5 +1303,111 @@ def generate_template_json(template_id: str, db: Session = Depends(get_db)):
     json_str += '  "type": "bonus_template"\n'
     json_str += '}'
 
-    from fastapi.responses import Response
-    return Response(content=json_str, media_type="application/json")
+    return json_str
+
+
+# ============= BUNDLE =============
+
+BUNDLE_SECTIONS = ["template", "translations", "json", "stable_config"]
+
+STABLE_CONFIG_TABLE_FIELDS = [
+    "cost", "maximum_amount", "minimum_amount", "currency_unit",
+    "minimum_stake_to_wager", "maximum_stake_to_wager", "maximum_withdraw",
+    "casino_proportions", "live_casino_proportions",
+]
+
+
+def _template_to_dict(template: BonusTemplate) -> Dict[str, Any]:
+    """Plain dict of a template, same fields as GET /bonus-templates/{id}"""
+    return BonusTemplateResponse.model_validate(template).model_dump()
+
+
+def _stable_config_tables(config: Optional[StableConfig]) -> Optional[Dict[str, Any]]:
+    if not config:
+        return None
+    tables = {"id": config.id, "provider": config.provider,
+              "updated_at": config.updated_at}
+    for field in STABLE_CONFIG_TABLE_FIELDS:
+        tables[field] = getattr(config, field) or (
+            "" if field.endswith("proportions") else [])
+    return tables
+
+
+@router.get("/bonus-templates/{template_id}/bundle")
+def get_bonus_template_bundle(template_id: str, request: Request, include: Optional[str] = None, db: Session = Depends(get_db)):
+    """
+    Get everything a bonus screen needs in one round trip.
+
+    Returns the template, its translations, the rendered JSON and the provider +
+    DEFAULT StableConfig tables, loaded with at most two queries. The response
+    carries an ETag; send it back as If-None-Match to get a 304 when nothing changed.
+
+    Parameters:
+    - include: Optional comma-separated sections (template, translations, json, stable_config).
+               Defaults to all sections.
+    """
+    if include:
+        sections = [s.strip() for s in include.split(",") if s.strip()]
+        unknown = [s for s in sections if s not in BUNDLE_SECTIONS]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown include section(s): {', '.join(unknown)}. "
+                       f"Valid sections: {', '.join(BUNDLE_SECTIONS)}"
+            )
+    else:
+        sections = list(BUNDLE_SECTIONS)
+
+    # Query 1: template + translations + proportions set in a single joined load
+    query = db.query(BonusTemplate).filter(BonusTemplate.id == template_id)
+    if "translations" in sections or "json" in sections:
+        query = query.options(joinedload(BonusTemplate.translations))
+    if "template" in sections or "json" in sections:
+        query = query.options(joinedload(BonusTemplate.proportions_set))
+    template = query.first()
+
+    if not template:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Template '{template_id}' not found"
+        )
+
+    # Query 2: provider + DEFAULT pricing rows together
+    provider_config = None
+    default_config = None
+    if "json" in sections or "stable_config" in sections:
+        providers = [template.provider, "DEFAULT"] if template.provider else [
+            "DEFAULT"]
+        for config in db.query(StableConfig).filter(StableConfig.provider.in_(providers)).all():
+            if config.provider == "DEFAULT":
+                default_config = config
+            if config.provider == template.provider:
+                provider_config = config
+
+    bundle: Dict[str, Any] = {"id": template.id}
+    if "template" in sections:
+        bundle["template"] = _template_to_dict(template)
+    if "translations" in sections:
+        bundle["translations"] = [
+            BonusTranslationResponse.model_validate(t).model_dump() for t in template.translations
+        ]
+    if "json" in sections:
+        bundle["json"] = json_lib.loads(build_template_json(
+            template, template.translations, provider_config))
+    if "stable_config" in sections:
+        bundle["stable_config"] = {
+            "provider": _stable_config_tables(provider_config),
+            "default": _stable_config_tables(default_config),
+        }
+
+    content = jsonable_encoder(bundle)
+    etag = '"' + hashlib.sha256(
+        json_lib.dumps(content, sort_keys=True, separators=(",", ":")).encode()
+    ).hexdigest()[:32] + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return JSONResponse(content=content, headers=headers)
@@ -0,0 +1,115 @@
+"""
+API endpoints for the currency reference data (rates, deposit limits, rounding)
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from api.auth import require_permission
+from api.schemas import CurrencyConvertRequest, CurrencyReferenceCreate, CurrencyReferenceResponse
+from database.database import get_db
+from database.models import CurrencyReference
+from services.currency_registry import get_currency_snapshot, reload_currency_snapshot
+from services.rbac import Permission
+
+router = APIRouter()
+
+
+@router.get("/currencies")
+def get_currencies(db: Session = Depends(get_db)):
+    """Currencies and rates of the snapshot currently used for conversions"""
+    return get_currency_snapshot(db).as_dict()
+
+
+@router.put("/currencies/{currency}", response_model=CurrencyReferenceResponse,
+            dependencies=[Depends(require_permission(Permission.MANAGE_PRICING_TABLES))])
+def upsert_currency(currency: str, reference: CurrencyReferenceCreate, db: Session = Depends(get_db)):
+    """
+    Create or update one currency reference row and reload the snapshot.
+    Other workers pick the change up within RELOAD_CHECK_SECONDS.
+    """
+    code = currency.upper()
+    if reference.currency.upper() != code:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Body currency '{reference.currency}' does not match '{code}'"
+        )
+    if reference.eur_rate <= 0 or (reference.rounding_step is not None and reference.rounding_step <= 0):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="eur_rate and rounding_step must be positive"
+        )
+
+    row = db.query(CurrencyReference).filter(
+        CurrencyReference.currency == code).first()
+    if row is None:
+        row = CurrencyReference(currency=code)
+        db.add(row)
+    row.eur_rate = reference.eur_rate
+    row.min_deposit = reference.min_deposit
+    row.max_deposit = reference.max_deposit
+    row.rounding_step = reference.rounding_step or 1.0
+    db.commit()
+    db.refresh(row)
+
+    reload_currency_snapshot(db)
+    return row
+
+
+@router.post("/currencies/reload",
+             dependencies=[Depends(require_permission(Permission.MANAGE_PRICING_TABLES))])
+def reload_currencies(db: Session = Depends(get_db)):
+    """Rebuild the rate snapshot from currency_references now (no restart needed)"""
+    snapshot = reload_currency_snapshot(db)
+    return {
+        "status": "reloaded",
+        "version": snapshot.version,
+        "source": snapshot.source,
+        "currencies": len(snapshot.currencies),
+    }
+
+
+# Largest batch one request may convert (rows x fields)
+MAX_CONVERT_CELLS = 500_000
+
+
+@router.post("/currencies/convert")
+def convert_batch(request: CurrencyConvertRequest, db: Session = Depends(get_db)):
+    """
+    Convert many EUR amounts into every currency in one call.
+
+    rows is a templates x fields matrix (null = missing value); the answer
+    has one {field: {currency: amount}} object per row, rounded per currency,
+    with clamp_fields clamped to each currency's deposit limits.
+    """
+    snapshot = get_currency_snapshot(db)
+    unknown = [f for f in request.clamp_fields or [] if f not in request.fields]
+    unknown += [c for c in request.currencies or [] if c not in snapshot]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields/currencies: {', '.join(unknown)}"
+        )
+    if any(len(row) != len(request.fields) for row in request.rows):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Every row needs {len(request.fields)} values"
+        )
+    if len(request.rows) * max(len(request.fields), 1) > MAX_CONVERT_CELLS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch too large (max {MAX_CONVERT_CELLS} cells)"
+        )
+
+    results = []
+    if request.rows:
+        matrix = [[float("nan") if v is None else v for v in row] for row in request.rows]
+        clamp = [field in (request.clamp_fields or []) for field in request.fields]
+        converted = snapshot.convert_matrix(
+            matrix, clamp_fields=clamp, currencies=request.currencies)
+        results = snapshot.matrix_to_dicts(converted, request.fields, request.currencies)
+    return {
+        "version": snapshot.version,
+        "currencies": list(request.currencies or snapshot.currencies),
+        "results": results,
+    }
@@ -0,0 +1,80 @@
+"""
+Server-sent events stream of template, translation and stable-config changes
+"""
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+import asyncio
+import json
+
+from database.database import get_db
+from services.event_bus import get_event_bus
+
+router = APIRouter()
+
+HEARTBEAT_SECONDS = 15
+
+
+def format_sse(event: dict) -> str:
+    """Encode one change event as an SSE frame"""
+    return (
+        f"id: {event['id']}\n"
+        f"event: {event['type']}\n"
+        f"data: {json.dumps(event, default=str, separators=(',', ':'))}\n\n"
+    )
+
+
+@router.get("/events")
+def stream_events(
+    request: Request,
+    month: Optional[str] = None,
+    provider: Optional[str] = None,
+    template_id: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Stream change notifications as server-sent events.
+
+    Event types: template.created, template.updated, template.deleted,
+    translation.saved, translation.deleted, stable_config.updated.
+
+    Parameters:
+    - month: Only events for templates created in this month (YYYY-MM)
+    - provider: Only events for this provider
+    - template_id: Only events for this template
+    """
+    # The auth dependency used this session; release its connection now
+    # instead of holding it for the lifetime of the stream
+    db.close()
+
+    bus = get_event_bus()
+
+    async def event_stream():
+        subscription = bus.subscribe(
+            month=month, provider=provider, template_id=template_id)
+        try:
+            yield "retry: 5000\n: connected\n\n"
+            while True:
+                if await request.is_disconnected():
+                    break
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event)
+        finally:
+            bus.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            # Keeps GZipMiddleware from buffering the stream
+            "Content-Encoding": "identity",
+        },
+    )
@@ -0,0 +1,114 @@
+"""
+API endpoints for background jobs (progress, cancel) and re-pricing runs
+"""
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import timezone
+
+from api.auth import require_auth, require_permission
+from api.schemas import RepricingJobCreate
+from database.database import get_db
+from database.models import BackgroundJob, User
+from services.jobs import FINISHED_STATUSES, create_job, job_to_dict, run_job
+from services.rbac import Permission, has_permission
+from services.repricing import REPRICE_FIELDS, run_repricing
+
+router = APIRouter()
+
+# Permission needed to cancel a job: the one its start endpoint requires
+JOB_PERMISSIONS = {
+    "repricing": Permission.MANAGE_PRICING_TABLES,
+    "bonus_sweep": Permission.RUN_OPTIMIZATION,
+}
+
+
+def _get_job(db: Session, job_id: int) -> BackgroundJob:
+    job = db.get(BackgroundJob, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job {job_id} not found"
+        )
+    return job
+
+
+@router.get("/jobs")
+def list_jobs(kind: Optional[str] = None, limit: int = 50, db: Session = Depends(get_db)):
+    """Most recent jobs first (results omitted; fetch a job for its result)"""
+    query = db.query(BackgroundJob)
+    if kind:
+        query = query.filter(BackgroundJob.kind == kind)
+    jobs = query.order_by(BackgroundJob.id.desc()).limit(limit).all()
+    return [job_to_dict(job, include_result=False) for job in jobs]
+
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    """Status, progress and (once finished) result of a job"""
+    return job_to_dict(_get_job(db, job_id))
+
+
+@router.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: int, user: User = Depends(require_auth), db: Session = Depends(get_db)):
+    """
+    Ask a job to stop; it stops at its next progress checkpoint. Needs the
+    permission that starting a job of that kind needs.
+    """
+    job = _get_job(db, job_id)
+    permission = JOB_PERMISSIONS.get(job.kind, Permission.VIEW_ADMIN_PANEL)
+    if not has_permission(user.role, permission):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Permission '{permission.value}' required",
+        )
+    if job.status in FINISHED_STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job {job_id} already {job.status}"
+        )
+    job.cancel_requested = True
+    db.commit()
+    return job_to_dict(job, include_result=False)
+
+
+# ============= REPRICING =============
+
+@router.post("/repricing/jobs", status_code=status.HTTP_202_ACCEPTED)
+def start_repricing(
+    request: RepricingJobCreate,
+    background_tasks: BackgroundTasks,
+    user: User = Depends(require_permission(Permission.MANAGE_PRICING_TABLES)),
+    db: Session = Depends(get_db),
+):
+    """
+    Recompute per-currency template fields from their EUR values with the
+    current rates, for templates still running or scheduled after `since`.
+    Fields copied from a pricing table (pricing_sources) are refreshed from
+    that table's current values instead.
+
+    dry_run (default) only records the diff in the job result; otherwise the
+    templates are rewritten in chunks. Poll GET /jobs/{id} for progress.
+    """
+    known = [name for name, _, _ in REPRICE_FIELDS]
+    unknown = [f for f in request.fields or [] if f not in known]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}. Use: {', '.join(known)}"
+        )
+
+    since = request.since
+    if since is not None and since.tzinfo is not None:
+        # schedule windows are stored as naive UTC
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+
+    job = create_job(db, "repricing", {
+        "provider": request.provider.upper() if request.provider else None,
+        "since": since.isoformat() if since else None,
+        "fields": request.fields,
+        "dry_run": request.dry_run,
+    }, created_by=user.username)
+    background_tasks.add_task(run_job, job.id, run_repricing)
+    return job_to_dict(job)
@@ -0,0 +1,115 @@
+"""
+API endpoints for the Optimization Team (bonus cost simulation, parameter sweeps)
+"""
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from api.auth import require_permission
+from api.schemas import SimulationRequest, SweepJobCreate
+from database.database import get_db
+from database.models import BonusTemplate, User
+from services.bonus_simulator import (
+    cache_key, cached_simulation, simulate_template, store_simulation, template_version,
+)
+from services.bonus_sweep import MAX_SWEEP_SAMPLES, run_sweep, sweep_grid
+from services.currency_registry import get_currency_snapshot
+from services.jobs import create_job, job_to_dict, run_job
+from services.rbac import Permission
+
+router = APIRouter()
+
+
+@router.post("/optimization/simulate",
+             dependencies=[Depends(require_permission(Permission.RUN_OPTIMIZATION))])
+def simulate_bonus_cost(request: SimulationRequest, db: Session = Depends(get_db)):
+    """
+    Monte Carlo estimate of a template's expected cost, completion rate and
+    payout distribution per currency.
+
+    Results are cached per template version (a save invalidates them) and
+    request parameters; the same seed always gives the same result.
+    """
+    template = db.get(BonusTemplate, request.template_id)
+    if not template:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Template '{request.template_id}' not found"
+        )
+
+    version = template_version(template)
+    params = request.dict(exclude={"template_id"})
+    key = cache_key(version, rates_version=get_currency_snapshot(db).version, **params)
+    cached = cached_simulation(key)
+    if cached is not None:
+        return {**cached, "cached": True}
+
+    terms = {column.name: getattr(template, column.name)
+             for column in BonusTemplate.__table__.columns}
+    # Stored as a shared set, not a column
+    terms["proportions"] = template.proportions
+    unknown = [name for name in request.overrides or {} if name not in terms]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown template fields in overrides: {', '.join(unknown)}"
+        )
+    terms.update(request.overrides or {})
+
+    try:
+        result = simulate_template(
+            terms,
+            currencies=[c.upper() for c in request.currencies or []] or None,
+            samples=request.samples,
+            seed=request.seed,
+            behaviour=request.behaviour,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid simulation: {e}"
+        )
+
+    result = {"template_id": template.id, "template_version": version, **result}
+    store_simulation(key, result)
+    return {**result, "cached": False}
+
+
+# ============= PARAMETER SWEEPS =============
+
+@router.post("/optimization/sweeps", status_code=status.HTTP_202_ACCEPTED)
+def start_sweep(
+    request: SweepJobCreate,
+    background_tasks: BackgroundTasks,
+    user: User = Depends(require_permission(Permission.RUN_OPTIMIZATION)),
+    db: Session = Depends(get_db),
+):
+    """
+    Evaluate every percentage x wagering x maximum amount combination of a
+    template and return the Pareto frontier of cost vs. attractiveness.
+
+    Runs as a background job: poll GET /jobs/{id} for progress and the
+    result, POST /jobs/{id}/cancel to stop it.
+    """
+    if not db.get(BonusTemplate, request.template_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Template '{request.template_id}' not found"
+        )
+    try:
+        combinations = len(sweep_grid(request.percentages, request.wagering,
+                                      request.maximum_amounts))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid sweep: {e}"
+        )
+    if not 1 <= request.samples <= MAX_SWEEP_SAMPLES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"samples must be between 1 and {MAX_SWEEP_SAMPLES}"
+        )
+
+    job = create_job(db, "bonus_sweep", request.dict(), created_by=user.username)
+    background_tasks.add_task(run_job, job.id, run_sweep)
+    return {**job_to_dict(job), "combinations": combinations}
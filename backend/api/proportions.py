@@ -0,0 +1,120 @@
+"""
+API endpoints for shared game proportions sets
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from api.auth import require_permission
+from api.schemas import ProportionsResolveRequest
+from database.database import get_db
+from database.models import BonusTemplate, ProportionsSet
+from services.proportions_resolver import get_set_resolver, get_template_resolver
+from services.proportions_sets import get_cached_set, set_usage
+from services.rbac import Permission
+
+router = APIRouter()
+
+MAX_RESOLVE_GAMES = 50000
+
+
+def _set_summary(row: ProportionsSet, templates: int):
+    return {
+        "id": row.id,
+        "name": row.name,
+        "version": row.version,
+        "size": row.size,
+        "content_hash": row.content_hash,
+        "created_at": row.created_at,
+        "templates": templates,
+    }
+
+
+@router.get("/proportions-sets")
+def list_proportions_sets(name: Optional[str] = None, db: Session = Depends(get_db)):
+    """Shared sets (without entries) with the number of templates using each"""
+    query = db.query(ProportionsSet)
+    if name:
+        query = query.filter(ProportionsSet.name == name)
+    usage = set_usage(db)
+    return [_set_summary(row, usage.get(row.id, 0))
+            for row in query.order_by(ProportionsSet.name, ProportionsSet.version).all()]
+
+
+@router.get("/proportions-sets/{set_id}")
+def get_proportions_set(set_id: int, db: Session = Depends(get_db)):
+    """One set with its entries"""
+    row = db.get(ProportionsSet, set_id)
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Proportions set {set_id} not found"
+        )
+    usage = set_usage(db, [set_id])
+    return {**_set_summary(row, usage.get(row.id, 0)),
+            "entries": dict(get_cached_set(db, set_id).entries)}
+
+
+def _resolver(db: Session, template_id: Optional[str], set_id: Optional[int]):
+    """Resolver and a description of where the proportions came from"""
+    if (template_id is None) == (set_id is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Give exactly one of template_id or set_id"
+        )
+    if set_id is not None:
+        resolver = get_set_resolver(db, set_id)
+        if resolver is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Proportions set {set_id} not found"
+            )
+        return resolver, {"set_id": set_id}
+
+    template = db.get(BonusTemplate, template_id)
+    if not template:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Template '{template_id}' not found"
+        )
+    resolver = get_template_resolver(db, template)
+    if resolver is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Template '{template_id}' has no proportions"
+        )
+    return resolver, {"template_id": template_id, "set_id": template.proportions_set_id}
+
+
+@router.get("/proportions/resolve",
+            dependencies=[Depends(require_permission(Permission.VIEW_OPTIMIZATION))])
+def resolve_game_contribution(game: str, category: Optional[str] = None,
+                              template_id: Optional[str] = None, set_id: Optional[int] = None,
+                              db: Session = Depends(get_db)):
+    """
+    Wagering contribution of one game under a template (or set).
+    Falls back from the exact "PROVIDER.Game" key to the provider key, the
+    game's category and "*"; `rule` says which one matched.
+    """
+    resolver, source = _resolver(db, template_id, set_id)
+    return {**source, **resolver.resolve(game, category)}
+
+
+@router.post("/proportions/resolve",
+             dependencies=[Depends(require_permission(Permission.VIEW_OPTIMIZATION))])
+def resolve_game_contributions(request: ProportionsResolveRequest, db: Session = Depends(get_db)):
+    """Batch version of GET /proportions/resolve (up to MAX_RESOLVE_GAMES games)"""
+    if len(request.games) > MAX_RESOLVE_GAMES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_RESOLVE_GAMES} games per request"
+        )
+    resolver, source = _resolver(db, request.template_id, request.set_id)
+    results = resolver.resolve_many(item.dict() for item in request.games)
+    return {
+        **source,
+        "matched": sum(1 for item in results if item["rule"] is not None),
+        "results": results,
+    }
@@ -0,0 +1,113 @@
+"""
+API endpoints for schedule expansion (calendar view of the whole catalogue)
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from typing import Dict, Optional
+from datetime import timedelta
+
+from database.database import get_db
+from database.models import BonusTemplate
+from services.schedule_service import expand_calendar, parse_schedule_datetime
+
+router = APIRouter()
+
+# Longest range one calendar request may expand
+MAX_CALENDAR_DAYS = 400
+
+
+@router.get("/schedule/calendar")
+def get_schedule_calendar(
+    range_from: str = Query(..., alias="from"),
+    range_to: str = Query(..., alias="to"),
+    provider: Optional[str] = None,
+    template_id: Optional[str] = None,
+    max_occurrences: int = 500,
+    db: Session = Depends(get_db),
+):
+    """
+    Expand every template schedule over a date range.
+
+    Period schedules yield their own window, "day"/"date" schedules yield
+    whole days and cron triggers yield firing instants (all in UTC), clipped to
+    each template's schedule_from/schedule_to window.
+
+    Parameters:
+    - from, to: Range bounds (ISO 8601 or DD-MM-YYYY HH:MM, UTC)
+    - provider: Only templates for this provider
+    - template_id: Only this template
+    - max_occurrences: Cap per template (the entry is marked truncated)
+    """
+    start = parse_schedule_datetime(range_from, "UTC")
+    end = parse_schedule_datetime(range_to, "UTC")
+    if start is None or end is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid 'from'/'to'. Use ISO 8601 or DD-MM-YYYY HH:MM"
+        )
+    if end < start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'to' is before 'from'"
+        )
+    if end - start > timedelta(days=MAX_CALENDAR_DAYS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range too long (max {MAX_CALENDAR_DAYS} days)"
+        )
+
+    # Only the schedule columns - no need to load full rows for the catalogue
+    query = db.query(
+        BonusTemplate.id,
+        BonusTemplate.provider,
+        BonusTemplate.trigger_type,
+        BonusTemplate.schedule_type,
+        BonusTemplate.schedule_value,
+        BonusTemplate.schedule_timezone,
+        BonusTemplate.trigger_schedule,
+        BonusTemplate.schedule_from_at,
+        BonusTemplate.schedule_to_at,
+        BonusTemplate.config_extra,
+    ).filter(
+        or_(BonusTemplate.schedule_from_at == None,
+            BonusTemplate.schedule_from_at <= end),
+        or_(BonusTemplate.schedule_to_at == None,
+            BonusTemplate.schedule_to_at >= start),
+    )
+    if provider:
+        query = query.filter(BonusTemplate.provider == provider.upper())
+    if template_id:
+        query = query.filter(BonusTemplate.id == template_id)
+    rows = query.all()
+    by_id = {row.id: row for row in rows}
+
+    expanded = expand_calendar(rows, start, end, max_occurrences=max_occurrences)
+
+    by_day: Dict[str, int] = {}
+    templates = []
+    for entry in expanded:
+        row = by_id[entry["template_id"]]
+        for occurrence_start, _ in entry["occurrences"]:
+            day_key = occurrence_start.date().isoformat()
+            by_day[day_key] = by_day.get(day_key, 0) + 1
+        item = {
+            "id": row.id,
+            "provider": row.provider,
+            "trigger_type": row.trigger_type,
+            "schedule_type": row.schedule_type,
+            "occurrences": [{"start": s, "end": e} for s, e in entry["occurrences"]],
+            "truncated": entry["truncated"],
+        }
+        if "error" in entry:
+            item["error"] = entry["error"]
+        templates.append(item)
+
+    return {
+        "from": start,
+        "to": end,
+        "count": len(templates),
+        "by_day": dict(sorted(by_day.items())),
+        "templates": templates,
+    }
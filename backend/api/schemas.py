@@ -42,6 +42,9 @@ class BonusTemplateCreate(BaseModel):
     schedule_type: str = "period"
     schedule_from: Optional[str] = None
     schedule_to: Optional[str] = None
+    # Recurring schedules: weekdays for "day", days of month for "date"
+    schedule_value: Optional[List[str]] = None
+    schedule_timezone: Optional[str] = None  # "CET"
 
     # Trigger
     # {"*": "default", "en": "...", "de": "...", ...}
@@ -50,6 +53,7 @@ class BonusTemplateCreate(BaseModel):
     trigger_type: Optional[str] = None
     trigger_iterations: Optional[int] = None
     trigger_duration: Optional[str] = None
+    trigger_schedule: Optional[str] = None  # Quartz cron, e.g. "00 00 09 ? * * *"
     minimum_amount: Optional[Dict[str, float]
                              ] = None  # {"*": 25, "EUR": 25, ...}
     restricted_countries: Optional[List[str]] = None  # ["BR", "AU", "NZ", ...]
@@ -91,16 +95,45 @@ class BonusTemplateCreate(BaseModel):
     # User notes
     notes: Optional[str] = None
 
+    # Pricing tables the per-currency fields came from (lineage)
+    # {"cost": {"provider": "PRAGMATIC", "table": "cost", "table_id": "1"}, ...}
+    pricing_sources: Optional[Dict[str, Dict[str, str]]] = None
+
 
 class BonusTemplateResponse(BonusTemplateCreate):
     """Schema for bonus template responses"""
     created_at: datetime
     updated_at: datetime
+    content_hash: Optional[str] = None
+    # Set on create with check_duplicates=true: templates with the same content
+    duplicate_of: Optional[List[str]] = None
+    # Set on create/update: proportions keys that were merged or look malformed
+    warnings: Optional[List[str]] = None
 
     class Config:
         from_attributes = True
 
 
+class SeriesRecurrence(BaseModel):
+    """Recurrence rule of a campaign series (times in the template's timezone)"""
+    start: str  # First window start, "05-01-2026 10:00"
+    duration: str = "6d23h59m"  # Window length, e.g. "23h59m", "2d"
+    frequency: str = "weekly"  # daily, weekly, monthly
+    interval: int = 1  # Every n days/weeks/months
+    weekdays: Optional[List[str]] = None  # weekly: ["monday", "thursday"] (default: start's weekday)
+    count: Optional[int] = None  # Number of campaigns (or until)
+    until: Optional[str] = None  # Last possible window start
+    allow_overlap: bool = False  # Accept windows longer than the gap between starts
+
+
+class CampaignSeriesCreate(BaseModel):
+    """Schema for generating dated copies of a template"""
+    recurrence: SeriesRecurrence
+    # Placeholders: {base}, {date}, {date_to}, {n}, {week} (also in names/descriptions)
+    id_pattern: str = "{base} {date}"
+    date_format: str = "%d.%m.%y"
+
+
 class BonusTemplatePatch(BaseModel):
     """Schema for partially updating a bonus template"""
     schedule_from: Optional[str] = None
@@ -134,12 +167,103 @@ class BonusTranslationResponse(BonusTranslationCreate):
         from_attributes = True
 
 
+class TranslationFanOutRequest(BaseModel):
+    """Schema for generating currency-variant translations"""
+    template_id: Optional[str] = None
+    month: Optional[str] = None  # YYYY-MM, templates created that month
+    languages: Optional[List[str]] = None  # Base languages (default: all with variants)
+    variants: Optional[List[str]] = None  # e.g. ["GBP_en", "USD_en"] (default: all)
+    substitute_amounts: bool = True
+    overwrite: bool = False
+
+
 class CurrencyReferenceCreate(BaseModel):
     """Schema for currency reference"""
     currency: str
     eur_rate: float
     min_deposit: float
     max_deposit: Optional[float] = None
+    rounding_step: Optional[float] = 1.0
+
+
+class CurrencyConvertRequest(BaseModel):
+    """Schema for batch EUR conversion: one row of EUR amounts per template"""
+    fields: List[str]
+    rows: List[List[Optional[float]]]
+    clamp_fields: Optional[List[str]] = None  # Deposit fields, clamped to deposit limits
+    currencies: Optional[List[str]] = None  # Default: every currency
+
+
+class RepricingJobCreate(BaseModel):
+    """Schema for starting a re-pricing job"""
+    provider: Optional[str] = None
+    since: Optional[datetime] = None  # Default: now (templates running or scheduled later)
+    fields: Optional[List[str]] = None  # Default: every priced field
+    dry_run: bool = True
+
+
+class SimulationRequest(BaseModel):
+    """Schema for a Monte Carlo cost simulation of one template"""
+    template_id: str
+    currencies: Optional[List[str]] = None  # Default: ["EUR"]
+    samples: int = 10000
+    seed: int = 0
+    behaviour: Optional[Dict[str, Optional[float]]] = None  # Player model overrides (rtp, volatility, ...)
+    overrides: Optional[Dict[str, Any]] = None  # Term overrides, e.g. {"percentage": 150}
+
+
+class SweepJobCreate(BaseModel):
+    """Schema for starting a parameter sweep over a template's terms"""
+    template_id: str
+    percentages: Optional[List[float]] = None  # Default: 25-200 in steps of 25
+    wagering: Optional[List[float]] = None  # Default: x1-x40
+    maximum_amounts: Optional[List[float]] = None  # EUR tiers, default 50-1000
+    samples: int = 5000
+    seed: int = 0
+    behaviour: Optional[Dict[str, Optional[float]]] = None
+    workers: Optional[int] = None  # Default and maximum: SWEEP_WORKERS (shared by all sweeps)
+
+
+class CurrencyValueFilter(BaseModel):
+    """Numeric filter on one per-currency template value"""
+    field: str  # e.g. "maximum_amount"
+    currency: str = "EUR"
+    op: str = "gt"  # eq, ne, gt, gte, lt, lte
+    value: float
+
+
+class CurrencyValueAggregate(BaseModel):
+    """Aggregates of one per-currency value over the matching templates"""
+    field: str
+    currency: str = "EUR"
+    functions: Optional[List[str]] = None  # count, sum, avg, min, max (default: all)
+    group_by: Optional[str] = None  # provider, brand, bonus_type, trigger_type, category
+
+
+class CurrencyValueQuery(BaseModel):
+    """Schema for querying the columnar per-currency values"""
+    filters: List[CurrencyValueFilter] = []
+    provider: Optional[str] = None
+    brand: Optional[str] = None
+    bonus_type: Optional[str] = None
+    trigger_type: Optional[str] = None
+    category: Optional[str] = None
+    aggregate: Optional[CurrencyValueAggregate] = None
+    limit: int = 100
+    offset: int = 0
+
+
+class ProportionsGame(BaseModel):
+    """One game to resolve against a proportions set"""
+    game: str  # "PROVIDER.Game name"
+    category: Optional[str] = None  # e.g. "ROULETTE", used when no game/provider key matches
+
+
+class ProportionsResolveRequest(BaseModel):
+    """Schema for batch contribution lookups (one of template_id / set_id)"""
+    template_id: Optional[str] = None
+    set_id: Optional[int] = None
+    games: List[ProportionsGame]
 
 
 class CurrencyReferenceResponse(CurrencyReferenceCreate):
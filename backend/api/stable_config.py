@@ -6,6 +6,9 @@ import json
 from database.database import get_db
 from database.models import StableConfig
 from api.schemas import StableConfigCreate, StableConfigResponse
+from services.event_bus import get_event_bus
+from services.pricing_lineage import changed_tables, recompute_dependents, snapshot_tables
+from services.proportions_sets import intern_proportions, parse_proportions
 
 router = APIRouter()
 
@@ -21,6 +24,10 @@ def save_stable_config(config: StableConfigCreate, tab: Optional[str] = Query(No
 
     Parameters:
     - tab: Optional tab identifier ('cost', 'amounts', 'stakes', 'withdrawals', 'wager', 'proportions')
+
+    Templates whose fields were copied from a table that changed (see
+    pricing_sources) are recomputed; their ids are returned in
+    recomputed_templates.
     """
     try:
         # Convert Pydantic models to dicts for JSON serialization
@@ -60,6 +67,8 @@ def save_stable_config(config: StableConfigCreate, tab: Optional[str] = Query(No
         ).first()
 
         if existing_config:
+            tables_before = snapshot_tables(existing_config)
+
             # Update existing - ONLY update the fields relevant to current tab
             if tab == 'cost':
                 # Cost tab → only update cost field (even if empty, to allow deletion)
@@ -84,11 +93,27 @@ def save_stable_config(config: StableConfigCreate, tab: Optional[str] = Query(No
                 if config_data['live_casino_proportions']:
                     existing_config.live_casino_proportions = config_data['live_casino_proportions']
 
+            _intern_config_proportions(db, existing_config)
             db.commit()
             db.refresh(existing_config)
+            _publish_config_change(target_provider, tab)
+
+            # Recompute only the templates sourced from tables that changed
+            changed = changed_tables(
+                tables_before, snapshot_tables(existing_config))
+            recomputed = recompute_dependents(db, target_provider, changed)
+            if recomputed:
+                get_event_bus().publish(
+                    "templates.recomputed",
+                    provider=None if target_provider == "DEFAULT" else target_provider,
+                    tables=[f"{kind}/{table_id}" for kind, table_id in sorted(changed)],
+                    count=len(recomputed),
+                )
 
             # Return filtered response based on tab
-            return _format_response(existing_config, tab)
+            response = _format_response(existing_config, tab)
+            response["recomputed_templates"] = recomputed
+            return response
         else:
             # Create new
             if tab == 'cost':
@@ -120,8 +145,10 @@ def save_stable_config(config: StableConfigCreate, tab: Optional[str] = Query(No
                 )
 
             db.add(new_config)
+            _intern_config_proportions(db, new_config)
             db.commit()
             db.refresh(new_config)
+            _publish_config_change(target_provider, tab)
 
             # Return filtered response based on tab
             return _format_response(new_config, tab)
@@ -131,6 +158,33 @@ def save_stable_config(config: StableConfigCreate, tab: Optional[str] = Query(No
             status_code=500, detail=f"Error saving config: {str(e)}")
 
 
+def _intern_config_proportions(db: Session, config: StableConfig):
+    """Point the config at shared proportions sets ("<provider>/casino", versioned)"""
+    for field, kind in (("casino_proportions", "casino"),
+                        ("live_casino_proportions", "live_casino")):
+        entries = parse_proportions(getattr(config, field))
+        set_id = None
+        if entries:
+            proportions_set = intern_proportions(
+                db, entries, name=f"{config.provider}/{kind}")
+            db.flush()
+            set_id = proportions_set.id
+        setattr(config, f"{field}_set_id", set_id)
+
+
+def _publish_config_change(target_provider: str, tab: Optional[str]):
+    """
+    Notify /events streams. DEFAULT tables apply to every provider, so they
+    are published without a provider and reach all provider filters.
+    """
+    get_event_bus().publish(
+        "stable_config.updated",
+        provider=None if target_provider == "DEFAULT" else target_provider,
+        config_provider=target_provider,
+        tab=tab,
+    )
+
+
 def _format_response(config: StableConfig, tab: Optional[str] = None):
     """
     Format response - include provider field only for cost tab
@@ -0,0 +1,243 @@
+"""
+API endpoints for translation work across the whole catalogue
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+from datetime import datetime
+
+from api.schemas import TranslationFanOutRequest
+from database.database import get_db
+from database.models import BonusTemplate, BonusTranslation, CustomLanguage
+from services.currency_service import LANGUAGES, LANGUAGE_CURRENCY_VARIANTS
+from services.event_bus import publish_template_event
+from services.locale_service import translation_key
+from services.translation_memory import storage_report, suggest_translations
+from services.translation_variants import fan_out_variants
+
+router = APIRouter()
+
+
+def _coverage_columns(db: Session) -> List[str]:
+    """Bitmap columns: base languages, custom languages, then currency variants"""
+    columns = list(LANGUAGES)
+    for (code,) in db.query(CustomLanguage.code).order_by(CustomLanguage.code).all():
+        if code not in columns:
+            columns.append(code)
+    for variants in LANGUAGE_CURRENCY_VARIANTS.values():
+        for variant in variants:
+            if variant not in columns:
+                columns.append(variant)
+    return columns
+
+
+def _parse_month(month: str):
+    """'YYYY-MM' -> [start, end) datetimes"""
+    try:
+        start = datetime.strptime(month, "%Y-%m")
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid month: '{month}'. Use YYYY-MM"
+        )
+    end = datetime(start.year + 1, 1, 1) if start.month == 12 else datetime(start.year, start.month + 1, 1)
+    return start, end
+
+
+@router.get("/translations/coverage")
+def get_translation_coverage(
+    month: Optional[str] = None,
+    missing: Optional[str] = None,
+    max_complete: Optional[float] = Query(None, ge=0, le=100),
+    variants: bool = True,
+    limit: int = 500,
+    db: Session = Depends(get_db),
+):
+    """
+    Template x language completeness matrix.
+
+    Each template row carries a bitset (hex string) over "columns": bit i is
+    set when the template has a translation for columns[i]. Currency variants
+    (e.g. GBP_en) count whether they are stored as the translation language or
+    as its currency.
+
+    Parameters:
+    - month: YYYY-MM, templates created that month (default: whole catalogue)
+    - missing: Comma-separated codes; only templates missing any of them
+    - max_complete: Only templates below this completeness percentage
+    - variants: Include currency variants as columns (default true)
+    - limit: Maximum rows returned
+    """
+    columns = _coverage_columns(db)
+    if not variants:
+        variant_codes = {v for vs in LANGUAGE_CURRENCY_VARIANTS.values() for v in vs}
+        columns = [c for c in columns if c not in variant_codes]
+    bit_of = {code: 1 << i for i, code in enumerate(columns)}
+    full_mask = (1 << len(columns)) - 1
+
+    missing_mask = 0
+    if missing:
+        for code in (c.strip() for c in missing.split(",")):
+            if code not in bit_of:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Unknown language '{code}'"
+                )
+            missing_mask |= bit_of[code]
+
+    # One grouped pass: every (template, language, currency) pair, templates
+    # without translations included through the outer join
+    query = db.query(
+        BonusTemplate.id,
+        BonusTranslation.language,
+        BonusTranslation.currency,
+    ).outerjoin(
+        BonusTranslation, BonusTranslation.template_id == BonusTemplate.id
+    )
+    if month:
+        start, end = _parse_month(month)
+        query = query.filter(BonusTemplate.created_at >= start,
+                             BonusTemplate.created_at < end)
+    rows = query.group_by(
+        BonusTemplate.id, BonusTranslation.language, BonusTranslation.currency
+    ).all()
+
+    bitsets: Dict[str, int] = {}
+    for template_id, language, currency in rows:
+        bits = bitsets.get(template_id, 0)
+        bits |= bit_of.get(translation_key(language, currency), 0)
+        bitsets[template_id] = bits
+
+    total = len(columns)
+    per_column = [0] * total
+    items = []
+    for template_id in sorted(bitsets):
+        bits = bitsets[template_id]
+        present = bin(bits).count("1")
+        complete = round(present * 100 / total, 1) if total else 100.0
+        for i in range(total):
+            if bits >> i & 1:
+                per_column[i] += 1
+        if missing_mask and (bits & missing_mask) == missing_mask:
+            continue
+        if max_complete is not None and complete >= max_complete:
+            continue
+        items.append({
+            "id": template_id,
+            "bits": format(bits, "x"),
+            "missing_bits": format(full_mask & ~bits, "x"),
+            "present": present,
+            "complete": complete,
+        })
+
+    return {
+        "month": month,
+        "columns": columns,
+        "templates": len(bitsets),
+        "matched": len(items),
+        "column_counts": dict(zip(columns, per_column)),
+        "items": items[:limit],
+        "has_more": len(items) > limit,
+    }
+
+
+# ============= TRANSLATION MEMORY =============
+
+@router.get("/translations/memory/suggest")
+def suggest_from_memory(
+    text: str,
+    source_language: Optional[str] = None,
+    language: Optional[str] = None,
+    limit: int = 5,
+    db: Session = Depends(get_db),
+):
+    """
+    Suggest existing translations for a source string.
+
+    Finds every translation whose name or description is exactly `text`
+    (by content hash) and returns what the other languages of those templates
+    say, most used first.
+
+    Parameters:
+    - text: Source string, e.g. an English offer name
+    - source_language: Only match the source text in this language
+    - language: Only suggest this target language
+    - limit: Suggestions per language
+    """
+    if not text.strip():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'text' must not be empty"
+        )
+    return suggest_translations(db, text, source_language=source_language,
+                                language=language, limit=limit)
+
+
+@router.get("/translations/memory/report")
+def get_memory_report(db: Session = Depends(get_db)):
+    """Storage report: translation text stored inline vs how much of it is duplicated"""
+    return storage_report(db)
+
+
+# ============= CURRENCY VARIANTS =============
+
+@router.post("/translations/variants/fan-out")
+def fan_out_translation_variants(request: TranslationFanOutRequest, db: Session = Depends(get_db)):
+    """
+    Generate currency-variant translations (GBP_en, USD_en, BRL_pt, ...) from
+    the base-language translations of one template or a whole month.
+
+    With substitute_amounts, EUR amounts in names/descriptions are converted
+    with the currency reference rates ("€300" -> "£300"), read and written
+    with the language's decimal/grouping separators ("0,50 €" in pt); amounts
+    that do not fit them are left unchanged. Existing variants are kept unless overwrite is set. Everything is written in one transaction.
+    """
+    if bool(request.template_id) == bool(request.month):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide either 'template_id' or 'month'"
+        )
+    known_variants = {v for vs in LANGUAGE_CURRENCY_VARIANTS.values() for v in vs}
+    unknown = sorted(set(request.variants or []) - known_variants)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown currency variants: {', '.join(unknown)}"
+        )
+
+    query = db.query(BonusTemplate)
+    if request.template_id:
+        query = query.filter(BonusTemplate.id == request.template_id)
+    else:
+        start, end = _parse_month(request.month)
+        query = query.filter(BonusTemplate.created_at >= start,
+                             BonusTemplate.created_at < end)
+    templates = query.order_by(BonusTemplate.id).all()
+    if request.template_id and not templates:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Template '{request.template_id}' not found"
+        )
+
+    try:
+        result = fan_out_variants(
+            db, templates,
+            languages=request.languages,
+            variants=request.variants,
+            substitute=request.substitute_amounts,
+            overwrite=request.overwrite,
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Fan-out failed, nothing was written: {e}"
+        )
+
+    by_id = {t.id: t for t in templates}
+    for summary in result["changed_templates"]:
+        publish_template_event("translation.saved", by_id[summary["template_id"]],
+                               languages=summary["created"] + summary["updated"])
+    return result
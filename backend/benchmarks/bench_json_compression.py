@@ -0,0 +1,116 @@
+"""
+Benchmark: storage size and read latency of plain JSON vs zstd-compressed
+JSON columns (with and without a trained dictionary).
+Needs the zstandard package.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_json_compression --templates 5000
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import compressed_json  # noqa: E402
+from database.compressed_json import DictionaryRegistry, serialize  # noqa: E402
+
+LANGUAGES = ["en", "de", "fi", "no", "sv", "es", "it", "pt", "fr", "nl", "pl", "cs", "hu",
+             "ro", "el", "tr", "ja", "ko", "zh", "ru", "et", "lv", "lt", "sk", "sl"]
+CURRENCIES = ["EUR", "USD", "GBP", "CAD", "AUD", "NZD", "NOK", "SEK", "DKK", "CHF",
+              "PLN", "CZK", "HUF", "BRL", "MXN", "JPY", "INR", "ZAR", "TRY", "CLP"]
+
+
+def load_proportions():
+    """The proportions map of the sample config.json, if present"""
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                        "config.json")
+    try:
+        text = open(path, encoding="utf-8").read()
+    except OSError:
+        return {f"PROVIDER{i % 40}.Game {i}": 0 for i in range(600)}
+    start = text.index('"proportions"')
+    start = text.index("{", start)
+    return json.JSONDecoder().raw_decode(text[start:])[0]
+
+
+def catalogue_rows(count: int, proportions):
+    """Column values shaped like the real catalogue"""
+    rows = []
+    for i in range(count):
+        amount = 100 * (1 + i % 5)
+        rows.append([
+            {"*": f"Reload {i}", **{lang: f"{lang}: Weekly reload 100% up to €{amount} (week {i % 52})"
+                                   for lang in LANGUAGES}},
+            {"*": "", **{lang: f"{lang}: Deposit at least €25 and get a 100% bonus up to €{amount}. "
+                               f"Wager x{10 + i % 30} within 7 days." for lang in LANGUAGES}},
+            {"*": amount, **{code: float(amount + i % 3) for code in CURRENCIES}},
+            {"*": 25, **{code: 25.0 for code in CURRENCIES}},
+            {**proportions, f"EXTRA.Game {i % 11}": i % 100} if i % 10 == 0 else None,
+        ])
+    return rows
+
+
+def encode_rows(rows, compress):
+    compressed_json.compress_writes = compress
+    return [[None if value is None else compressed_json.encode(value) for value in row] for row in rows]
+
+
+def read_latency(encoded, repeat):
+    """Best full-table fetch + decode time from an in-memory SQLite table"""
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, a BLOB, b BLOB, c BLOB, d BLOB, e BLOB)")
+    conn.executemany("INSERT INTO t (a, b, c, d, e) VALUES (?, ?, ?, ?, ?)", encoded)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for row in conn.execute("SELECT a, b, c, d, e FROM t"):
+            [compressed_json.decode(value) for value in row]
+        best = min(best, time.perf_counter() - start)
+    conn.close()
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compressed JSON column benchmark")
+    parser.add_argument("--templates", type=int, default=5000)
+    parser.add_argument("--dict-size", type=int, default=32 * 1024)
+    parser.add_argument("--level", type=int, default=compressed_json.DEFAULT_LEVEL)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    zstd = compressed_json._zstd()
+    rows = catalogue_rows(args.templates, load_proportions())
+    samples = [serialize(value) for row in rows[:2000] for value in row if value is not None]
+
+    variants = {}
+    registry = compressed_json.registry = DictionaryRegistry()
+    registry.level = args.level
+    registry.loaded = True  # Nothing to load from a database
+    variants["plain JSON"] = encode_rows(rows, compress=False)
+    variants["zstd"] = encode_rows(rows, compress=True)
+
+    start = time.perf_counter()
+    trained = zstd.train_dictionary(args.dict_size, samples)
+    training = time.perf_counter() - start
+    registry.register(trained.dict_id(), trained.as_bytes())
+    variants["zstd + dictionary"] = encode_rows(rows, compress=True)
+
+    print(f"Templates:           {args.templates}")
+    print(f"Dictionary:          {len(trained.as_bytes())} bytes, trained in {training * 1000:.0f} ms "
+          f"on {len(samples)} values")
+    plain_size = None
+    for name, encoded in variants.items():
+        size = sum(len(value) for row in encoded for value in row if value is not None)
+        plain_size = plain_size or size
+        latency = read_latency(encoded, args.repeat)
+        print(f"{name + ':':<21}{size / 1024:9.1f} KiB ({size / plain_size:6.1%})   "
+              f"read+decode {latency * 1000:7.1f} ms ({latency / args.templates * 1e6:.1f} µs/row)")
+
+
+if __name__ == "__main__":
+    main()
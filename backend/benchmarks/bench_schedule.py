@@ -0,0 +1,99 @@
+"""
+Benchmark: expand a year of schedules across 10k templates.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_schedule --templates 10000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.schedule_service import (  # noqa: E402
+    compile_cron,
+    compile_day_schedule,
+    expand_calendar,
+)
+
+WEEKDAYS = ["monday", "tuesday", "wednesday",
+            "thursday", "friday", "saturday", "sunday"]
+CRONS = [None, "00 00 09 ? * * *", "0 0 12 ? * MON-FRI", "0 30 18 ? * 6#1",
+         "0 0 10 L * ?", "0 0 9,21 * * ?"]
+TIMEZONES = ["UTC", "CET", "Europe/Athens"]
+
+
+def make_templates(count: int, seed: int):
+    """Catalogue mix: dated periods, weekday schedules and cron triggers"""
+    rng = random.Random(seed)
+    year_start = datetime(2026, 1, 1)
+    templates = []
+    for i in range(count):
+        kind = rng.random()
+        window_start = year_start + timedelta(days=rng.randrange(365))
+        template = SimpleNamespace(
+            id=f"BENCH {i:06d}",
+            schedule_type="period",
+            schedule_value=None,
+            schedule_timezone=rng.choice(TIMEZONES),
+            trigger_schedule=None,
+            schedule_from_at=window_start,
+            schedule_to_at=window_start + timedelta(days=rng.choice([1, 3, 7])),
+            config_extra=None,
+        )
+        if kind < 0.5:
+            # Recurring weekday schedule, optionally with a cron trigger, valid all year
+            template.schedule_type = "day"
+            template.schedule_value = rng.sample(WEEKDAYS, rng.randint(1, 2))
+            template.trigger_schedule = rng.choice(CRONS)
+            template.schedule_from_at = None
+            template.schedule_to_at = None
+        elif kind < 0.6:
+            template.schedule_type = "date"
+            template.schedule_value = [rng.choice(["01", "15", "L"])]
+            template.schedule_from_at = None
+            template.schedule_to_at = None
+        templates.append(template)
+    return templates
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Schedule expansion benchmark")
+    parser.add_argument("--templates", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    templates = make_templates(args.templates, args.seed)
+    range_from = datetime(2026, 1, 1)
+    range_to = range_from + timedelta(days=args.days)
+
+    compile_cron.cache_clear()
+    compile_day_schedule.cache_clear()
+
+    start = time.perf_counter()
+    cold = expand_calendar(templates, range_from, range_to)
+    cold_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expand_calendar(templates, range_from, range_to)
+    warm_seconds = time.perf_counter() - start
+
+    occurrences = sum(len(entry["occurrences"]) for entry in cold)
+    print(f"Templates:           {args.templates}")
+    print(f"Range:               {args.days} days")
+    print(f"Templates in range:  {len(cold)}")
+    print(f"Occurrences:         {occurrences}")
+    print(f"Distinct cron:       {compile_cron.cache_info().currsize}")
+    print(f"Distinct day sched.: {compile_day_schedule.cache_info().currsize}")
+    print(f"Cold expansion:      {cold_seconds * 1000:.1f} ms")
+    print(f"Second expansion:    {warm_seconds * 1000:.1f} ms (compiled matchers cached)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,507 @@
+"""
+HTTP load test harness for the CAMPEON CRM API.
+
+Boots main:app with uvicorn inside this process against a throwaway SQLite
+database (or a local Postgres given with --database-url), logs in one user per
+team through /auth/login and replays the team workflows at the requested
+concurrency. On SQLite the app's engine is swapped for one with a connection
+per checkout (the app's StaticPool shares a single connection between every
+thread, which breaks under concurrent requests) in WAL mode with a busy
+timeout, so concurrent writers wait for each other instead of failing:
+
+- crm_ops:      CRM OPS create flow (pricing table lookup, create, read back)
+- translation:  Translation Team edit flow (month list, template, translations, save)
+- optimization: Optimization Team browse + JSON (month list, template, JSON)
+
+Reports per-endpoint latency percentiles and error rates and compares them
+against a saved baseline.
+
+Usage (from the backend directory):
+    python -m benchmarks.load_test --concurrency 8 --iterations 40
+    python -m benchmarks.load_test --save-baseline benchmarks/baseline.json
+    python -m benchmarks.load_test --baseline benchmarks/baseline.json
+
+Exit code is 1 when a regression against the baseline is detected.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+LOADTEST_PASSWORD = "LoadTest123!"
+
+# One account per team, created in the target database before the run
+LOADTEST_USERS = {
+    "crm_ops": {"username": "loadtest.crm_ops", "role": "CRM OPS"},
+    "translation": {"username": "loadtest.translation", "role": "Translation Team"},
+    "optimization": {"username": "loadtest.optimization", "role": "Optimization Team"},
+}
+
+WORKFLOWS = ["crm_ops", "translation", "optimization"]
+
+
+class Recorder:
+    """Thread-safe collector of per-endpoint latencies and failures"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, endpoint: str, elapsed_ms: float, ok: bool):
+        with self._lock:
+            self.latencies[endpoint].append(elapsed_ms)
+            if not ok:
+                self.errors[endpoint] += 1
+
+
+class ApiClient:
+    """Minimal urllib client that times every request under an endpoint label"""
+
+    def __init__(self, base_url: str, recorder: Recorder, token: str = None):
+        self.base_url = base_url
+        self.recorder = recorder
+        self.token = token
+
+    def request(self, method: str, path: str, endpoint: str, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(
+            self.base_url + path, data=data, method=method)
+        req.add_header("Content-Type", "application/json")
+        if self.token:
+            req.add_header("Authorization", f"Bearer {self.token}")
+
+        start = time.perf_counter()
+        status_code = 0
+        payload = None
+        try:
+            with urllib.request.urlopen(req, timeout=30) as resp:
+                status_code = resp.status
+                raw = resp.read()
+        except urllib.error.HTTPError as e:
+            status_code = e.code
+            raw = e.read()
+        except (urllib.error.URLError, OSError):
+            raw = b""
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self.recorder.record(endpoint, elapsed_ms, 200 <= status_code < 300)
+        if raw:
+            try:
+                payload = json.loads(raw)
+            except ValueError:
+                payload = None
+        return status_code, payload
+
+
+def _quote(template_id: str) -> str:
+    return urllib.parse.quote(template_id, safe="")
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+SQLITE_BUSY_TIMEOUT = 30  # seconds a writer waits for the database lock
+
+
+def use_harness_engine():
+    """
+    SQLite only: rebind database.database to an engine without connection
+    sharing. Must run before the app handles requests; Postgres runs use the
+    app's own QueuePool unchanged.
+    """
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.pool import NullPool
+    from database import database
+
+    if not database.DATABASE_URL.startswith("sqlite"):
+        return
+    engine = create_engine(
+        database.DATABASE_URL,
+        connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT},
+        poolclass=NullPool,
+    )
+
+    @event.listens_for(engine, "connect")
+    def _configure(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT * 1000}")
+        cursor.close()
+
+    database.engine.dispose()
+    database.engine = engine
+    database.SessionLocal.configure(bind=engine)
+
+
+def seed_database(seed_templates: int):
+    """Create loadtest users, a pricing table and a month of templates"""
+    from database.database import SessionLocal, init_db
+    from database.models import BonusTemplate, BonusTranslation, StableConfig, User
+    from api.auth import hash_password
+
+    init_db()
+    db = SessionLocal()
+    try:
+        for user_data in LOADTEST_USERS.values():
+            existing = db.query(User).filter(
+                User.username == user_data["username"]).first()
+            if existing:
+                existing.password_hash = hash_password(LOADTEST_PASSWORD)
+                existing.role = user_data["role"]
+                existing.is_active = True
+            else:
+                db.add(User(
+                    username=user_data["username"],
+                    password_hash=hash_password(LOADTEST_PASSWORD),
+                    role=user_data["role"],
+                    is_active=True,
+                ))
+
+        if not db.query(StableConfig).filter(StableConfig.provider == "PRAGMATIC").first():
+            db.add(StableConfig(
+                provider="PRAGMATIC",
+                cost=[{"id": "1", "name": "Table 1",
+                       "values": {"EUR": 0.2, "USD": 0.2, "GBP": 0.2, "BRL": 1.0}}],
+                maximum_amount=[], minimum_amount=[],
+                minimum_stake_to_wager=[], maximum_stake_to_wager=[],
+                maximum_withdraw=[], casino_proportions="", live_casino_proportions="",
+            ))
+
+        existing_ids = {row[0] for row in db.query(BonusTemplate.id).filter(
+            BonusTemplate.id.like("LOADTEST SEED %")).all()}
+        for i in range(seed_templates):
+            template_id = f"LOADTEST SEED {i:05d}"
+            if template_id in existing_ids:
+                continue
+            db.add(BonusTemplate(**_template_payload(template_id)))
+            db.add(BonusTranslation(
+                template_id=template_id, language="en",
+                name=f"Weekly Reload {i}", description="Seeded by load test"))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _template_payload(template_id: str) -> dict:
+    """Reload template shaped like the ones ReloadBonusForm submits"""
+    percentage = random.choice([25, 50, 100, 150, 200])
+    return {
+        "id": template_id,
+        "schedule_type": "period",
+        "schedule_from": "21-11-2025 10:00",
+        "schedule_to": "28-11-2025 22:59",
+        "trigger_name": {"*": "Reload", "en": "Reload"},
+        "trigger_description": {"*": "", "en": ""},
+        "trigger_type": "deposit",
+        "trigger_iterations": 1,
+        "trigger_duration": "7d",
+        "minimum_amount": {"*": 25, "EUR": 25, "USD": 25, "BRL": 50},
+        "restricted_countries": [],
+        "segments": [],
+        "percentage": percentage,
+        "wagering_multiplier": 15,
+        "minimum_stake_to_wager": {"*": 0.5, "EUR": 0.5},
+        "maximum_stake_to_wager": {"*": 5, "EUR": 5},
+        "maximum_amount": {"*": 300, "EUR": 300, "USD": 300, "BRL": 600},
+        "maximum_withdraw": {"*": 3, "EUR": 3},
+        "proportions": {"ROULETTE": 20, "SPINOMENAL.1 Reel Egypt": 0},
+        "category": "games",
+        "provider": "PRAGMATIC",
+        "brand": "PRAGMATIC",
+        "bonus_type": "reload",
+        "config_type": "bonus",
+        "expiry": "7d",
+    }
+
+
+def login(base_url: str, recorder: Recorder, username: str) -> str:
+    """Mint a JWT through /auth/login"""
+    client = ApiClient(base_url, recorder)
+    status_code, payload = client.request(
+        "POST", "/auth/login", "POST /auth/login",
+        {"username": username, "password": LOADTEST_PASSWORD})
+    if status_code != 200 or not payload:
+        raise RuntimeError(f"Login failed for {username}: HTTP {status_code}")
+    return payload["access_token"]
+
+
+def _month_path() -> str:
+    now = datetime.utcnow()
+    return f"/api/bonus-templates/dates/{now.year}/{now.month:02d}"
+
+
+def _pick_template(client: ApiClient) -> str:
+    status_code, listing = client.request(
+        "GET", _month_path(), "GET /api/bonus-templates/dates/{year}/{month}")
+    if status_code != 200 or not listing:
+        return None
+    return random.choice(listing)["id"]
+
+
+def run_crm_ops_flow(client: ApiClient, iteration: int):
+    """Look up the provider cost table, create a reload and read it back"""
+    client.request("GET", "/api/stable-config/PRAGMATIC?cost_only=true",
+                   "GET /api/stable-config/{provider}")
+    template_id = f"LOADTEST RUN {os.getpid()} {iteration:06d} {random.getrandbits(32):08x}"
+    client.request("POST", "/api/bonus-templates", "POST /api/bonus-templates",
+                   _template_payload(template_id))
+    client.request("GET", f"/api/bonus-templates/{_quote(template_id)}",
+                   "GET /api/bonus-templates/{id}")
+
+
+def run_translation_flow(client: ApiClient, iteration: int):
+    """Open a template from the month list, load translations, save one"""
+    template_id = _pick_template(client)
+    if not template_id:
+        return
+    quoted = _quote(template_id)
+    client.request("GET", f"/api/bonus-templates/{quoted}",
+                   "GET /api/bonus-templates/{id}")
+    client.request("GET", f"/api/bonus-templates/{quoted}/translations",
+                   "GET /api/bonus-templates/{id}/translations")
+    language = random.choice(["de", "fr", "pt", "es", "it"])
+    client.request("POST", f"/api/bonus-templates/{quoted}/translations",
+                   "POST /api/bonus-templates/{id}/translations",
+                   {"language": language, "name": f"Reload {iteration} ({language})",
+                    "description": "Load test translation"})
+
+
+def run_optimization_flow(client: ApiClient, iteration: int):
+    """Browse the month list, open a template and render its JSON"""
+    template_id = _pick_template(client)
+    if not template_id:
+        return
+    quoted = _quote(template_id)
+    client.request("GET", f"/api/bonus-templates/{quoted}",
+                   "GET /api/bonus-templates/{id}")
+    client.request("GET", f"/api/bonus-templates/{quoted}/json",
+                   "GET /api/bonus-templates/{id}/json")
+
+
+FLOW_RUNNERS = {
+    "crm_ops": run_crm_ops_flow,
+    "translation": run_translation_flow,
+    "optimization": run_optimization_flow,
+}
+
+
+def _percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1,
+                max(0, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(recorder: Recorder) -> dict:
+    """Latency distribution and error rate per endpoint"""
+    summary = {}
+    for endpoint, values in sorted(recorder.latencies.items()):
+        ordered = sorted(values)
+        count = len(ordered)
+        summary[endpoint] = {
+            "count": count,
+            "errors": recorder.errors.get(endpoint, 0),
+            "error_rate": round(recorder.errors.get(endpoint, 0) / count, 4) if count else 0.0,
+            "mean_ms": round(sum(ordered) / count, 2) if count else 0.0,
+            "p50_ms": round(_percentile(ordered, 50), 2),
+            "p90_ms": round(_percentile(ordered, 90), 2),
+            "p95_ms": round(_percentile(ordered, 95), 2),
+            "p99_ms": round(_percentile(ordered, 99), 2),
+            "max_ms": round(ordered[-1], 2) if count else 0.0,
+        }
+    return summary
+
+
+def compare_to_baseline(summary: dict, baseline: dict, tolerance: float, min_delta_ms: float) -> list:
+    """
+    Return human-readable regressions. A latency regression needs both the
+    relative tolerance and the absolute minimum delta to be exceeded, so that
+    sub-millisecond noise on fast endpoints is not flagged.
+    """
+    regressions = []
+    for endpoint, base in baseline.get("endpoints", {}).items():
+        current = summary.get(endpoint)
+        if not current:
+            regressions.append(f"{endpoint}: missing from this run")
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            allowed = base[metric] * (1 + tolerance)
+            if current[metric] > allowed and current[metric] - base[metric] > min_delta_ms:
+                regressions.append(
+                    f"{endpoint}: {metric} {current[metric]:.1f}ms vs baseline {base[metric]:.1f}ms")
+        if current["error_rate"] > base["error_rate"] + 0.01:
+            regressions.append(
+                f"{endpoint}: error rate {current['error_rate']:.2%} vs baseline {base['error_rate']:.2%}")
+    return regressions
+
+
+def print_report(summary: dict, duration: float):
+    header = f"{'endpoint':<48} {'count':>6} {'err%':>6} {'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+    print(header)
+    print("-" * len(header))
+    total = 0
+    for endpoint, stats in summary.items():
+        total += stats["count"]
+        print(f"{endpoint:<48} {stats['count']:>6} {stats['error_rate'] * 100:>5.1f}% "
+              f"{stats['p50_ms']:>7.1f}ms {stats['p90_ms']:>6.1f}ms {stats['p95_ms']:>6.1f}ms "
+              f"{stats['p99_ms']:>6.1f}ms {stats['max_ms']:>6.1f}ms")
+    print("-" * len(header))
+    print(f"{total} requests in {duration:.2f}s ({total / duration:.1f} req/s)")
+
+
+def start_server(port: int):
+    """Run uvicorn in a background thread and wait until it accepts requests"""
+    import uvicorn
+    from main import app
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=port,
+                            log_level="warning", access_log=False)
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+
+    deadline = time.time() + 30
+    while not server.started:
+        if time.time() > deadline or not thread.is_alive():
+            raise RuntimeError("uvicorn did not start")
+        time.sleep(0.05)
+    return server, thread
+
+
+def run(args) -> int:
+    use_harness_engine()
+    seed_database(args.seed_templates)
+
+    port = args.port or _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server, thread = start_server(port)
+
+    recorder = Recorder()
+    flows = [f.strip() for f in args.flows.split(",") if f.strip()]
+    tokens = {flow: login(base_url, recorder, LOADTEST_USERS[flow]["username"])
+              for flow in flows}
+
+    jobs = [(flow, i) for i in range(args.iterations) for flow in flows]
+    random.shuffle(jobs)
+
+    def run_job(job):
+        flow, iteration = job
+        client = ApiClient(base_url, recorder, tokens[flow])
+        FLOW_RUNNERS[flow](client, iteration)
+
+    # The API prints debug output on most requests - keep it out of the report
+    sink = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    start = time.perf_counter()
+    try:
+        with sink:
+            with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                list(pool.map(run_job, jobs))
+    finally:
+        duration = time.perf_counter() - start
+        server.should_exit = True
+        thread.join(timeout=10)
+
+    summary = summarize(recorder)
+    print_report(summary, duration)
+
+    report = {
+        "created_at": datetime.utcnow().isoformat(),
+        "concurrency": args.concurrency,
+        "iterations": args.iterations,
+        "flows": flows,
+        "endpoints": summary,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(
+            summary, baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print("\n❌ Regressions against baseline:")
+            for line in regressions:
+                print(f"   - {line}")
+            return 1
+        print("\n✅ No regressions against baseline")
+
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="CAMPEON CRM API load test")
+    parser.add_argument("--database-url", default=None,
+                        help="Database to run against (default: temporary SQLite file)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=25,
+                        help="Iterations of each workflow")
+    parser.add_argument("--flows", default=",".join(WORKFLOWS),
+                        help="Comma-separated workflows: " + ", ".join(WORKFLOWS))
+    parser.add_argument("--seed-templates", type=int, default=200,
+                        help="Templates created in the current month before the run")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--output", default=None,
+                        help="Write the JSON report to this path")
+    parser.add_argument("--baseline", default=None,
+                        help="Compare against a saved baseline report")
+    parser.add_argument("--save-baseline", default=None,
+                        help="Save this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative latency increase (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0,
+                        help="Ignore latency increases smaller than this")
+    parser.add_argument("--verbose", action="store_true",
+                        help="Keep API debug output")
+    args = parser.parse_args(argv)
+
+    unknown = [f for f in args.flows.split(",") if f.strip() and f.strip() not in FLOW_RUNNERS]
+    if unknown:
+        parser.error(f"Unknown flows: {', '.join(unknown)}")
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    # database.database reads DATABASE_URL at import time, so set it first
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        tmp_dir = tempfile.mkdtemp(prefix="campeon_loadtest_")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp_dir, 'loadtest.db')}"
+
+    print(f"🚀 Load test against {os.environ['DATABASE_URL'].split('@')[-1]}")
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
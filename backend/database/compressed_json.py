@@ -0,0 +1,183 @@
+"""
+Opt-in zstd-compressed JSON column type.
+
+Columns declared as CompressedJSON behave exactly like JSON unless the
+JSON_COMPRESSION=zstd environment variable is set (requires the optional
+zstandard package). Then they are stored as binary: values larger than
+MIN_COMPRESS_BYTES are zstd frames compressed with the active trained
+dictionary (compression_dictionaries), smaller ones as plain UTF-8 JSON.
+Reads accept both, plus legacy JSON text/values, so rows can be converted
+gradually; migrate_compress_json.py converts the columns and recompresses
+every row.
+
+Order on PostgreSQL: install zstandard, run migrate_compress_json.py (with
+JSON_COMPRESSION=zstd), then start the app with JSON_COMPRESSION=zstd.
+Compressed values are bytes and cannot be bound into JSON-typed columns, so
+init_db refuses to start while any column is still JSON. New databases
+are created with BYTEA columns directly.
+
+Reads cost more: on the synthetic catalogue of
+benchmarks/bench_json_compression.py, read+decode is ~70 us/row for plain
+JSON, ~89 with zstd and ~109 with a dictionary (~38 us/row extra).
+
+Each zstd frame records the id of its dictionary, so values written with
+an older dictionary stay readable after retraining.
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from sqlalchemy import JSON, LargeBinary, text
+from sqlalchemy.types import TypeDecorator
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+MIN_COMPRESS_BYTES = 128
+DEFAULT_LEVEL = 6
+
+
+# Read once: the column storage type cannot change while the process runs
+ENABLED = os.getenv("JSON_COMPRESSION", "").lower() == "zstd"
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError(
+            "JSON_COMPRESSION=zstd needs the zstandard package (pip install zstandard)")
+    return zstandard
+
+
+def serialize(value: Any) -> bytes:
+    """Compact JSON, keys in their original order (the exports rely on it)"""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class DictionaryRegistry:
+    """Trained dictionaries by id, loaded from compression_dictionaries"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()  # zstd (de)compressors are not thread-safe
+        self.dictionaries: Dict[int, Any] = {}
+        self.active_id: Optional[int] = None
+        self.level = int(os.getenv("JSON_COMPRESSION_LEVEL", DEFAULT_LEVEL))
+        self.loaded = False
+
+    def load(self, bind):
+        """(Re)load every dictionary; the newest one is used for writes"""
+        zstd = _zstd()
+        with bind.connect() as conn:
+            rows = conn.execute(text(
+                "SELECT id, data FROM compression_dictionaries ORDER BY created_at, id")).fetchall()
+        with self._lock:
+            self.dictionaries = {row[0]: zstd.ZstdCompressionDict(bytes(row[1])) for row in rows}
+            self.active_id = rows[-1][0] if rows else None
+            self._local = threading.local()
+            self.loaded = True
+
+    def register(self, dict_id: int, data: bytes, activate: bool = True):
+        """Add a dictionary that was just trained in this process"""
+        zstd = _zstd()
+        with self._lock:
+            self.dictionaries[dict_id] = zstd.ZstdCompressionDict(data)
+            if activate:
+                self.active_id = dict_id
+            self._local = threading.local()
+            self.loaded = True
+
+    def _ensure_loaded(self):
+        if not self.loaded:
+            from database.database import engine
+            self.load(engine)
+
+    def _compressor(self):
+        local = self._local
+        key = (self.active_id, self.level)
+        compressor = getattr(local, "compressor", None)
+        if compressor is None or local.compressor_key != key:
+            zstd = _zstd()
+            dictionary = self.dictionaries.get(self.active_id)
+            compressor = zstd.ZstdCompressor(level=self.level, dict_data=dictionary)
+            local.compressor, local.compressor_key = compressor, key
+        return compressor
+
+    def _decompressor(self, dict_id: int):
+        decompressors = getattr(self._local, "decompressors", None)
+        if decompressors is None:
+            decompressors = self._local.decompressors = {}
+        decompressor = decompressors.get(dict_id)
+        if decompressor is None:
+            zstd = _zstd()
+            if dict_id and dict_id not in self.dictionaries:
+                raise LookupError(
+                    f"Compression dictionary {dict_id} is not loaded (restart to pick up new dictionaries)")
+            decompressor = zstd.ZstdDecompressor(dict_data=self.dictionaries.get(dict_id))
+            decompressors[dict_id] = decompressor
+        return decompressor
+
+    def compress(self, raw: bytes) -> bytes:
+        self._ensure_loaded()
+        return self._compressor().compress(raw)
+
+    def decompress(self, data: bytes) -> bytes:
+        self._ensure_loaded()
+        dict_id = _zstd().get_frame_parameters(data).dict_id
+        return self._decompressor(dict_id).decompress(data)
+
+
+registry = DictionaryRegistry()
+
+# Set to False to write plain JSON bytes (used when decompressing a database)
+compress_writes = True
+
+
+def encode(value: Any) -> bytes:
+    raw = serialize(value)
+    if compress_writes and len(raw) >= MIN_COMPRESS_BYTES:
+        compressed = registry.compress(raw)
+        if len(compressed) < len(raw):
+            return compressed
+    return raw
+
+
+def decode(data: Any) -> Any:
+    if data is None or isinstance(data, (dict, list, int, float, bool)):
+        return data  # Not converted yet: native JSON column value
+    if isinstance(data, str):
+        return json.loads(data)  # Not converted yet: JSON text (SQLite)
+    data = bytes(data)
+    if data.startswith(ZSTD_MAGIC):
+        data = registry.decompress(data)
+    return json.loads(data)
+
+
+class _RawBinary(LargeBinary):
+    """Binary without result coercion: unconverted rows may still hold JSON text"""
+
+    def result_processor(self, dialect, coltype):
+        return None
+
+
+class CompressedJSON(TypeDecorator):
+    """JSON column that is zstd-compressed when JSON_COMPRESSION=zstd"""
+
+    impl = JSON
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if ENABLED:
+            return dialect.type_descriptor(_RawBinary())
+        return dialect.type_descriptor(JSON())
+
+    def process_bind_param(self, value, dialect):
+        if not ENABLED:
+            return value
+        return None if value is None else encode(value)
+
+    def process_result_value(self, value, dialect):
+        if not ENABLED:
+            return value
+        return decode(value)
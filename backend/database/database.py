@@ -55,7 +55,7 @@ def get_db():
 # Initialize database
 
 
-def init_db():
+def init_db(check_compression: bool = True):
     from database.models import Base
     Base.metadata.create_all(bind=engine)
 
@@ -93,4 +93,76 @@ def init_db():
             if "already exists" not in str(e).lower() and "duplicate column" not in str(e).lower():
                 print(f"Note: {e}")
 
+        # Columns added to existing tables after their first release
+        for table, column, column_type in [
+            ("bonus_templates", "schedule_from_at", "TIMESTAMP NULL"),
+            ("bonus_templates", "schedule_to_at", "TIMESTAMP NULL"),
+            ("bonus_templates", "schedule_value", "JSON NULL"),
+            ("bonus_templates", "schedule_timezone", "VARCHAR(50) NULL"),
+            ("bonus_templates", "trigger_schedule", "VARCHAR(100) NULL"),
+            ("bonus_templates", "pricing_sources", "JSON NULL"),
+            ("bonus_templates", "rollup_contribution", "JSON NULL"),
+            ("bonus_templates", "proportions_set_id", "INTEGER NULL"),
+            ("bonus_templates", "content_hash", "VARCHAR(64) NULL"),
+            ("stable_configs", "casino_proportions_set_id", "INTEGER NULL"),
+            ("stable_configs", "live_casino_proportions_set_id", "INTEGER NULL"),
+            ("bonus_translations", "name_hash", "VARCHAR(64) NULL"),
+            ("currency_references", "rounding_step", "FLOAT NULL"),
+            ("bonus_translations", "description_hash", "VARCHAR(64) NULL"),
+        ]:
+            try:
+                conn.execute(
+                    text(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}"))
+                conn.commit()
+                print(f"✅ Added {column} column to {table}")
+            except Exception as e:
+                conn.rollback()
+                if "already exists" not in str(e).lower() and "duplicate column" not in str(e).lower():
+                    print(f"Note: {e}")
+
+        # Indexes on existing tables (create_all only indexes new tables)
+        for index_sql in [
+            "CREATE INDEX IF NOT EXISTS ix_bonus_templates_created_at ON bonus_templates (created_at)",
+            "CREATE INDEX IF NOT EXISTS ix_bonus_templates_updated_at ON bonus_templates (updated_at)",
+            "CREATE INDEX IF NOT EXISTS ix_bonus_templates_schedule_window ON bonus_templates (schedule_from_at, schedule_to_at)",
+            "CREATE INDEX IF NOT EXISTS ix_bonus_translations_name_hash ON bonus_translations (name_hash)",
+            "CREATE INDEX IF NOT EXISTS ix_bonus_translations_description_hash ON bonus_translations (description_hash)",
+            "CREATE INDEX IF NOT EXISTS ix_bonus_templates_proportions_set_id ON bonus_templates (proportions_set_id)",
+            "CREATE INDEX IF NOT EXISTS ix_bonus_templates_content_hash ON bonus_templates (content_hash)",
+        ]:
+            try:
+                conn.execute(text(index_sql))
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"Note: {e}")
+
+    # Currency rates live in currency_references; start from the defaults
+    from services.currency_registry import seed_currency_references
+    db = SessionLocal()
+    try:
+        seeded = seed_currency_references(db)
+        if seeded:
+            print(f"✅ Seeded {seeded} currency references")
+    except Exception as e:
+        db.rollback()
+        print(f"Note: {e}")
+    finally:
+        db.close()
+
+    # Compressed JSON columns (opt-in): load the trained dictionaries up front
+    from database.compressed_json import ENABLED, registry
+    if ENABLED:
+        if check_compression:
+            # PostgreSQL would bind compressed bytes into JSON-typed columns
+            from services.json_compression import unconverted_columns
+            unconverted = unconverted_columns(engine)
+            if unconverted:
+                raise RuntimeError(
+                    "JSON_COMPRESSION=zstd but these columns are not converted yet: "
+                    f"{', '.join(unconverted)}. Run JSON_COMPRESSION=zstd python "
+                    "migrate_compress_json.py first (or unset JSON_COMPRESSION)")
+        registry.load(engine)
+        print(f"✅ JSON compression on ({len(registry.dictionaries)} dictionaries)")
+
     print("✅ Database initialized")
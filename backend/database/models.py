@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, JSON, Text
+from sqlalchemy import Column, Integer, BigInteger, String, Float, Boolean, DateTime, ForeignKey, JSON, LargeBinary, Text, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
+from database.compressed_json import CompressedJSON
+
 Base = declarative_base()
 
 
@@ -30,6 +32,11 @@ class StableConfig(Base):
     # Proportions stored as text (JSON strings)
     casino_proportions = Column(Text, default='')
     live_casino_proportions = Column(Text, default='')
+    # Shared sets holding the same maps (interned on save)
+    casino_proportions_set_id = Column(Integer, ForeignKey(
+        "proportions_sets.id"), nullable=True)
+    live_casino_proportions_set_id = Column(Integer, ForeignKey(
+        "proportions_sets.id"), nullable=True)
 
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow,
@@ -55,10 +62,22 @@ class BonusTemplate(Base):
     schedule_from = Column(String(50))  # "21-11-2025 10:00"
     schedule_to = Column(String(50))    # "28-11-2025 22:59"
 
+    # Normalized UTC copies of schedule_from/schedule_to, set on every write
+    # (services/template_sync.py). Used for "active at time T" range queries.
+    schedule_from_at = Column(DateTime, nullable=True)
+    schedule_to_at = Column(DateTime, nullable=True)
+
+    # Recurring schedules (optional)
+    # "day" → ["friday", ...], "date" → ["01", "15", ...]
+    schedule_value = Column(JSON, nullable=True)
+    schedule_timezone = Column(String(50), nullable=True)  # "CET"
+    # Quartz cron for "cron" triggers, e.g. "00 00 09 ? * * *"
+    trigger_schedule = Column(String(100), nullable=True)
+
     # TRIGGER - Multilingual (stored as JSON)
     # Structure: {"*": "default", "en": "...", "de": "...", "GBP_en": "...", etc.}
-    trigger_name = Column(JSON)
-    trigger_description = Column(JSON)
+    trigger_name = Column(CompressedJSON)
+    trigger_description = Column(CompressedJSON)
 
     trigger_type = Column(String(50))  # "deposit", "reload", "cashback", etc.
     trigger_iterations = Column(Integer)  # How many times can be claimed
@@ -66,7 +85,7 @@ class BonusTemplate(Base):
 
     # TRIGGER - Minimums (per currency)
     # Structure: {"*": 25, "EUR": 25, "USD": 25, "GBP": 25, ...}
-    minimum_amount = Column(JSON)
+    minimum_amount = Column(CompressedJSON)
 
     # TRIGGER - Restricted countries (optional array)
     # Structure: ["BR", "AU", "NZ", ...]
@@ -78,34 +97,38 @@ class BonusTemplate(Base):
 
     # CONFIG - Cost per FS (per currency)
     # Structure: {"EUR": 0.12, "USD": 0.12, ...}
-    cost = Column(JSON)
+    cost = Column(CompressedJSON)
 
     # CONFIG - Multiplier (per currency)
     # Structure: {"EUR": 1.44, "USD": 1.44, ...}
-    multiplier = Column(JSON)
+    multiplier = Column(CompressedJSON)
 
     # CONFIG - Maximum bets per currency
     # Structure: {"EUR": 600, "USD": 600, ...}
-    maximum_bets = Column(JSON)
+    maximum_bets = Column(CompressedJSON)
 
     # CONFIG - Betting & Wagering
     percentage = Column(Float)  # 200 for 200% bonus
     wagering_multiplier = Column(Float)  # 15 for x15 wager requirement
 
     # Stake limits per currency
-    minimum_stake_to_wager = Column(JSON)  # {"*": 0.5, "EUR": 0.5, ...}
-    maximum_stake_to_wager = Column(JSON)  # {"*": 5, "EUR": 5, ...}
+    minimum_stake_to_wager = Column(CompressedJSON)  # {"*": 0.5, "EUR": 0.5, ...}
+    maximum_stake_to_wager = Column(CompressedJSON)  # {"*": 5, "EUR": 5, ...}
 
     # Maximum bonus per currency
-    maximum_amount = Column(JSON)  # {"*": 300, "EUR": 300, ...}
+    maximum_amount = Column(CompressedJSON)  # {"*": 300, "EUR": 300, ...}
 
     # Proportions (game-to-percentage mappings, only for cashback/reload)
     # Structure: {"SPINOMENAL.1 Reel Egypt": 0, "ROULETTE": 20, ...}
-    # Optional, only for bonus types that need it
-    proportions = Column(JSON, nullable=True, default=None)
+    # Optional, only for bonus types that need it. Stored by reference to a
+    # shared ProportionsSet; the column only holds values not yet interned
+    # (see the `proportions` property and services/proportions_sets.py)
+    proportions_inline = Column("proportions", CompressedJSON, nullable=True, default=None)
+    proportions_set_id = Column(Integer, ForeignKey(
+        "proportions_sets.id"), nullable=True, index=True)
 
     # Withdrawal limits per currency (in units of bonus, e.g., 3 = 3x bonus)
-    maximum_withdraw = Column(JSON)  # {"*": 3, "EUR": 3, ...}
+    maximum_withdraw = Column(CompressedJSON)  # {"*": 3, "EUR": 3, ...}
 
     # CONFIG - Flags
     include_amount_on_target_wager = Column(Boolean, default=True)
@@ -134,13 +157,60 @@ class BonusTemplate(Base):
     # User notes
     notes = Column(Text, nullable=True)
 
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Pricing tables the per-currency fields were copied from
+    # Structure: {"cost": {"provider": "PRAGMATIC", "table": "cost", "table_id": "1"}, ...}
+    pricing_sources = Column(JSON, nullable=True)
+
+    # What this template currently adds to template_rollups (maintained by
+    # sync_template_derived, so the next write can subtract it)
+    rollup_contribution = Column(JSON, nullable=True)
+
+    # sha256 of the canonical trigger/config/translations, without id and
+    # dates (services/duplicate_service.py); equal hashes are duplicates
+    content_hash = Column(String(64), nullable=True, index=True)
+
+    # Indexed: month lists and the month overview filter on created_at ranges
+    created_at = Column(DateTime, default=datetime.utcnow,
+                        nullable=False, index=True)
+    # Indexed: max(updated_at) stamps cached catalogue indexes (conflicts)
     updated_at = Column(DateTime, default=datetime.utcnow,
-                        onupdate=datetime.utcnow)
+                        onupdate=datetime.utcnow, index=True)
 
     translations = relationship(
         "BonusTranslation", back_populates="template", cascade="all, delete-orphan")
 
+    # Normalized copies of segments/restricted_countries (maintained by template_sync)
+    segment_links = relationship(
+        "BonusTemplateSegment", cascade="all, delete-orphan")
+    country_links = relationship(
+        "BonusTemplateCountry", cascade="all, delete-orphan")
+    pricing_links = relationship(
+        "BonusTemplatePricingSource", cascade="all, delete-orphan")
+    currency_values = relationship(
+        "TemplateCurrencyValue", cascade="all, delete-orphan")
+
+    proportions_set = relationship("ProportionsSet")
+
+    __table_args__ = (
+        Index("ix_bonus_templates_schedule_window",
+              "schedule_from_at", "schedule_to_at"),
+    )
+
+    @property
+    def proportions(self):
+        """Proportions map: the referenced shared set, or a not yet interned value"""
+        if self.proportions_set_id is not None or self.proportions_set is not None:
+            from services.proportions_sets import template_set_entries
+            return template_set_entries(self)
+        return self.proportions_inline
+
+    @proportions.setter
+    def proportions(self, value):
+        # Interned into a shared set by sync_template_derived
+        self.proportions_inline = value
+        self.proportions_set = None
+        self.proportions_set_id = None
+
     def __repr__(self):
         return f"<BonusTemplate {self.id}>"
 
@@ -169,6 +239,12 @@ class BonusTranslation(Base):
     # Translated description
     description = Column(Text, nullable=True)
 
+    # Content hashes into translation_memory (maintained by services/translation_memory)
+    name_hash = Column(String(64), ForeignKey(
+        "translation_memory.hash"), nullable=True, index=True)
+    description_hash = Column(String(64), ForeignKey(
+        "translation_memory.hash"), nullable=True, index=True)
+
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow,
                         onupdate=datetime.utcnow)
@@ -179,6 +255,119 @@ class BonusTranslation(Base):
         return f"<BonusTranslation {self.template_id}:{self.language}>"
 
 
+class TranslationMemory(Base):
+    """
+    Content-addressed translation text: sha256 of the text -> the text.
+    Identical names/descriptions across languages, currency variants and
+    campaign re-runs are stored once.
+    """
+    __tablename__ = "translation_memory"
+
+    hash = Column(String(64), primary_key=True)
+    text = Column(Text, nullable=False)
+    size = Column(Integer, nullable=False)  # UTF-8 bytes
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<TranslationMemory {self.hash[:12]}>"
+
+
+class BonusTemplateSegment(Base):
+    """
+    One row per (template, segment): inverted index over BonusTemplate.segments.
+    """
+    __tablename__ = "bonus_template_segments"
+
+    template_id = Column(String(255), ForeignKey(
+        "bonus_templates.id", ondelete="CASCADE"), primary_key=True)
+    segment = Column(String(100), primary_key=True, index=True)
+
+    def __repr__(self):
+        return f"<BonusTemplateSegment {self.template_id}:{self.segment}>"
+
+
+class BonusTemplateCountry(Base):
+    """
+    One row per (template, restricted country): inverted index over
+    BonusTemplate.restricted_countries.
+    """
+    __tablename__ = "bonus_template_countries"
+
+    template_id = Column(String(255), ForeignKey(
+        "bonus_templates.id", ondelete="CASCADE"), primary_key=True)
+    country = Column(String(10), primary_key=True, index=True)
+
+    def __repr__(self):
+        return f"<BonusTemplateCountry {self.template_id}:{self.country}>"
+
+
+class BonusTemplatePricingSource(Base):
+    """
+    One row per (template, field) copied from a StableConfig pricing table:
+    index from a table back to the templates that depend on it.
+    """
+    __tablename__ = "bonus_template_pricing_sources"
+
+    template_id = Column(String(255), ForeignKey(
+        "bonus_templates.id", ondelete="CASCADE"), primary_key=True)
+    field = Column(String(50), primary_key=True)  # Template column, e.g. "cost"
+    provider = Column(String(50), nullable=False)  # StableConfig row, e.g. "PRAGMATIC", "DEFAULT"
+    table_kind = Column(String(50), nullable=False)  # StableConfig column, e.g. "cost"
+    table_id = Column(String(50), nullable=False)
+
+    __table_args__ = (
+        Index("ix_pricing_sources_table", "provider", "table_kind", "table_id"),
+    )
+
+    def __repr__(self):
+        return f"<BonusTemplatePricingSource {self.template_id}:{self.field} <- {self.provider}/{self.table_kind}/{self.table_id}>"
+
+
+class ProportionsSet(Base):
+    """
+    Immutable game proportions map shared by reference.
+    Identified by the hash of its content: saving the same map again reuses
+    the row. Named sets (e.g. StableConfig casino proportions) get a new
+    version whenever their content changes.
+    """
+    __tablename__ = "proportions_sets"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    content_hash = Column(String(64), nullable=False, unique=True, index=True)
+    name = Column(String(100), nullable=True, index=True)  # e.g. "DEFAULT/casino"
+    version = Column(Integer, nullable=False, default=1)
+    # Structure: {"SPINOMENAL.1 Reel Egypt": 0, "ROULETTE": 20, ...}
+    entries = Column(CompressedJSON, nullable=False)
+    size = Column(Integer, nullable=False, default=0)  # Number of entries
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<ProportionsSet {self.id} {self.name or ''} v{self.version} ({self.size} entries)>"
+
+
+class TemplateCurrencyValue(Base):
+    """
+    Per-currency template values in columnar form (one row per template,
+    field and currency), so SQL can filter and aggregate on them.
+    Mirrors the JSON fields; maintained by sync_template_derived.
+    """
+    __tablename__ = "template_currency_values"
+
+    template_id = Column(String(255), ForeignKey(
+        "bonus_templates.id", ondelete="CASCADE"), primary_key=True)
+    field = Column(String(50), primary_key=True)  # e.g. "maximum_amount"
+    currency = Column(String(20), primary_key=True)  # e.g. "EUR", "*"
+    value = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("ix_currency_values_lookup", "field", "currency", "value"),
+    )
+
+    def __repr__(self):
+        return f"<TemplateCurrencyValue {self.template_id}:{self.field}[{self.currency}]={self.value}>"
+
+
 class CurrencyReference(Base):
     """
     Reference sheet for currency conversion rates and deposit limits.
@@ -191,6 +380,8 @@ class CurrencyReference(Base):
     eur_rate = Column(Float, nullable=False)  # 1 EUR = X in this currency
     min_deposit = Column(Float, nullable=False)
     max_deposit = Column(Float, nullable=True)
+    # Converted amounts are rounded to a multiple of this (1 = whole units)
+    rounding_step = Column(Float, nullable=True, default=1.0)
 
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow,
@@ -200,6 +391,53 @@ class CurrencyReference(Base):
         return f"<CurrencyReference {self.currency}: 1 EUR = {self.eur_rate}>"
 
 
+class CompressionDictionary(Base):
+    """
+    zstd dictionary trained on the catalogue for CompressedJSON columns
+    (database/compressed_json.py). The newest one compresses new writes;
+    older ones are kept so values compressed with them stay readable.
+    """
+    __tablename__ = "compression_dictionaries"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=False)  # zstd dictionary id
+    data = Column(LargeBinary, nullable=False)
+    samples = Column(Integer, nullable=False, default=0)  # Values it was trained on
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<CompressionDictionary {self.id} ({len(self.data or b'')} bytes)>"
+
+
+class BackgroundJob(Base):
+    """
+    Long-running job (re-pricing, optimization sweeps) with its progress.
+    Runs in the background after the request that created it returns.
+    """
+    __tablename__ = "background_jobs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String(50), nullable=False, index=True)  # "repricing", ...
+    # "queued", "running", "completed", "failed", "cancelled"
+    status = Column(String(20), nullable=False, default="queued", index=True)
+    params = Column(JSON, default={})
+
+    total = Column(Integer, default=0)
+    processed = Column(Integer, default=0)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    cancel_requested = Column(Boolean, default=False, nullable=False)
+
+    created_by = Column(String(100), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow,
+                        onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<BackgroundJob {self.id} {self.kind}: {self.status}>"
+
+
 class CustomLanguage(Base):
     """
     Stores user-defined custom languages for translations.
@@ -241,3 +479,31 @@ class User(Base):
 
     def __repr__(self):
         return f"<User {self.username} ({self.role})>"
+
+
+class TemplateRollup(Base):
+    """
+    Pre-aggregated template terms per month/provider/bonus_type/trigger_type
+    for the Optimization dashboard. Kept up to date incrementally on every
+    template write; averages are sum / count.
+    """
+    __tablename__ = "template_rollups"
+
+    month = Column(String(7), primary_key=True)  # "2025-11", by created_at
+    provider = Column(String(50), primary_key=True, default="")
+    bonus_type = Column(String(50), primary_key=True, default="")
+    trigger_type = Column(String(50), primary_key=True, default="")
+
+    templates = Column(Integer, nullable=False, default=0)
+    percentage_sum = Column(Float, nullable=False, default=0)
+    percentage_count = Column(Integer, nullable=False, default=0)
+    wagering_sum = Column(Float, nullable=False, default=0)
+    wagering_count = Column(Integer, nullable=False, default=0)
+    maximum_amount_sum = Column(Float, nullable=False, default=0)  # EUR
+    maximum_amount_count = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, default=datetime.utcnow,
+                        onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<TemplateRollup {self.month} {self.provider}/{self.bonus_type}/{self.trigger_type}: {self.templates}>"
@@ -7,8 +7,17 @@ from contextlib import asynccontextmanager
 from api.bonus_templates import router as bonus_templates_router
 from api.stable_config import router as stable_config_router
 from api.custom_languages import router as custom_languages_router
+from api.events import router as events_router
+from api.schedule import router as schedule_router
+from api.translations import router as translations_router
+from api.currencies import router as currencies_router
+from api.jobs import router as jobs_router
+from api.optimization import router as optimization_router
+from api.analytics import router as analytics_router
+from api.proportions import router as proportions_router
 from api.auth import router as auth_router, require_auth
 from database.database import init_db
+from services.event_bus import set_event_bus
 
 
 @asynccontextmanager
@@ -20,6 +29,7 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     print("🛑 CAMPEON CRM API shutting down...")
+    set_event_bus(None)
 
 app = FastAPI(
     title="CAMPEON CRM API",
@@ -53,6 +63,22 @@ app.include_router(stable_config_router, prefix="/api",
                    tags=["stable-config"], dependencies=[Depends(require_auth)])
 app.include_router(custom_languages_router, prefix="/api",
                    tags=["custom-languages"], dependencies=[Depends(require_auth)])
+app.include_router(events_router, prefix="/api",
+                   tags=["events"], dependencies=[Depends(require_auth)])
+app.include_router(schedule_router, prefix="/api",
+                   tags=["schedule"], dependencies=[Depends(require_auth)])
+app.include_router(translations_router, prefix="/api",
+                   tags=["translations"], dependencies=[Depends(require_auth)])
+app.include_router(currencies_router, prefix="/api",
+                   tags=["currencies"], dependencies=[Depends(require_auth)])
+app.include_router(jobs_router, prefix="/api",
+                   tags=["jobs"], dependencies=[Depends(require_auth)])
+app.include_router(optimization_router, prefix="/api",
+                   tags=["optimization"], dependencies=[Depends(require_auth)])
+app.include_router(analytics_router, prefix="/api",
+                   tags=["analytics"], dependencies=[Depends(require_auth)])
+app.include_router(proportions_router, prefix="/api",
+                   tags=["proportions"], dependencies=[Depends(require_auth)])
 
 
 @app.get("/")
@@ -0,0 +1,78 @@
+"""
+Compress the large JSON columns (translations, per-currency maps, proportions)
+with a zstd dictionary trained on the catalogue.
+Needs the zstandard package and JSON_COMPRESSION=zstd, from the backend directory:
+    JSON_COMPRESSION=zstd python migrate_compress_json.py
+On PostgreSQL run it before starting the app with JSON_COMPRESSION=zstd:
+until the columns are BYTEA the app refuses to start with compression on.
+Converts the columns to binary (PostgreSQL), trains a dictionary and rewrites
+every row with it. Safe to re-run; re-running trains a new dictionary
+(pass --no-train to reuse the active one).
+    --dict-size N   dictionary size in bytes (default 32768)
+    --decompress    rewrite rows as plain JSON and convert the columns back;
+                    unset JSON_COMPRESSION afterwards
+"""
+
+import sys
+
+from database.compressed_json import ENABLED, registry
+from database.database import SessionLocal, init_db
+from services.json_compression import (
+    DEFAULT_DICT_SIZE, convert_column_storage, rewrite_rows, storage_sizes, train_dictionary,
+)
+
+
+def _print_sizes(db, label):
+    sizes = storage_sizes(db)
+    print(f"   {label}: {sum(sizes.values()) / 1024:.1f} KiB")
+    for column, size in sizes.items():
+        print(f"      {column}: {size / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Compressing JSON columns")
+    print("=" * 60)
+
+    if not ENABLED:
+        print("❌ Set JSON_COMPRESSION=zstd (the app must run with it as well)")
+        exit(1)
+
+    dict_size = DEFAULT_DICT_SIZE
+    if "--dict-size" in sys.argv:
+        dict_size = int(sys.argv[sys.argv.index("--dict-size") + 1])
+
+    # The columns may still be JSON here: converting them is this script's job
+    init_db(check_compression=False)
+
+    db = SessionLocal()
+    try:
+        if "--decompress" in sys.argv:
+            counts = rewrite_rows(db, compress=False)
+            print(f"✅ Rewrote {sum(counts.values())} rows as plain JSON")
+            for column in convert_column_storage(db, to_binary=False):
+                print(f"✅ {column} → JSON")
+            print("   Now unset JSON_COMPRESSION and restart the app")
+            exit(0)
+
+        for column in convert_column_storage(db, to_binary=True):
+            print(f"✅ {column} → BYTEA")
+        _print_sizes(db, "Before")
+
+        if "--no-train" not in sys.argv:
+            dictionary = train_dictionary(db, dict_size)
+            print(f"✅ Trained dictionary {dictionary.id} "
+                  f"({len(dictionary.data)} bytes, {dictionary.samples} values)")
+        elif registry.active_id is None:
+            print("⚠️  No trained dictionary yet: compressing without one")
+
+        counts = rewrite_rows(db)
+        for table, count in counts.items():
+            print(f"✅ Recompressed {count} rows of {table}")
+        _print_sizes(db, "After")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error during compression: {e}")
+        exit(1)
+    finally:
+        db.close()
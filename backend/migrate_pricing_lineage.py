@@ -0,0 +1,44 @@
+"""
+Backfill pricing-table lineage for templates created before pricing_sources
+existed: each per-currency field is matched against the StableConfig tables
+and attributed to the single table it equals (ambiguous fields are skipped).
+Run once after deploying, from the backend directory:
+    python migrate_pricing_lineage.py
+Safe to re-run; templates that already record pricing_sources are left alone.
+"""
+
+from database.database import SessionLocal, init_db
+from database.models import BonusTemplate, StableConfig
+from services.pricing_lineage import infer_pricing_sources
+from services.template_sync import derived_load_options, sync_template_derived
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Backfilling pricing-table lineage")
+    print("=" * 60)
+
+    # Adds the pricing_sources column and index table first
+    init_db()
+
+    db = SessionLocal()
+    try:
+        configs = db.query(StableConfig).all()
+        templates = db.query(BonusTemplate).options(
+            *derived_load_options()).filter(BonusTemplate.pricing_sources == None).all()
+
+        linked = 0
+        for template in templates:
+            sources = infer_pricing_sources(template, configs)
+            if sources:
+                template.pricing_sources = sources
+                sync_template_derived(db, template)
+                linked += 1
+                print(f"  🔗 {template.id}: {', '.join(sorted(sources))}")
+        db.commit()
+        print(f"✅ Linked {linked} of {len(templates)} templates to pricing tables")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error during backfill: {e}")
+        exit(1)
+    finally:
+        db.close()
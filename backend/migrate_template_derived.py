@@ -0,0 +1,38 @@
+"""
+Backfill derived template data (normalized schedule window columns,
+segment/restricted-country/pricing-source index tables, per-currency value
+table, shared proportions sets, analytics rollups, duplicate-detection
+content hashes).
+Run once after deploying, from the backend directory:
+    python migrate_template_derived.py
+Safe to re-run; every template is recomputed from its source fields.
+Pass --rebuild-rollups to recompute the analytics rollups from scratch.
+"""
+
+import sys
+
+from database.database import SessionLocal, init_db
+from services.analytics_rollups import reset_rollups
+from services.template_sync import backfill_templates
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Backfilling derived bonus template data")
+    print("=" * 60)
+
+    # Adds any missing columns/indexes first
+    init_db()
+
+    db = SessionLocal()
+    try:
+        if "--rebuild-rollups" in sys.argv:
+            reset_rollups(db)
+            print("🧹 Cleared analytics rollups")
+        count = backfill_templates(db)
+        print(f"✅ Recomputed derived data for {count} templates")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error during backfill: {e}")
+        exit(1)
+    finally:
+        db.close()
@@ -0,0 +1,39 @@
+"""
+Index existing translations into the content-addressed translation memory.
+Run once after deploying, from the backend directory:
+    python migrate_translation_memory.py
+Safe to re-run; also removes memory entries no translation references.
+"""
+
+from database.database import SessionLocal, init_db
+from services.translation_memory import (
+    backfill_translation_memory,
+    prune_translation_memory,
+    storage_report,
+)
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Building translation memory")
+    print("=" * 60)
+
+    # Adds the hash columns/table first
+    init_db()
+
+    db = SessionLocal()
+    try:
+        count = backfill_translation_memory(db)
+        print(f"✅ Indexed {count} translations")
+        pruned = prune_translation_memory(db)
+        print(f"✅ Removed {pruned} unreferenced memory entries")
+        report = storage_report(db)
+        print(f"📊 {report['unique_texts']} unique texts, "
+              f"{report['inline_bytes']} bytes stored inline, "
+              f"{report['duplicated_bytes']} of them duplicated "
+              f"(memory: {report['memory_bytes']} bytes)")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error building translation memory: {e}")
+        exit(1)
+    finally:
+        db.close()
@@ -0,0 +1,152 @@
+"""
+Incrementally maintained analytics rollups.
+
+template_rollups holds sums and counts of percentage, wagering multiplier
+and EUR maximum amount per (month, provider, bonus_type, trigger_type).
+Every template remembers what it added (rollup_contribution); on each write
+sync_template_derived subtracts the old contribution and adds the new one
+with atomic upserts, so the dashboard reads a table whose size depends on
+the number of buckets, not the number of templates.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from database.models import BonusTemplate, TemplateRollup
+
+DIMENSIONS = ("month", "provider", "bonus_type", "trigger_type")
+
+# (rollup metric, template attribute)
+METRICS = (
+    ("percentage", "percentage"),
+    ("wagering", "wagering_multiplier"),
+    ("maximum_amount", "maximum_amount"),
+)
+
+
+def _number(value) -> Optional[float]:
+    if isinstance(value, dict):
+        value = value.get("EUR", value.get("*"))
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return None
+
+
+def template_contribution(template: BonusTemplate) -> Dict[str, Any]:
+    """Bucket key and metric values one template adds to the rollups"""
+    created_at = template.created_at or datetime.utcnow()
+    return {
+        "key": [created_at.strftime("%Y-%m"), template.provider or "",
+                template.bonus_type or "", template.trigger_type or ""],
+        **{metric: _number(getattr(template, attribute)) for metric, attribute in METRICS},
+    }
+
+
+def _deltas(contribution: Dict[str, Any], sign: int) -> Dict[str, Any]:
+    deltas = {"templates": sign}
+    for metric, _ in METRICS:
+        value = contribution.get(metric)
+        deltas[f"{metric}_sum"] = sign * value if value is not None else 0.0
+        deltas[f"{metric}_count"] = sign if value is not None else 0
+    return deltas
+
+
+def apply_contribution(db: Session, contribution: Optional[Dict[str, Any]], sign: int):
+    """Add (sign=1) or subtract (sign=-1) a contribution with one atomic upsert"""
+    if not contribution:
+        return
+    key = dict(zip(DIMENSIONS, contribution["key"]))
+    deltas = _deltas(contribution, sign)
+    table = TemplateRollup.__table__
+    now = datetime.utcnow()
+
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+        statement = insert(table).values(**key, **deltas, updated_at=now)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(DIMENSIONS),
+            set_={**{name: table.c[name] + statement.excluded[name] for name in deltas},
+                  "updated_at": now},
+        )
+        db.execute(statement)
+    else:
+        updated = db.query(TemplateRollup).filter_by(**key).update(
+            {**{getattr(TemplateRollup, name): getattr(TemplateRollup, name) + delta
+                for name, delta in deltas.items()}, TemplateRollup.updated_at: now},
+            synchronize_session=False)
+        if not updated:
+            db.execute(table.insert().values(**key, **deltas, updated_at=now))
+
+    if sign < 0:
+        # Drop buckets that no longer have templates
+        db.query(TemplateRollup).filter_by(**key).filter(
+            TemplateRollup.templates <= 0).delete(synchronize_session=False)
+
+
+def sync_template_rollup(db: Session, template: BonusTemplate):
+    """Move a template's contribution to its current values (call before commit)"""
+    if template.created_at is None:
+        # Fix the month now; the insert would otherwise stamp it later
+        template.created_at = datetime.utcnow()
+    contribution = template_contribution(template)
+    if contribution == template.rollup_contribution:
+        return
+    apply_contribution(db, template.rollup_contribution, -1)
+    apply_contribution(db, contribution, 1)
+    template.rollup_contribution = contribution
+
+
+def remove_template_rollup(db: Session, template: BonusTemplate):
+    """Subtract a template that is being deleted"""
+    apply_contribution(db, template.rollup_contribution, -1)
+
+
+def reset_rollups(db: Session):
+    """Empty the rollups; the next backfill_templates() rebuilds them from scratch"""
+    db.query(TemplateRollup).delete(synchronize_session=False)
+    db.query(BonusTemplate).update({BonusTemplate.rollup_contribution: None},
+                                   synchronize_session=False)
+    db.commit()
+
+
+def query_rollups(db: Session, group_by: Iterable[str] = DIMENSIONS,
+                  from_month: Optional[str] = None, to_month: Optional[str] = None,
+                  **filters: Optional[str]) -> List[Dict[str, Any]]:
+    """Rollup rows re-aggregated over `group_by` with averages"""
+    group_by = [dimension for dimension in DIMENSIONS if dimension in set(group_by)]
+    columns = [getattr(TemplateRollup, dimension) for dimension in group_by]
+    sums = [func.sum(TemplateRollup.templates)]
+    for metric, _ in METRICS:
+        sums.append(func.sum(getattr(TemplateRollup, f"{metric}_sum")))
+        sums.append(func.sum(getattr(TemplateRollup, f"{metric}_count")))
+
+    query = db.query(*columns, *sums)
+    if from_month:
+        query = query.filter(TemplateRollup.month >= from_month)
+    if to_month:
+        query = query.filter(TemplateRollup.month <= to_month)
+    for dimension, value in filters.items():
+        if value is not None:
+            query = query.filter(getattr(TemplateRollup, dimension) == value)
+    if columns:
+        query = query.group_by(*columns).order_by(*columns)
+
+    rows = []
+    for row in query.all():
+        values = list(row)
+        item = dict(zip(group_by, values[:len(group_by)]))
+        totals = values[len(group_by):]
+        if not totals[0]:
+            continue
+        item["templates"] = int(totals[0])
+        for i, (metric, _) in enumerate(METRICS):
+            total, count = totals[1 + 2 * i], totals[2 + 2 * i]
+            item[f"avg_{metric}"] = round(total / count, 4) if count else None
+        rows.append(item)
+    return rows
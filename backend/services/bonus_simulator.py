@@ -0,0 +1,350 @@
+"""
+Monte Carlo cost simulation for bonus terms.
+
+Every simulated player gets a deposit, a bonus (percentage match capped at
+maximum_amount, or the winnings of the free spins: maximum_bets spins of
+`cost`, or deposit x multiplier / cost spins up to maximum_bets when the
+template has a deposit multiplier) and then wagers towards the target
+in ROUNDS_PER_PLAYER rounds of bets. Each round's net result is the normal
+approximation of its bets (mean stake * (rtp - 1) per bet, volatility
+stake * sqrt(bets)), so a player's whole wager sequence is one row of a
+(samples, rounds) matrix and all players of a currency are simulated with
+a handful of NumPy operations. A player who cannot cover a stake is busted;
+one who reaches the target withdraws the balance, capped at
+maximum_withdraw x bonus.
+
+The cost of a player is the bonus money the casino pays out: what the
+player withdraws beyond their own deposit, never negative (a player who
+loses part of the deposit costs nothing, the lost deposit is not counted
+as income).
+
+Player-behaviour samples (standard normal draws) are generated per block
+of BLOCK_SIZE players from child seeds of the request seed, so only one
+block is held in memory at a time and player i gets the same draws in
+every currency, every run size and the parameter sweeps. Runs above
+POOL_THRESHOLD_CELLS are split per currency over a process pool.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from services.currency_registry import get_currency_snapshot
+
+ROUNDS_PER_PLAYER = 100
+# Players evaluated per block (keeps the rounds matrix small)
+BLOCK_SIZE = 20_000
+MAX_SAMPLES = 1_000_000
+# samples x rounds x currencies above which currencies run in the process pool
+POOL_THRESHOLD_CELLS = 50_000_000
+PAYOUT_PERCENTILES = (50, 90, 99)
+
+# Player behaviour defaults; every key can be overridden per request
+DEFAULT_BEHAVIOUR = {
+    "rtp": 0.96,  # Average return per bet
+    "volatility": 3.0,  # Std of one bet's return, in stakes
+    "deposit_median": None,  # EUR; default 2x minimum deposit (at least 50)
+    "deposit_sigma": 0.8,  # Log-normal spread of deposits
+    "stake_fraction": 0.3,  # Position of the stake between minimum and maximum stake
+    "spins": 10,  # Free spins when the template has no maximum_bets
+    "contribution": None,  # Wagering contribution 0-1; default from proportions
+}
+
+
+def _amount(values: Any, currency: str) -> Optional[float]:
+    """Per-currency value with "*" / EUR fallback"""
+    if isinstance(values, (int, float)) and not isinstance(values, bool):
+        return float(values)
+    if not isinstance(values, dict):
+        return None
+    for key in (currency, "*", "EUR"):
+        value = values.get(key)
+        if isinstance(value, dict):
+            value = value.get("cap")
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+    return None
+
+
+def proportions_contribution(proportions: Any) -> float:
+    """
+    Wagering contribution of the game mix: mean of the positive proportions
+    (players avoid games that do not count), 1.0 without proportions.
+    """
+    if isinstance(proportions, str):
+        try:
+            proportions = json.loads(proportions)
+        except ValueError:
+            return 1.0
+    if not isinstance(proportions, dict):
+        return 1.0
+    values = [float(v) for v in proportions.values()
+              if isinstance(v, (int, float)) and not isinstance(v, bool) and v > 0]
+    if not values:
+        return 1.0
+    return min(1.0, sum(values) / len(values) / 100.0)
+
+
+def template_terms(template, currency: str, rate: float = 1.0) -> Dict[str, float]:
+    """Scalar bonus terms of a template (or a dict with the same fields) in one currency"""
+    get = template.get if isinstance(template, dict) else lambda name: getattr(template, name, None)
+    eur = lambda values: None if _amount(values, "EUR") is None else _amount(values, "EUR") * rate
+
+    def value(name):
+        raw = get(name)
+        if isinstance(raw, dict) and currency not in raw and "*" not in raw:
+            return eur(raw)
+        return _amount(raw, currency)
+
+    # Same defaults as the generated JSON ("*": 0.5 / 5)
+    minimum_stake = value("minimum_stake_to_wager") or 0.5
+    maximum_stake = value("maximum_stake_to_wager") or 5.0
+    return {
+        "percentage": float(get("percentage") or 0),
+        "wagering_multiplier": float(get("wagering_multiplier") or 0),
+        "minimum_amount": value("minimum_amount") or 0.0,
+        "maximum_amount": value("maximum_amount") or np.inf,
+        "minimum_stake": minimum_stake,
+        "maximum_stake": max(maximum_stake, minimum_stake),
+        # Multiple of the bonus; 0 = no cap
+        "maximum_withdraw": _amount(get("maximum_withdraw"), currency) or 0.0,
+        "cost": value("cost") or 0.0,
+        # Free spins per deposited unit x cost; 0 = fixed maximum_bets spins
+        "multiplier": _amount(get("multiplier"), currency) or 0.0,
+        "maximum_bets": _amount(get("maximum_bets"), currency) or 0.0,
+        "include_amount": 1.0 if get("include_amount_on_target_wager") in (None, True) else 0.0,
+        "cap_calculation": 1.0 if get("cap_calculation_to_maximum") else 0.0,
+        "contribution": proportions_contribution(get("proportions")),
+    }
+
+
+def player_blocks(seed: int, samples: int, rounds: int = ROUNDS_PER_PLAYER):
+    """
+    Standard normal player-behaviour draws (deposit, free-spin luck,
+    per-round luck), one block of at most BLOCK_SIZE players at a time.
+    Block i is drawn from child i of SeedSequence(seed), each kind of draw
+    from its own grandchild stream, so a player's draws do not depend on the
+    size of the block.
+    """
+    blocks = -(-samples // BLOCK_SIZE)
+    for index, child in enumerate(np.random.SeedSequence(seed).spawn(blocks)):
+        size = min(BLOCK_SIZE, samples - index * BLOCK_SIZE)
+        deposit, spins, luck = (np.random.default_rng(stream) for stream in child.spawn(3))
+        yield {
+            "deposit": deposit.standard_normal(size),
+            "spins": spins.standard_normal(size),
+            "rounds": luck.standard_normal((size, rounds)),
+        }
+
+
+def draw_player_samples(seed: int, samples: int, rounds: int = ROUNDS_PER_PLAYER) -> Dict[str, np.ndarray]:
+    """All player_blocks of a run in one set of arrays (for small runs, e.g. sweeps)"""
+    blocks = list(player_blocks(seed, samples, rounds))
+    return {key: np.concatenate([block[key] for block in blocks]) for key in blocks[0]}
+
+
+def bonus_cost(outcome: Dict[str, np.ndarray]) -> np.ndarray:
+    """Bonus money paid out per player: payout beyond the player's own deposit"""
+    return np.maximum(outcome["payout"] - outcome["deposit"], 0.0)
+
+
+def simulate_players(terms: Dict[str, np.ndarray], behaviour: Dict[str, float],
+                     draws: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Outcome per player for one or many term sets.
+
+    terms values are scalars or arrays of shape (K, 1) (K term sets,
+    broadcast against the players); draws are one of player_blocks (or
+    draw_player_samples). Returns deposit, bonus, payout and completed arrays
+    of shape (players,) or (K, players).
+    """
+    rtp = behaviour["rtp"]
+    volatility = behaviour["volatility"]
+
+    is_cash = terms["percentage"] > 0
+    deposit = np.maximum(terms["minimum_amount"],
+                         behaviour["deposit_median"] * np.exp(behaviour["deposit_sigma"] * draws["deposit"]))
+    match = np.minimum(deposit * terms["percentage"] / 100.0, terms["maximum_amount"])
+
+    # Free spins: winnings of `spins` bets of `cost`
+    cost = np.maximum(terms["cost"], 1e-9)
+    fixed_spins = np.where(terms["maximum_bets"] > 0, terms["maximum_bets"], behaviour["spins"])
+    spins = np.where((terms["multiplier"] > 0) & (terms["minimum_amount"] > 0),
+                     np.minimum(fixed_spins, np.floor(deposit * terms["multiplier"] / cost)),
+                     fixed_spins)
+    spin_wins = terms["cost"] * np.maximum(
+        0.0, spins * rtp + np.sqrt(spins) * volatility * draws["spins"])
+
+    # The deposit only takes part in the wagering of cash bonuses
+    deposit = np.where(is_cash, deposit, 0.0)
+    bonus = np.where(is_cash, match, spin_wins)
+    calc_deposit = np.where(terms["cap_calculation"] > 0,
+                            np.minimum(deposit, terms["maximum_amount"]), deposit)
+    target = terms["wagering_multiplier"] * (bonus + terms["include_amount"] * calc_deposit)
+    turnover = target / np.maximum(terms["contribution"], 1e-9)
+
+    stake = terms["minimum_stake"] + behaviour["stake_fraction"] * (
+        terms["maximum_stake"] - terms["minimum_stake"])
+    stake = np.maximum(stake, 1e-9)
+    bets_per_round = turnover / stake / draws["rounds"].shape[-1]
+
+    # (..., players, rounds) net result of every round, then the balance path
+    mean = (stake * bets_per_round * (rtp - 1.0))[..., None]
+    spread = (stake * np.sqrt(bets_per_round) * volatility)[..., None]
+    path = (deposit + bonus)[..., None] + np.cumsum(mean + spread * draws["rounds"], axis=-1)
+    busted = (path.min(axis=-1) < stake) & (turnover > 0)
+    final = np.where(turnover > 0, path[..., -1], deposit + bonus)
+
+    completed = ~busted
+    # maximum_withdraw caps the bonus winnings; the player's own deposit stays withdrawable
+    cap = np.where(terms["maximum_withdraw"] > 0,
+                   np.maximum(terms["maximum_withdraw"] * bonus, deposit), np.inf)
+    payout = np.where(completed, np.minimum(np.maximum(final, 0.0), cap), 0.0)
+    return {"deposit": deposit, "bonus": bonus, "payout": payout, "completed": completed,
+            "turnover": np.where(completed, turnover, np.nan)}
+
+
+def _summarize(bonus: np.ndarray, cost: np.ndarray, payout: np.ndarray,
+               completed: np.ndarray, rate: float) -> Dict[str, Any]:
+    expected_bonus = float(bonus.mean())
+    expected_cost = float(cost.mean())
+    return {
+        "expected_cost": round(expected_cost, 4),
+        "expected_cost_eur": round(expected_cost / rate, 4) if rate else None,
+        "expected_bonus": round(expected_bonus, 4),
+        "cost_ratio": round(expected_cost / expected_bonus, 4) if expected_bonus else None,
+        "completion_rate": round(float(completed.mean()), 4),
+        "payout": {
+            "mean": round(float(payout.mean()), 4),
+            "std": round(float(payout.std()), 4),
+            "zero_share": round(float((payout <= 0).mean()), 4),
+            **{f"p{q}": round(float(v), 4)
+               for q, v in zip(PAYOUT_PERCENTILES, np.percentile(payout, PAYOUT_PERCENTILES))},
+        },
+    }
+
+
+def simulate_currency(terms: Dict[str, float], behaviour: Dict[str, float], seed: int,
+                      samples: int, rate: float) -> Dict[str, Any]:
+    """Simulate one currency block by block (process-pool entry point)"""
+    parts = {"bonus": [], "cost": [], "payout": [], "completed": []}
+    for block in player_blocks(seed, samples):
+        outcome = simulate_players(terms, behaviour, block)
+        outcome["cost"] = bonus_cost(outcome)
+        for key in parts:
+            parts[key].append(np.broadcast_to(outcome[key], block["deposit"].shape))
+    return _summarize(*(np.concatenate(parts[key]) for key in ("bonus", "cost", "payout", "completed")),
+                      rate=rate)
+
+
+def resolve_behaviour(overrides: Optional[Dict[str, Any]], template_terms_eur: Dict[str, float]) -> Dict[str, float]:
+    behaviour = dict(DEFAULT_BEHAVIOUR)
+    for key, value in (overrides or {}).items():
+        if key not in DEFAULT_BEHAVIOUR:
+            raise ValueError(f"Unknown behaviour parameter '{key}'")
+        if value is not None:
+            behaviour[key] = float(value)
+    if behaviour["deposit_median"] is None:
+        behaviour["deposit_median"] = max(2 * template_terms_eur["minimum_amount"], 50.0)
+    if not 0 < behaviour["rtp"] <= 1.5:
+        raise ValueError("rtp must be in (0, 1.5]")
+    if not 0 <= behaviour["stake_fraction"] <= 1:
+        raise ValueError("stake_fraction must be between 0 and 1")
+    if behaviour["contribution"] is not None and not 0 < behaviour["contribution"] <= 1:
+        raise ValueError("contribution must be in (0, 1]")
+    return behaviour
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Shared worker pool for long simulations (created on first use)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=min(4, os.cpu_count() or 1))
+        return _pool
+
+
+def simulate_template(template, currencies: Optional[List[str]] = None, samples: int = 10_000,
+                      seed: int = 0, behaviour: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Expected cost, completion rate and payout distribution per currency.
+    `template` is a BonusTemplate or a dict with the same field names.
+    """
+    if not 1 <= samples <= MAX_SAMPLES:
+        raise ValueError(f"samples must be between 1 and {MAX_SAMPLES}")
+    snapshot = get_currency_snapshot()
+    currencies = list(currencies or ["EUR"])
+    unknown = [code for code in currencies if code not in snapshot]
+    if unknown:
+        raise ValueError(f"Unknown currencies: {', '.join(unknown)}")
+
+    resolved = resolve_behaviour(behaviour, template_terms(template, "EUR"))
+    jobs = []
+    for code in currencies:
+        rate = snapshot.rate(code)
+        per_currency = dict(resolved, deposit_median=resolved["deposit_median"] * rate)
+        terms = template_terms(template, code, rate)
+        if resolved["contribution"] is not None:
+            terms["contribution"] = resolved["contribution"]
+        jobs.append((terms, per_currency, seed, samples, rate))
+
+    if samples * ROUNDS_PER_PLAYER * len(currencies) > POOL_THRESHOLD_CELLS:
+        results = list(get_process_pool().map(simulate_currency, *zip(*jobs)))
+        mode = "process_pool"
+    else:
+        results = [simulate_currency(*job) for job in jobs]
+        mode = "inline"
+
+    return {
+        "samples": samples,
+        "seed": seed,
+        "rounds_per_player": ROUNDS_PER_PLAYER,
+        "behaviour": resolved,
+        "mode": mode,
+        "rates_version": snapshot.version,
+        "currencies": dict(zip(currencies, results)),
+    }
+
+
+# ============= RESULT CACHE =============
+
+CACHE_SIZE = 128
+_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def template_version(template) -> str:
+    """Changes whenever the template is saved"""
+    stamp = template.updated_at or template.created_at
+    return f"{template.id}@{stamp.isoformat() if stamp else ''}"
+
+
+def cache_key(version: str, **params) -> str:
+    raw = json.dumps({"version": version, **params}, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def cached_simulation(key: str) -> Optional[Dict[str, Any]]:
+    with _cache_lock:
+        result = _cache.get(key)
+        if result is not None:
+            _cache.move_to_end(key)
+        return result
+
+
+def store_simulation(key: str, result: Dict[str, Any]):
+    with _cache_lock:
+        _cache[key] = result
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
@@ -0,0 +1,267 @@
+"""
+Parameter sweeps over bonus terms for the Optimization Team.
+
+Evaluates every combination of percentage x wagering multiplier x maximum
+amount tier for one template with the Monte Carlo model from
+bonus_simulator, all combinations on the same simulated players. The
+player draws are generated once and placed in shared memory; workers of
+one process pool shared by every sweep (SWEEP_WORKERS processes) attach to
+them instead of receiving a copy with every task.
+
+maximum_withdraw follows the percentage tiers the JSON export uses
+(maximum_withdraw_for_percentage), so each combination is priced the way
+it would be published.
+
+Each combination gets a cost (expected bonus money paid out per player, EUR,
+see bonus_simulator) and an
+attractiveness (bonus a player can expect to actually clear: expected bonus
+x completion rate). The result is the Pareto frontier: combinations no
+other combination beats on both lower cost and higher attractiveness.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from database.models import BonusTemplate
+from services.bonus_simulator import (
+    ROUNDS_PER_PLAYER, bonus_cost, draw_player_samples, resolve_behaviour, simulate_players,
+    template_terms,
+)
+from services.jobs import JobContext
+
+DEFAULT_PERCENTAGES = [25, 50, 75, 100, 125, 150, 175, 200]
+DEFAULT_WAGERING = [1, 3, 5, 10, 15, 20, 25, 30, 35, 40]
+DEFAULT_MAXIMUM_AMOUNTS = [50, 100, 200, 300, 500, 1000]  # EUR tiers
+
+MAX_COMBINATIONS = 20_000
+MAX_SWEEP_SAMPLES = 50_000
+# Combinations per worker task (one progress update each)
+TASK_SIZE = 16
+# Processes shared by all sweeps; a job's "workers" param can only lower its share
+SWEEP_WORKERS = int(os.getenv("SWEEP_WORKERS", min(4, os.cpu_count() or 1)))
+# Draw sets a worker keeps attached (concurrent sweeps alternate between them)
+ATTACHED_SWEEPS = 2
+
+# (minimum percentage, maximumWithdraw multiple), highest first
+WITHDRAW_TIERS = [(200, 3), (150, 6), (120, 8), (100, 10), (0, 12)]
+
+
+def maximum_withdraw_for_percentage(percentage: float) -> int:
+    """Withdraw cap (multiple of the bonus) for reload/cashback percentages"""
+    for minimum, multiple in WITHDRAW_TIERS:
+        if percentage >= minimum:
+            return multiple
+    return WITHDRAW_TIERS[-1][1]
+
+
+def sweep_grid(percentages: Optional[Sequence[float]] = None,
+               wagering: Optional[Sequence[float]] = None,
+               maximum_amounts: Optional[Sequence[float]] = None) -> List[Tuple[float, float, float]]:
+    """Every (percentage, wagering multiplier, maximum amount) combination"""
+    percentages = sorted(set(percentages or DEFAULT_PERCENTAGES))
+    wagering = sorted(set(wagering or DEFAULT_WAGERING))
+    maximum_amounts = sorted(set(maximum_amounts or DEFAULT_MAXIMUM_AMOUNTS))
+    if min(percentages) <= 0 or min(wagering) < 0 or min(maximum_amounts) <= 0:
+        raise ValueError("percentages and maximum amounts must be positive, wagering not negative")
+    combos = [(float(p), float(w), float(m))
+              for p in percentages for w in wagering for m in maximum_amounts]
+    if len(combos) > MAX_COMBINATIONS:
+        raise ValueError(f"{len(combos)} combinations (maximum {MAX_COMBINATIONS})")
+    return combos
+
+
+def pareto_frontier(points: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Points not dominated on (lower cost, higher attractiveness), cheapest first"""
+    frontier = []
+    best = -np.inf
+    for point in sorted(points, key=lambda p: (p["cost"], -p["attractiveness"])):
+        if point["attractiveness"] > best:
+            frontier.append(point)
+            best = point["attractiveness"]
+    return frontier
+
+
+# ============= WORKERS =============
+
+# Player draws attached by each worker process: block names -> (blocks, draws)
+_worker_draws: "OrderedDict[Tuple[str, ...], Tuple[List[Any], Dict[str, np.ndarray]]]" = OrderedDict()
+
+
+def _open_shared(name: str):
+    """
+    Attach to a block created by the parent without registering it with the
+    resource tracker: a worker's registration would unlink the parent's block
+    (or report it as leaked) when the worker exits.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        pass
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _attached_draws(specs: Dict[str, Tuple[str, Tuple[int, ...]]]) -> Dict[str, np.ndarray]:
+    """The shared player draws of one sweep, mapped into this worker on first use"""
+    key = tuple(name for name, _ in specs.values())
+    attached = _worker_draws.get(key)
+    if attached is None:
+        blocks, draws = [], {}
+        for field, (name, shape) in specs.items():
+            block = _open_shared(name)
+            blocks.append(block)
+            draws[field] = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+        attached = _worker_draws[key] = (blocks, draws)
+        while len(_worker_draws) > ATTACHED_SWEEPS:
+            old_blocks, old_draws = _worker_draws.popitem(last=False)[1]
+            old_draws.clear()  # Drop the array views before closing their buffers
+            for block in old_blocks:
+                block.close()
+    _worker_draws.move_to_end(key)
+    return attached[1]
+
+
+def evaluate_combinations(base_terms: Dict[str, float], behaviour: Dict[str, float],
+                          combos: List[Tuple[float, float, float]],
+                          draws: Optional[Dict[str, np.ndarray]] = None,
+                          specs: Optional[Dict[str, Tuple[str, Tuple[int, ...]]]] = None) -> List[Dict[str, Any]]:
+    """Cost and attractiveness of each combination (worker task: pass the shared `specs`)"""
+    if draws is None:
+        draws = _attached_draws(specs)
+    points = []
+    for percentage, wagering, maximum_amount in combos:
+        terms = dict(base_terms, percentage=percentage, wagering_multiplier=wagering,
+                     maximum_amount=maximum_amount,
+                     maximum_withdraw=float(maximum_withdraw_for_percentage(percentage)))
+        outcome = simulate_players(terms, behaviour, draws)
+        completion = float(outcome["completed"].mean())
+        expected_bonus = float(outcome["bonus"].mean())
+        points.append({
+            "percentage": percentage,
+            "wagering_multiplier": wagering,
+            "maximum_amount": maximum_amount,
+            "maximum_withdraw": terms["maximum_withdraw"],
+            "cost": round(float(bonus_cost(outcome).mean()), 4),
+            "attractiveness": round(expected_bonus * completion, 4),
+            "expected_bonus": round(expected_bonus, 4),
+            "completion_rate": round(completion, 4),
+        })
+    return points
+
+
+def _share(draws: Dict[str, np.ndarray]):
+    """Copy the draws into shared memory blocks; returns (blocks, specs for workers)"""
+    blocks, specs = [], {}
+    for key, array in draws.items():
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=np.float64, buffer=block.buf)[...] = array
+        blocks.append(block)
+        specs[key] = (block.name, array.shape)
+    return blocks, specs
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_sweep_pool() -> ProcessPoolExecutor:
+    """Worker pool shared by every sweep (created on first use)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=SWEEP_WORKERS)
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    """Forget a pool whose worker died, so the next sweep starts a new one"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ============= JOB =============
+
+def run_sweep(context: JobContext) -> Dict[str, Any]:
+    """
+    Job body: params template_id, percentages, wagering, maximum_amounts,
+    samples, seed, behaviour, workers
+    """
+    params = context.params
+    template = context.db.get(BonusTemplate, params["template_id"])
+    if template is None:
+        raise ValueError(f"Template '{params['template_id']}' not found")
+
+    combos = sweep_grid(params.get("percentages"), params.get("wagering"),
+                        params.get("maximum_amounts"))
+    base_terms = template_terms(template, "EUR")
+    behaviour = resolve_behaviour(params.get("behaviour"), base_terms)
+    if behaviour["contribution"] is not None:
+        base_terms["contribution"] = behaviour["contribution"]
+    samples = int(params.get("samples") or 5000)
+    if not 1 <= samples <= MAX_SWEEP_SAMPLES:
+        raise ValueError(f"samples must be between 1 and {MAX_SWEEP_SAMPLES}")
+    context.set_total(len(combos))
+
+    draws = draw_player_samples(int(params.get("seed") or 0), samples)
+    tasks = [combos[i:i + TASK_SIZE] for i in range(0, len(combos), TASK_SIZE)]
+    # Tasks in flight at a time; the pool itself is shared and bounded
+    workers = max(1, min(int(params.get("workers") or SWEEP_WORKERS), SWEEP_WORKERS, len(tasks)))
+
+    points: List[Dict[str, Any]] = []
+    blocks, specs = _share(draws)
+    pool = get_sweep_pool()
+    queued = iter(tasks)
+    pending = set()
+    try:
+        for task in queued:
+            pending.add(pool.submit(evaluate_combinations, base_terms, behaviour, task, specs=specs))
+            if len(pending) >= workers:
+                break
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                points.extend(future.result())
+                task = next(queued, None)
+                if task is not None:
+                    pending.add(pool.submit(evaluate_combinations, base_terms, behaviour, task,
+                                            specs=specs))
+            # Raises JobCancelled when a cancel was requested
+            context.progress(len(points), {"evaluated": len(points)})
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
+    finally:
+        # Workers must be done with the blocks before they are unlinked
+        for future in pending:
+            future.cancel()
+        wait(pending)
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    frontier = pareto_frontier(points)
+    return {
+        "template_id": template.id,
+        "combinations": len(points),
+        "samples": samples,
+        "rounds_per_player": ROUNDS_PER_PLAYER,
+        "behaviour": behaviour,
+        "workers": workers,
+        "frontier": frontier,
+        "cheapest": min(points, key=lambda p: p["cost"]) if points else None,
+        "most_attractive": max(points, key=lambda p: p["attractiveness"]) if points else None,
+    }
@@ -0,0 +1,223 @@
+"""
+Campaign series: dated copies of a base template.
+
+A recurrence rule (daily/weekly/monthly, interval, weekdays, count or
+until) expands into occurrence start times in the template's own timezone;
+each copy gets an id from a pattern, a period schedule_from/schedule_to
+window and the base translations with date placeholders filled in:
+    {date}     window start, in date_format (default 21.11.25)
+    {date_to}  window end, in date_format
+    {n}        1-based number of the copy in the series
+    {week}     ISO week number of the window start
+The same placeholders work in the id pattern, together with {base} (the
+base template id). Copies share the base's proportions set and are written
+with their derived data in one transaction; the caller commits.
+
+Windows are closed like every schedule window, so a rule whose duration is
+longer than the gap between two starts (a daily rule with a week-long
+window) is rejected unless it sets allow_overlap.
+"""
+
+import calendar
+import copy
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from database.models import BonusTemplate, BonusTranslation
+from services.schedule_service import SCHEDULE_FORMATS, WEEKDAY_NAMES
+from services.template_sync import sync_template_derived
+from services.translation_memory import remember_translations
+
+FREQUENCIES = ("daily", "weekly", "monthly")
+MAX_SERIES_SIZE = 1000
+SCHEDULE_FORMAT = "%d-%m-%Y %H:%M"  # What the forms send
+DURATION_PATTERN = re.compile(r"(\d+)\s*([dhm])")
+DEFAULT_DURATION = "6d23h59m"  # A weekly window ending before the next one starts
+
+# Columns a copy does not take from the base template
+NOT_COPIED = {
+    "id", "schedule_type", "schedule_from", "schedule_to", "schedule_value",
+    "schedule_from_at", "schedule_to_at", "created_at", "updated_at",
+    "rollup_contribution", "content_hash",
+}
+
+
+def parse_local_datetime(value: str) -> datetime:
+    """Wall-clock datetime in one of the schedule formats (no timezone conversion)"""
+    for fmt in SCHEDULE_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date '{value}', expected e.g. 05-01-2026 10:00")
+
+
+def parse_duration(value: str) -> timedelta:
+    """"7d", "6d23h59m", "36h" -> timedelta"""
+    parts = DURATION_PATTERN.findall(value or "")
+    if not parts or DURATION_PATTERN.sub("", value).strip():
+        raise ValueError(f"Invalid duration '{value}', expected e.g. 7d or 6d23h59m")
+    units = {"d": "days", "h": "hours", "m": "minutes"}
+    duration = timedelta()
+    for amount, unit in parts:
+        duration += timedelta(**{units[unit]: int(amount)})
+    if duration <= timedelta(0):
+        raise ValueError("Duration must be positive")
+    return duration
+
+
+def _add_months(start: datetime, months: int) -> datetime:
+    month = start.month - 1 + months
+    year, month = start.year + month // 12, month % 12 + 1
+    day = min(start.day, calendar.monthrange(year, month)[1])
+    return start.replace(year=year, month=month, day=day)
+
+
+def occurrences(start: datetime, frequency: str = "weekly", interval: int = 1,
+                weekdays: Optional[List[str]] = None, count: Optional[int] = None,
+                until: Optional[datetime] = None) -> List[datetime]:
+    """Start times of a recurrence rule (at most MAX_SERIES_SIZE)"""
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"Unknown frequency '{frequency}'. Use: {', '.join(FREQUENCIES)}")
+    if interval < 1:
+        raise ValueError("interval must be at least 1")
+    if count is None and until is None:
+        raise ValueError("Give count or until")
+    limit = min(count if count is not None else MAX_SERIES_SIZE + 1, MAX_SERIES_SIZE + 1)
+
+    days = None
+    if frequency == "weekly" and weekdays:
+        try:
+            days = sorted({WEEKDAY_NAMES[name.strip().lower()] for name in weekdays})
+        except KeyError as e:
+            raise ValueError(f"Invalid weekday {e}")
+
+    result: List[datetime] = []
+    step = 0
+    while len(result) < limit:
+        if frequency == "daily":
+            candidates = [start + timedelta(days=step * interval)]
+        elif frequency == "monthly":
+            candidates = [_add_months(start, step * interval)]
+        elif days is None:
+            candidates = [start + timedelta(weeks=step * interval)]
+        else:
+            week_start = start - timedelta(days=start.weekday()) + timedelta(weeks=step * interval)
+            candidates = [week_start + timedelta(days=day) for day in days]
+            candidates = [c for c in candidates if c >= start]
+        if until is not None and candidates and candidates[0] > until:
+            break
+        for candidate in candidates:
+            if (until is None or candidate <= until) and len(result) < limit:
+                result.append(candidate)
+        step += 1
+
+    if len(result) > MAX_SERIES_SIZE:
+        raise ValueError(f"A series has at most {MAX_SERIES_SIZE} campaigns")
+    return result
+
+
+def fill_placeholders(text: Any, values: Dict[str, str]) -> Any:
+    """Replace {placeholders} in a string or in every value of a locale map"""
+    if isinstance(text, dict):
+        return {key: fill_placeholders(value, values) for key, value in text.items()}
+    if not isinstance(text, str) or "{" not in text:
+        return text
+    for name, value in values.items():
+        text = text.replace("{" + name + "}", value)
+    return text
+
+
+def series_windows(rule: Dict[str, Any]) -> List[Tuple[datetime, datetime]]:
+    """
+    (start, end) wall-clock windows of a recurrence rule. ValueError when a
+    window runs past the next start, unless the rule sets allow_overlap.
+    """
+    start = parse_local_datetime(rule["start"])
+    until = parse_local_datetime(rule["until"]) if rule.get("until") else None
+    duration = parse_duration(rule.get("duration") or DEFAULT_DURATION)
+    starts = occurrences(start, rule.get("frequency") or "weekly", rule.get("interval") or 1,
+                         rule.get("weekdays"), rule.get("count"), until)
+    if not rule.get("allow_overlap"):
+        gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+        if gaps and duration > min(gaps):
+            raise ValueError(f"duration {rule.get('duration') or DEFAULT_DURATION} is longer than "
+                             f"the {min(gaps)} between two campaigns; shorten it or set allow_overlap")
+    return [(item, item + duration) for item in starts]
+
+
+def _copy_columns() -> List[str]:
+    return [attr.key for attr in BonusTemplate.__mapper__.column_attrs if attr.key not in NOT_COPIED]
+
+
+def build_series(base: BonusTemplate, windows: List[Tuple[datetime, datetime]],
+                 id_pattern: str = "{base} {date}", date_format: str = "%d.%m.%y") -> List[BonusTemplate]:
+    """Unsaved copies of `base`, one per window, with their translations"""
+    columns = _copy_columns()
+    base_values = {key: getattr(base, key) for key in columns}
+    translations = list(base.translations)
+    copies = []
+    for n, (start, end) in enumerate(windows, start=1):
+        values = {
+            "base": base.id,
+            "date": start.strftime(date_format),
+            "date_to": end.strftime(date_format),
+            "n": str(n),
+            "week": str(start.isocalendar()[1]),
+        }
+        campaign = BonusTemplate(**{key: copy.copy(value) for key, value in base_values.items()})
+        campaign.id = fill_placeholders(id_pattern, values)
+        campaign.schedule_type = "period"
+        campaign.schedule_from = start.strftime(SCHEDULE_FORMAT)
+        campaign.schedule_to = end.strftime(SCHEDULE_FORMAT)
+        campaign.trigger_name = fill_placeholders(base.trigger_name, values)
+        campaign.trigger_description = fill_placeholders(base.trigger_description, values)
+        for translation in translations:
+            campaign.translations.append(BonusTranslation(
+                template_id=campaign.id,
+                language=translation.language,
+                currency=translation.currency,
+                name=fill_placeholders(translation.name, values),
+                description=fill_placeholders(translation.description, values),
+            ))
+        copies.append(campaign)
+    return copies
+
+
+def create_series(db: Session, base: BonusTemplate, rule: Dict[str, Any],
+                  id_pattern: str = "{base} {date}", date_format: str = "%d.%m.%y") -> List[BonusTemplate]:
+    """
+    Build, validate and add the copies with their derived data (the caller
+    commits). ValueError for a bad rule or colliding ids, LookupError when
+    ids already exist.
+    """
+    copies = build_series(base, series_windows(rule), id_pattern, date_format)
+    ids = [campaign.id for campaign in copies]
+    if len(set(ids)) != len(ids):
+        raise ValueError(f"id_pattern '{id_pattern}' gives the same id to several campaigns; "
+                         "use {date} or {n}")
+    existing = []
+    for i in range(0, len(ids), 500):
+        existing += [row.id for row in db.query(BonusTemplate.id).filter(
+            BonusTemplate.id.in_(ids[i:i + 500])).all()]
+    if existing:
+        raise LookupError(existing)
+
+    remember_translations(db, [t for campaign in copies for t in campaign.translations])
+    for campaign in copies:
+        sync_template_derived(db, campaign)
+    db.add_all(copies)
+    return copies
+
+
+def series_summary(template: BonusTemplate) -> Dict[str, Any]:
+    return {
+        "id": template.id,
+        "schedule_from": template.schedule_from,
+        "schedule_to": template.schedule_to,
+        "trigger_name": template.trigger_name,
+        "translations": len(template.translations),
+    }
@@ -0,0 +1,279 @@
+"""
+Campaign conflict detection.
+
+Two templates conflict when they share a trigger_type, target overlapping
+segments (a template without segments targets everyone) and have
+overlapping schedule windows (schedule_from_at/schedule_to_at).
+
+restricted_countries is an exclusion list, so two overlapping campaigns
+collide in every country neither of them excludes; each conflict reports
+the union of excluded countries (uppercased, like the country index)
+instead of being grouped by it.
+
+Templates without a dated window (recurring day/cron schedules) are not
+indexed.
+"""
+
+import heapq
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from database.models import BonusTemplate
+
+ALL_SEGMENTS = "*"
+
+
+class IntervalTree:
+    """
+    Static interval tree over closed intervals [start, end].
+
+    Intervals are sorted by start and viewed as an implicit balanced binary
+    tree (the middle element of every index range is the node); each node keeps
+    the maximum end of its subtree. Building is O(n log n) and an overlap
+    query is O(log n + k).
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[Any, Any, Any]]):
+        self.intervals = sorted(intervals, key=lambda item: item[0])
+        self.max_end: List[Any] = [None] * len(self.intervals)
+        if self.intervals:
+            self._build(0, len(self.intervals))
+
+    def _build(self, lo: int, hi: int):
+        mid = (lo + hi) // 2
+        best = self.intervals[mid][1]
+        if lo < mid:
+            best = max(best, self._build(lo, mid))
+        if mid + 1 < hi:
+            best = max(best, self._build(mid + 1, hi))
+        self.max_end[mid] = best
+        return best
+
+    def __len__(self):
+        return len(self.intervals)
+
+    def overlapping(self, start, end) -> List[Any]:
+        """Payloads of every interval overlapping [start, end]"""
+        found = []
+        stack = [(0, len(self.intervals))] if self.intervals else []
+        while stack:
+            lo, hi = stack.pop()
+            mid = (lo + hi) // 2
+            # Nothing in this subtree ends late enough
+            if self.max_end[mid] < start:
+                continue
+            if lo < mid:
+                stack.append((lo, mid))
+            interval_start, interval_end, payload = self.intervals[mid]
+            # Everything right of mid starts at or after interval_start
+            if interval_start > end:
+                continue
+            if interval_end >= start:
+                found.append(payload)
+            if mid + 1 < hi:
+                stack.append((mid + 1, hi))
+        return found
+
+
+def template_descriptor(template) -> Dict[str, Any]:
+    """The fields conflict detection looks at"""
+    return {
+        "id": template.id,
+        "trigger_type": template.trigger_type or "",
+        "segments": sorted(set(template.segments or [])),
+        "restricted_countries": sorted({str(c).strip().upper() for c in template.restricted_countries or []
+                                        if str(c).strip()}),
+        "provider": template.provider,
+        "from": template.schedule_from_at,
+        "to": template.schedule_to_at,
+    }
+
+
+def _segments_overlap(a: List[str], b: List[str]) -> List[str]:
+    """Shared segments; ["*"] when either side targets everyone"""
+    if not a or not b:
+        return [ALL_SEGMENTS]
+    return sorted(set(a) & set(b))
+
+
+def _conflict(a: Dict[str, Any], b: Dict[str, Any], shared: List[str]) -> Dict[str, Any]:
+    return {
+        "template_id": b["id"],
+        "provider": b["provider"],
+        "trigger_type": b["trigger_type"],
+        "segments": shared,
+        "overlap_from": max(a["from"], b["from"]),
+        "overlap_to": min(a["to"], b["to"]),
+        "excluded_countries": sorted(set(a["restricted_countries"]) | set(b["restricted_countries"])),
+    }
+
+
+class ConflictIndex:
+    """Interval trees per (trigger_type, segment) over the dated catalogue"""
+
+    def __init__(self, descriptors: Iterable[Dict[str, Any]]):
+        self.descriptors = [d for d in descriptors if d["from"]
+                            and d["to"] and d["from"] <= d["to"]]
+        groups: Dict[Tuple[str, str], List] = {}
+        for d in self.descriptors:
+            for segment in d["segments"] or [ALL_SEGMENTS]:
+                groups.setdefault((d["trigger_type"], segment), []).append(
+                    (d["from"], d["to"], d))
+        self.trees = {key: IntervalTree(items)
+                      for key, items in groups.items()}
+        self.segments_by_trigger: Dict[str, List[str]] = {}
+        for trigger_type, segment in self.trees:
+            self.segments_by_trigger.setdefault(
+                trigger_type, []).append(segment)
+
+    def find_conflicts(self, candidate: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Templates overlapping a candidate (which need not be in the index)"""
+        if not candidate["from"] or not candidate["to"]:
+            return []
+        trigger_type = candidate["trigger_type"]
+        if candidate["segments"]:
+            segments = candidate["segments"] + [ALL_SEGMENTS]
+        else:
+            # Targets everyone: every segment of this trigger type collides
+            segments = self.segments_by_trigger.get(trigger_type, [])
+
+        conflicts = {}
+        for segment in segments:
+            tree = self.trees.get((trigger_type, segment))
+            if not tree:
+                continue
+            for other in tree.overlapping(candidate["from"], candidate["to"]):
+                if other["id"] == candidate["id"] or other["id"] in conflicts:
+                    continue
+                conflicts[other["id"]] = _conflict(
+                    candidate, other, _segments_overlap(candidate["segments"], other["segments"]))
+        return sorted(conflicts.values(), key=lambda c: (c["overlap_from"], c["template_id"]))
+
+    def report(self) -> List[Dict[str, Any]]:
+        """
+        Every conflicting pair in the catalogue, O(n log n) plus the
+        overlapping pairs: a sweep line per (trigger_type, segment) partition,
+        and one per trigger_type pairing the templates without segments
+        (which target everyone) with every other window of that type.
+        """
+        by_trigger: Dict[str, List[Dict[str, Any]]] = {}
+        for d in self.descriptors:
+            by_trigger.setdefault(d["trigger_type"], []).append(d)
+
+        pairs = []
+
+        def add(current, other, shared):
+            conflict = _conflict(current, other, shared)
+            conflict["with_template_id"] = current["id"]
+            pairs.append(conflict)
+
+        for items in by_trigger.values():
+            partitions: Dict[str, List[Dict[str, Any]]] = {}
+            for d in items:
+                for segment in d["segments"]:
+                    partitions.setdefault(segment, []).append(d)
+            for segment, members in partitions.items():
+                for current, other in _sweep(members):
+                    shared = _segments_overlap(current["segments"], other["segments"])
+                    # A pair sharing several segments is reported once, in the first
+                    if shared[0] == segment:
+                        add(current, other, shared)
+
+            for current, other in _sweep(items, classify=_targeting, compare=EVERYONE_PAIRS):
+                add(current, other, [ALL_SEGMENTS])
+        return sorted(pairs, key=lambda c: (c["overlap_from"], c["template_id"], c["with_template_id"]))
+
+
+# Sweep classes: templates without segments collide with every window of
+# their trigger type, templates with segments only with the former here
+EVERYONE_PAIRS = {"everyone": ("everyone", "targeted"), "targeted": ("everyone",)}
+
+
+def _targeting(d: Dict[str, Any]) -> str:
+    return "targeted" if d["segments"] else "everyone"
+
+
+def _sweep(items: List[Dict[str, Any]], classify=None,
+           compare=None) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Overlapping (current, other) window pairs, other starting first: a sweep
+    over items sorted by start with a heap of still-open windows per class.
+    Without classify every window is compared with every open one.
+    """
+    items = sorted(items, key=lambda d: (d["from"], d["id"]))
+    active: Dict[Any, List[Tuple[datetime, int, Dict[str, Any]]]] = {}
+    for position, current in enumerate(items):
+        kind = classify(current) if classify else None
+        for other_kind in compare[kind] if compare else (kind,):
+            heap = active.get(other_kind)
+            # Drop windows that ended before this one starts
+            while heap and heap[0][0] < current["from"]:
+                heapq.heappop(heap)
+            for _, _, other in heap or ():
+                yield current, other
+        heapq.heappush(active.setdefault(kind, []), (current["to"], position, current))
+
+
+_index_cache: Dict[str, Any] = {"stamp": None, "index": None}
+_index_lock = threading.Lock()
+
+
+def _catalogue_stamp(db: Session) -> Tuple:
+    """Changes whenever a template is created, updated or deleted (in any worker)"""
+    count, last_update = db.query(
+        func.count(BonusTemplate.id), func.max(BonusTemplate.updated_at)).one()
+    return (count, last_update)
+
+
+def get_conflict_index(db: Session) -> ConflictIndex:
+    """Cached index over the catalogue, rebuilt only when the catalogue changed"""
+    stamp = _catalogue_stamp(db)
+    with _index_lock:
+        if _index_cache["stamp"] == stamp and _index_cache["index"] is not None:
+            return _index_cache["index"]
+
+    rows = db.query(
+        BonusTemplate.id,
+        BonusTemplate.trigger_type,
+        BonusTemplate.segments,
+        BonusTemplate.restricted_countries,
+        BonusTemplate.provider,
+        BonusTemplate.schedule_from_at,
+        BonusTemplate.schedule_to_at,
+    ).filter(
+        BonusTemplate.schedule_from_at != None,
+        BonusTemplate.schedule_to_at != None,
+    ).all()
+    index = ConflictIndex(template_descriptor(row) for row in rows)
+
+    with _index_lock:
+        _index_cache["stamp"] = stamp
+        _index_cache["index"] = index
+    return index
+
+
+def find_template_conflicts(db: Session, template) -> List[Dict[str, Any]]:
+    """Conflicts of a (possibly unsaved) template against the stored catalogue"""
+    return get_conflict_index(db).find_conflicts(template_descriptor(template))
+
+
+def find_series_conflicts(db: Session, templates) -> List[Dict[str, Any]]:
+    """
+    Conflicts of unsaved series copies against the stored catalogue and
+    against each other; with_template_id is the copy each conflict belongs to.
+    """
+    with db.no_autoflush:
+        # The copies are already added; keep them out of the catalogue
+        catalogue = get_conflict_index(db)
+    descriptors = [template_descriptor(template) for template in templates]
+    series = ConflictIndex(descriptors)
+    found = []
+    for descriptor in descriptors:
+        for conflict in catalogue.find_conflicts(descriptor) + series.find_conflicts(descriptor):
+            conflict["with_template_id"] = descriptor["id"]
+            found.append(conflict)
+    return sorted(found, key=lambda c: (c["overlap_from"], c["template_id"], c["with_template_id"]))
@@ -0,0 +1,251 @@
+"""
+Currency registry backed by the currency_references table.
+
+Rates are loaded into an immutable CurrencySnapshot: a fixed currency order,
+a currency -> index map and read-only NumPy vectors for rates, deposit
+limits and rounding steps. Every conversion reads the current snapshot, so a
+rate change takes effect without a restart:
+- POST /currencies/reload swaps the snapshot in the worker handling it
+- every worker re-checks the table stamp at most every RELOAD_CHECK_SECONDS
+
+Batch conversions (convert_matrix) work on whole templates x fields
+matrices at once instead of one cell at a time.
+
+Until the table has rows the CURRENCY_REFERENCE defaults are used.
+"""
+
+import threading
+import time
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from database.models import CurrencyReference
+
+RELOAD_CHECK_SECONDS = 30
+
+# Default rounding: whole units, like the original round(eur * rate)
+DEFAULT_ROUNDING_STEP = 1.0
+# Rounded amounts are cut to this many decimals (no float noise in the JSON)
+ROUND_DECIMALS = 8
+
+
+def _frozen(values) -> np.ndarray:
+    array = np.asarray(values, dtype=np.float64)
+    array.setflags(write=False)
+    return array
+
+
+class CurrencySnapshot:
+    """Immutable view of the currency reference data"""
+
+    def __init__(self, rows: Iterable[Tuple[str, float, Optional[float], Optional[float], Optional[float]]],
+                 source: str, stamp: Any = None, version: int = 0):
+        rows = list(rows)
+        self.currencies: Tuple[str, ...] = tuple(row[0] for row in rows)
+        self.index: Mapping[str, int] = MappingProxyType(
+            {code: i for i, code in enumerate(self.currencies)})
+        self.rates = _frozen([row[1] for row in rows])
+        self.min_deposits = _frozen([np.nan if row[2] is None else row[2] for row in rows])
+        self.max_deposits = _frozen([np.nan if row[3] is None else row[3] for row in rows])
+        self.rounding_steps = _frozen([row[4] or DEFAULT_ROUNDING_STEP for row in rows])
+        self.source = source
+        self.stamp = stamp
+        self.version = version
+        self.loaded_at = datetime.utcnow()
+
+    def __contains__(self, currency: str) -> bool:
+        return currency in self.index
+
+    def rate(self, currency: str) -> Optional[float]:
+        i = self.index.get(currency)
+        return None if i is None else float(self.rates[i])
+
+    def round_values(self, values: np.ndarray, steps: np.ndarray) -> np.ndarray:
+        """
+        Round to each currency's step (half to even, like round()). The result
+        is rounded again to ROUND_DECIMALS so sub-unit steps do not leave
+        float artifacts (3 * 0.1 = 0.30000000000000004) in the exports.
+        """
+        return np.round(np.round(values / steps) * steps, ROUND_DECIMALS)
+
+    def convert(self, eur_amount: float, currency: str) -> float:
+        """One EUR amount into one currency (unknown currencies pass through)"""
+        i = self.index.get(currency)
+        if i is None:
+            return eur_amount
+        value = float(self.round_values(
+            np.float64(eur_amount) * self.rates[i], self.rounding_steps[i]))
+        return int(value) if self.rounding_steps[i] >= 1 else value
+
+    def convert_all(self, eur_amount: float) -> Dict[str, float]:
+        """One EUR amount into every currency"""
+        values = self.round_values(eur_amount * self.rates, self.rounding_steps)
+        return {
+            code: int(value) if step >= 1 else float(value)
+            for code, value, step in zip(self.currencies, values.tolist(), self.rounding_steps.tolist())
+        }
+
+    def convert_matrix(self, eur_amounts, clamp_fields=None,
+                       currencies: Optional[Iterable[str]] = None,
+                       field_steps=None) -> np.ndarray:
+        """
+        Convert a templates x fields matrix of EUR amounts into every currency.
+
+        Returns a (templates, fields, currencies) array, rounded per currency.
+        Fields flagged in clamp_fields (bool per field) are deposit amounts and
+        are clamped to each currency's [min_deposit, max_deposit]. field_steps
+        (step or None per field) caps the rounding step for small amounts such
+        as stakes or spin costs. NaN cells (missing values) stay NaN.
+        """
+        eur = np.asarray(eur_amounts, dtype=np.float64)
+        if eur.ndim == 1:
+            eur = eur[:, None]
+        if currencies is None:
+            columns = slice(None)
+        else:
+            columns = [self.index[code] for code in currencies]
+        rates = self.rates[columns]
+        steps = self.rounding_steps[columns]
+        if field_steps is not None:
+            caps = np.array([np.inf if s is None else s for s in field_steps], dtype=np.float64)
+            steps = np.minimum(steps[None, :], caps[:, None])
+
+        converted = self.round_values(eur[:, :, None] * rates, steps)
+        if clamp_fields is not None:
+            clamp = np.asarray(clamp_fields, dtype=bool)
+            if clamp.any():
+                # fmax/fmin ignore NaN bounds (currencies without a limit)
+                limited = np.fmin(np.fmax(converted[:, clamp, :], self.min_deposits[columns]),
+                                  self.max_deposits[columns])
+                converted[:, clamp, :] = np.where(
+                    np.isnan(converted[:, clamp, :]), np.nan, limited)
+        return converted
+
+    def matrix_to_dicts(self, converted: np.ndarray, fields: List[str],
+                        currencies: Optional[Iterable[str]] = None) -> List[Dict[str, Dict[str, float]]]:
+        """Per template {field: {currency: value}}; whole amounts as int, NaN dropped"""
+        codes = list(self.currencies if currencies is None else currencies)
+        result = []
+        for row in np.round(converted, ROUND_DECIMALS).tolist():
+            item = {}
+            for field, values in zip(fields, row):
+                item[field] = {
+                    code: (int(value) if value.is_integer() else value)
+                    for code, value in zip(codes, values)
+                    if value == value
+                }
+            result.append(item)
+        return result
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "source": self.source,
+            "loaded_at": self.loaded_at,
+            "currencies": [
+                {
+                    "currency": code,
+                    "eur_rate": float(self.rates[i]),
+                    "min_deposit": None if np.isnan(self.min_deposits[i]) else float(self.min_deposits[i]),
+                    "max_deposit": None if np.isnan(self.max_deposits[i]) else float(self.max_deposits[i]),
+                    "rounding_step": float(self.rounding_steps[i]),
+                }
+                for i, code in enumerate(self.currencies)
+            ],
+        }
+
+
+def _default_rows():
+    from services.currency_service import CURRENCY_REFERENCE
+    return [(code, ref["rate"], ref["min_deposit"], ref["max_deposit"], DEFAULT_ROUNDING_STEP)
+            for code, ref in CURRENCY_REFERENCE.items()]
+
+
+def _table_stamp(db: Session) -> Tuple:
+    count, last_update = db.query(
+        func.count(CurrencyReference.id), func.max(CurrencyReference.updated_at)).one()
+    return (count, last_update)
+
+
+_state: Dict[str, Any] = {"snapshot": None, "checked_at": 0.0, "version": 0}
+_lock = threading.Lock()
+
+
+def load_currency_snapshot(db: Session) -> CurrencySnapshot:
+    """Build a snapshot from currency_references (defaults when the table is empty)"""
+    stamp = _table_stamp(db)
+    rows = db.query(
+        CurrencyReference.currency,
+        CurrencyReference.eur_rate,
+        CurrencyReference.min_deposit,
+        CurrencyReference.max_deposit,
+        CurrencyReference.rounding_step,
+    ).order_by(CurrencyReference.id).all()
+    with _lock:
+        _state["version"] += 1
+        version = _state["version"]
+    if not rows:
+        return CurrencySnapshot(_default_rows(), source="defaults", stamp=stamp, version=version)
+    return CurrencySnapshot(rows, source="database", stamp=stamp, version=version)
+
+
+def reload_currency_snapshot(db: Session) -> CurrencySnapshot:
+    """Load and install a fresh snapshot (admin reload)"""
+    snapshot = load_currency_snapshot(db)
+    with _lock:
+        _state["snapshot"] = snapshot
+        _state["checked_at"] = time.monotonic()
+    return snapshot
+
+
+def get_currency_snapshot(db: Optional[Session] = None) -> CurrencySnapshot:
+    """
+    The current snapshot. Reloads when the table changed since it was built
+    (checked at most every RELOAD_CHECK_SECONDS); falls back to the defaults
+    if the database cannot be read.
+    """
+    snapshot = _state["snapshot"]
+    now = time.monotonic()
+    if snapshot is not None and now - _state["checked_at"] < RELOAD_CHECK_SECONDS:
+        return snapshot
+
+    own_session = db is None
+    if own_session:
+        from database.database import SessionLocal
+        db = SessionLocal()
+    try:
+        if snapshot is None or _table_stamp(db) != snapshot.stamp:
+            return reload_currency_snapshot(db)
+        _state["checked_at"] = now
+        return snapshot
+    except Exception as e:
+        if snapshot is not None:
+            return snapshot
+        print(f"⚠️ Currency references unavailable, using defaults: {e}")
+        fallback = CurrencySnapshot(_default_rows(), source="defaults")
+        with _lock:
+            _state["snapshot"] = fallback
+            _state["checked_at"] = now
+        return fallback
+    finally:
+        if own_session:
+            db.close()
+
+
+def seed_currency_references(db: Session) -> int:
+    """Copy the CURRENCY_REFERENCE defaults into an empty currency_references table"""
+    if db.query(CurrencyReference.id).first() is not None:
+        return 0
+    rows = _default_rows()
+    db.add_all([
+        CurrencyReference(currency=code, eur_rate=rate, min_deposit=min_deposit,
+                          max_deposit=max_deposit, rounding_step=step)
+        for code, rate, min_deposit, max_deposit, step in rows
+    ])
+    db.commit()
+    return len(rows)
@@ -1,4 +1,5 @@
-# Currency reference sheet - easily editable
+# Currency reference sheet - default rates seeded into currency_references
+# (the live rates come from services.currency_registry)
 # Base currency is EUR
 CURRENCY_REFERENCE = {
     "EUR": {"rate": 1.0, "min_deposit": 25, "max_deposit": 300},
@@ -40,26 +41,31 @@ LANGUAGE_CURRENCY_VARIANTS = {
     "fr": ["CAD_fr"],
 }
 
+# Symbols written before the amount in offer texts; other currencies are
+# written as "<amount> <code>"
+CURRENCY_SYMBOLS = {
+    "EUR": "€", "USD": "$", "GBP": "£", "AUD": "A$", "NZD": "NZ$",
+    "CAD": "C$", "BRL": "R$", "CLP": "CLP$", "MXN": "MX$", "TRY": "₺",
+    "RUB": "₽", "KZT": "₸", "AZN": "₼", "JPY": "¥", "NGN": "₦",
+}
+
 
 def convert_eur_to_currency(eur_amount: float, currency: str) -> float:
-    """Convert EUR amount to specified currency using reference sheet"""
-    if currency not in CURRENCY_REFERENCE:
-        return eur_amount
-    rate = CURRENCY_REFERENCE[currency]["rate"]
-    return round(eur_amount * rate)
+    """Convert EUR amount to specified currency using the current rate snapshot"""
+    from services.currency_registry import get_currency_snapshot
+    return get_currency_snapshot().convert(eur_amount, currency)
 
 
 def get_all_currency_conversions(eur_amount: float) -> dict:
     """Convert EUR amount to all currencies"""
-    conversions = {}
-    for currency in CURRENCY_REFERENCE.keys():
-        conversions[currency] = convert_eur_to_currency(eur_amount, currency)
-    return conversions
+    from services.currency_registry import get_currency_snapshot
+    return get_currency_snapshot().convert_all(eur_amount)
 
 
 def get_all_currencies():
     """Get list of all supported currencies"""
-    return list(CURRENCY_REFERENCE.keys())
+    from services.currency_registry import get_currency_snapshot
+    return list(get_currency_snapshot().currencies)
 
 
 def get_all_languages():
@@ -0,0 +1,189 @@
+"""
+Columnar per-currency template values.
+
+The JSON fields {"*": 300, "EUR": 300, "USD": 330, ...} are mirrored into
+template_currency_values (template_id, field, currency, value) so pricing
+questions ("all reloads with EUR maximum_amount > 300", "average EUR cost
+per provider") run as indexed SQL instead of Python scans over the blobs.
+sync_currency_values is called from sync_template_derived on every write.
+"""
+
+import operator
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session, aliased
+
+from database.models import BonusTemplate, TemplateCurrencyValue
+
+VALUE_FIELDS = (
+    "minimum_amount",
+    "maximum_amount",
+    "cost",
+    "multiplier",
+    "maximum_bets",
+    "minimum_stake_to_wager",
+    "maximum_stake_to_wager",
+    "maximum_withdraw",
+)
+
+OPERATORS = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+}
+
+AGGREGATES = {
+    "count": func.count,
+    "sum": func.sum,
+    "avg": func.avg,
+    "min": func.min,
+    "max": func.max,
+}
+
+# Template columns usable as filters and aggregate groups
+TEMPLATE_DIMENSIONS = ("provider", "brand", "bonus_type", "trigger_type", "category")
+
+
+def _number(value) -> Optional[float]:
+    if isinstance(value, dict):
+        # maximumWithdraw may be stored as {"cap": 3}
+        value = value.get("cap")
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return None
+
+
+def template_currency_values(template: BonusTemplate) -> Dict[Tuple[str, str], float]:
+    """{(field, currency): value} for every numeric per-currency value"""
+    values = {}
+    for field in VALUE_FIELDS:
+        data = getattr(template, field)
+        if not isinstance(data, dict):
+            continue
+        for currency, raw in data.items():
+            number = _number(raw)
+            if number is not None:
+                values[(field, str(currency))] = number
+    return values
+
+
+def sync_currency_values(template: BonusTemplate):
+    """Make template.currency_values match the JSON fields (only changed rows are written)"""
+    wanted = template_currency_values(template)
+    for row in list(template.currency_values):
+        key = (row.field, row.currency)
+        if key not in wanted:
+            template.currency_values.remove(row)
+            continue
+        value = wanted.pop(key)
+        if row.value != value:
+            row.value = value
+    for (field, currency), value in sorted(wanted.items()):
+        template.currency_values.append(
+            TemplateCurrencyValue(field=field, currency=currency, value=value))
+
+
+def matching_templates_query(db: Session, filters: Iterable[Dict[str, Any]] = (),
+                             **dimensions: Optional[str]):
+    """
+    Template ids matching every numeric filter
+    ({"field", "currency", "op", "value"}) and template column filters.
+    Each filter is one join on the (field, currency, value) index.
+    """
+    query = db.query(BonusTemplate.id)
+    for item in filters:
+        values = aliased(TemplateCurrencyValue)
+        compare = OPERATORS[item.get("op", "gt")]
+        query = query.join(values, and_(
+            values.template_id == BonusTemplate.id,
+            values.field == item["field"],
+            values.currency == item.get("currency", "EUR"),
+            compare(values.value, item["value"]),
+        ))
+    for dimension, value in dimensions.items():
+        if value is not None:
+            query = query.filter(getattr(BonusTemplate, dimension) == value)
+    return query
+
+
+def validate_query(filters: Iterable[Dict[str, Any]], aggregate: Optional[Dict[str, Any]]):
+    """ValueError for unknown fields, operators, functions or group columns"""
+    for item in filters:
+        if item["field"] not in VALUE_FIELDS:
+            raise ValueError(f"Unknown field '{item['field']}'. Use: {', '.join(VALUE_FIELDS)}")
+        if item.get("op", "gt") not in OPERATORS:
+            raise ValueError(f"Unknown op '{item['op']}'. Use: {', '.join(OPERATORS)}")
+    if aggregate:
+        if aggregate["field"] not in VALUE_FIELDS:
+            raise ValueError(f"Unknown aggregate field '{aggregate['field']}'")
+        unknown = [f for f in aggregate.get("functions") or [] if f not in AGGREGATES]
+        if unknown:
+            raise ValueError(f"Unknown functions: {', '.join(unknown)}. Use: {', '.join(AGGREGATES)}")
+        group_by = aggregate.get("group_by")
+        if group_by and group_by not in TEMPLATE_DIMENSIONS:
+            raise ValueError(f"Unknown group_by '{group_by}'. Use: {', '.join(TEMPLATE_DIMENSIONS)}")
+
+
+def query_currency_values(db: Session, filters: List[Dict[str, Any]],
+                          dimensions: Dict[str, Optional[str]],
+                          aggregate: Optional[Dict[str, Any]] = None,
+                          limit: int = 100, offset: int = 0) -> Dict[str, Any]:
+    """Matching templates (with the filtered values) and optional aggregates"""
+    validate_query(filters, aggregate)
+    matching = matching_templates_query(db, filters, **dimensions)
+    total = matching.count()
+    ids = [template_id for (template_id,) in
+           matching.order_by(BonusTemplate.id).offset(offset).limit(limit).all()]
+
+    # Values of the filtered (field, currency) pairs for the returned page
+    pairs = {(item["field"], item.get("currency", "EUR")) for item in filters}
+    values: Dict[str, Dict[str, Dict[str, float]]] = {template_id: {} for template_id in ids}
+    if ids and pairs:
+        rows = db.query(TemplateCurrencyValue).filter(
+            TemplateCurrencyValue.template_id.in_(ids),
+            TemplateCurrencyValue.field.in_({field for field, _ in pairs}),
+        ).all()
+        for row in rows:
+            if (row.field, row.currency) in pairs:
+                values[row.template_id].setdefault(row.field, {})[row.currency] = row.value
+
+    result = {
+        "total": total,
+        "templates": [{"id": template_id, "values": values[template_id]} for template_id in ids],
+    }
+    if aggregate:
+        result["aggregates"] = aggregate_currency_values(db, matching, aggregate)
+    return result
+
+
+def aggregate_currency_values(db: Session, matching, aggregate: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Aggregates of one (field, currency) over the matching templates"""
+    functions = aggregate.get("functions") or list(AGGREGATES)
+    group_by = aggregate.get("group_by")
+    value = TemplateCurrencyValue.value
+    columns = [AGGREGATES[name](value).label(name) for name in functions]
+    if group_by:
+        columns.insert(0, getattr(BonusTemplate, group_by).label(group_by))
+
+    query = db.query(*columns).select_from(TemplateCurrencyValue).filter(
+        TemplateCurrencyValue.field == aggregate["field"],
+        TemplateCurrencyValue.currency == aggregate.get("currency", "EUR"),
+        TemplateCurrencyValue.template_id.in_(matching.subquery().select()),
+    )
+    if group_by:
+        group_column = getattr(BonusTemplate, group_by)
+        query = query.join(BonusTemplate, BonusTemplate.id == TemplateCurrencyValue.template_id)
+        query = query.group_by(group_column).order_by(group_column)
+
+    rows = []
+    for row in query.all():
+        item = dict(row._mapping)
+        for name in functions:
+            if item[name] is not None and name != "count":
+                item[name] = round(float(item[name]), 4)
+        rows.append(item)
+    return rows
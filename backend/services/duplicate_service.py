@@ -0,0 +1,160 @@
+"""
+Duplicate template detection.
+
+Every template stores content_hash: the sha256 of a canonical form of its
+trigger, config and translations that leaves out the id, the schedule and
+anything that only records when or by whom it was made (notes, pricing
+lineage, timestamps). Dates inside names and descriptions are masked, so
+the same weekly reload re-created with another date hashes the same.
+Numbers are normalized (25 == 25.0), maps are key-sorted, text whitespace
+is collapsed and segment/country lists are compared as sets.
+
+content_hash is indexed; "duplicates of X" and the catalogue report are
+index lookups. It is maintained by sync_template_derived and by the
+translation writers.
+"""
+
+import hashlib
+import json
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from database.models import BonusTemplate, BonusTranslation
+
+# 21.11.25, 21/11/2025, 2025-11-21 (amounts like 0.50 are left alone)
+DATE_PATTERN = re.compile(r"\b\d{1,4}[./-]\d{1,2}[./-]\d{2,4}\b")
+DATE_MASK = "{date}"
+
+TRIGGER_FIELDS = (
+    "trigger_type", "trigger_iterations", "trigger_duration", "trigger_schedule",
+    "trigger_name", "trigger_description", "minimum_amount",
+)
+CONFIG_FIELDS = (
+    "cost", "multiplier", "maximum_bets", "percentage", "wagering_multiplier",
+    "minimum_stake_to_wager", "maximum_stake_to_wager", "maximum_amount",
+    "maximum_withdraw", "include_amount_on_target_wager", "cap_calculation_to_maximum",
+    "compensate_overspending", "withdraw_active", "category", "provider", "brand",
+    "bonus_type", "config_type", "game", "expiry", "config_extra",
+)
+TEXT_FIELDS = ("trigger_name", "trigger_description")
+
+
+def _text(value: str, mask_dates: bool) -> str:
+    value = " ".join(value.split())
+    return DATE_PATTERN.sub(DATE_MASK, value) if mask_dates else value
+
+
+def normalize(value: Any, mask_dates: bool = False) -> Any:
+    """Canonical JSON-ready form; empty values become None"""
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        number = float(value)
+        return int(number) if number.is_integer() else number
+    if isinstance(value, str):
+        return _text(value, mask_dates) or None
+    if isinstance(value, dict):
+        items = {str(k): normalize(v, mask_dates) for k, v in value.items()}
+        items = {k: v for k, v in items.items() if v is not None}
+        return items or None
+    if isinstance(value, (list, tuple)):
+        items = [normalize(v, mask_dates) for v in value]
+        return items or None
+    return str(value)
+
+
+def _string_set(values) -> Optional[List[str]]:
+    items = sorted({str(v).strip().upper() for v in values or [] if str(v).strip()})
+    return items or None
+
+
+def template_content(template: BonusTemplate,
+                     translations: Optional[Iterable[BonusTranslation]] = None) -> Dict[str, Any]:
+    """Canonical content of a template (what the hash covers)"""
+    if translations is None:
+        translations = template.translations
+    trigger = {field: normalize(getattr(template, field), field in TEXT_FIELDS)
+               for field in TRIGGER_FIELDS}
+    trigger["segments"] = _string_set(template.segments)
+    trigger["restricted_countries"] = _string_set(template.restricted_countries)
+    config = {field: normalize(getattr(template, field)) for field in CONFIG_FIELDS}
+    config["proportions"] = normalize(template.proportions)
+    texts = {}
+    for translation in translations:
+        texts[translation.language] = normalize({
+            "currency": translation.currency,
+            "name": translation.name,
+            "description": translation.description,
+        }, mask_dates=True)
+    return {"trigger": trigger, "config": config, "translations": texts}
+
+
+def template_content_hash(template: BonusTemplate,
+                          translations: Optional[Iterable[BonusTranslation]] = None) -> str:
+    raw = json.dumps(template_content(template, translations), sort_keys=True,
+                     separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def sync_content_hash(template: BonusTemplate,
+                      translations: Optional[Iterable[BonusTranslation]] = None):
+    """Recompute template.content_hash (call before commit; pass the final
+    translations when they were changed outside template.translations)"""
+    digest = template_content_hash(template, translations)
+    if template.content_hash != digest:
+        template.content_hash = digest
+
+
+def find_duplicates(db: Session, template: BonusTemplate) -> List[BonusTemplate]:
+    """Other templates with the same content, oldest first"""
+    if not template.content_hash:
+        return []
+    return db.query(BonusTemplate).filter(
+        BonusTemplate.content_hash == template.content_hash,
+        BonusTemplate.id != template.id,
+    ).order_by(BonusTemplate.created_at, BonusTemplate.id).all()
+
+
+def duplicate_summary(template: BonusTemplate) -> Dict[str, Any]:
+    return {
+        "id": template.id,
+        "schedule_from": template.schedule_from,
+        "schedule_to": template.schedule_to,
+        "created_at": template.created_at,
+    }
+
+
+def duplicate_report(db: Session, limit: int = 100, offset: int = 0,
+                     **filters: Optional[str]) -> Dict[str, Any]:
+    """Groups of templates sharing a content hash, largest groups first"""
+    groups = db.query(BonusTemplate.content_hash, func.count(BonusTemplate.id).label("count")).filter(
+        BonusTemplate.content_hash != None)
+    for column, value in filters.items():
+        if value is not None:
+            groups = groups.filter(getattr(BonusTemplate, column) == value)
+    groups = groups.group_by(BonusTemplate.content_hash).having(func.count(BonusTemplate.id) > 1)
+
+    total = groups.count()
+    page = groups.order_by(func.count(BonusTemplate.id).desc(),
+                           BonusTemplate.content_hash).offset(offset).limit(limit).all()
+
+    members: Dict[str, List[BonusTemplate]] = {digest: [] for digest, _ in page}
+    if members:
+        query = db.query(BonusTemplate).filter(BonusTemplate.content_hash.in_(list(members)))
+        for column, value in filters.items():
+            if value is not None:
+                query = query.filter(getattr(BonusTemplate, column) == value)
+        for template in query.order_by(BonusTemplate.created_at, BonusTemplate.id).all():
+            members[template.content_hash].append(template)
+
+    return {
+        "groups": total,
+        "duplicates": [
+            {"content_hash": digest, "count": count,
+             "templates": [duplicate_summary(t) for t in members[digest]]}
+            for digest, count in page
+        ],
+    }
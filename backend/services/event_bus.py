@@ -0,0 +1,265 @@
+"""
+Change notification bus behind the /events SSE stream.
+
+Write handlers publish compact change events after their commit; every open
+/events stream whose filters match gets a copy. Fan-out is in-process by
+default. With several workers set EVENTS_BROADCAST=postgres so events travel
+through Postgres LISTEN/NOTIFY and reach streams held by the other workers.
+InMemoryBroadcast is the stand-in for that channel in tests.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+# Per-stream buffer; slow consumers lose the oldest events rather than block writers
+SUBSCRIBER_QUEUE_SIZE = 256
+
+FILTER_FIELDS = ("month", "provider", "template_id")
+
+
+class Subscription:
+    """One open event stream with its filters and delivery queue"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, filters: Dict[str, Optional[str]]):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.filters = {k: v for k, v in filters.items() if v}
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        """
+        A filter only rejects events that carry that field with another value.
+        Stable-config events have no template or month, so they reach every
+        stream watching their provider.
+        """
+        for field, wanted in self.filters.items():
+            value = event.get(field)
+            if value is None:
+                continue
+            if field == "provider":
+                if str(value).upper() != wanted.upper():
+                    return False
+            elif value != wanted:
+                return False
+        return True
+
+    def push(self, event: Dict[str, Any]):
+        """Runs on the subscriber's event loop"""
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(event)
+
+
+class InMemoryBroadcast:
+    """
+    Stand-in for the cross-worker channel. Every attached bus receives every
+    event, the same as several workers listening on one Postgres channel.
+    """
+
+    def __init__(self):
+        self._listeners = []
+
+    def attach(self, deliver: Callable[[Dict[str, Any]], None]):
+        self._listeners.append(deliver)
+
+    def send(self, event: Dict[str, Any]):
+        for deliver in list(self._listeners):
+            deliver(event)
+
+    def close(self):
+        self._listeners = []
+
+
+class PostgresBroadcast:
+    """Cross-worker broadcast over Postgres LISTEN/NOTIFY"""
+
+    CHANNEL = "campeon_crm_events"
+
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self._deliver = None
+        self._send_conn = None
+        self._send_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def attach(self, deliver: Callable[[Dict[str, Any]], None]):
+        self._deliver = deliver
+        self._thread = threading.Thread(
+            target=self._listen, name="event-bus-listener", daemon=True)
+        self._thread.start()
+
+    def send(self, event: Dict[str, Any]):
+        import psycopg2
+
+        payload = json.dumps(event, default=str)
+        with self._send_lock:
+            for attempt in range(2):
+                try:
+                    if self._send_conn is None or self._send_conn.closed:
+                        self._send_conn = psycopg2.connect(self.dsn)
+                        self._send_conn.autocommit = True
+                    with self._send_conn.cursor() as cursor:
+                        cursor.execute("SELECT pg_notify(%s, %s)",
+                                       (self.CHANNEL, payload))
+                    return
+                except psycopg2.Error as e:
+                    self._send_conn = None
+                    if attempt:
+                        print(f"⚠️  Event broadcast failed: {e}")
+
+    def _listen(self):
+        import select
+        import psycopg2
+
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(self.dsn)
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self.CHANNEL}")
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 5) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        try:
+                            self._deliver(json.loads(notify.payload))
+                        except ValueError:
+                            continue
+            except psycopg2.Error as e:
+                print(f"⚠️  Event listener reconnecting: {e}")
+                time.sleep(2)
+            finally:
+                if conn is not None and not conn.closed:
+                    conn.close()
+
+    def close(self):
+        self._stop.set()
+        with self._send_lock:
+            if self._send_conn is not None and not self._send_conn.closed:
+                self._send_conn.close()
+
+
+class EventBus:
+    """Fans change events out to open /events streams"""
+
+    def __init__(self, broadcast=None):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._sequence = itertools.count(1)
+        self.broadcast = broadcast
+        if broadcast is not None:
+            broadcast.attach(self._deliver)
+
+    def subscribe(self, **filters) -> Subscription:
+        """Register a stream; must be called from the stream's event loop"""
+        subscription = Subscription(asyncio.get_running_loop(), filters)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event_type: str, **fields) -> Dict[str, Any]:
+        """Publish a change event. Safe to call from sync handlers running in the threadpool."""
+        event = {
+            "id": f"{os.getpid()}-{next(self._sequence)}",
+            "type": event_type,
+            "ts": datetime.utcnow().isoformat(),
+        }
+        event.update({k: v for k, v in fields.items() if v is not None})
+
+        if self.broadcast is not None:
+            self.broadcast.send(event)
+        else:
+            self._deliver(event)
+        return event
+
+    def _deliver(self, event: Dict[str, Any]):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            if not subscription.matches(event):
+                continue
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    subscription.push, event)
+            except RuntimeError:
+                # Loop already closed - the stream is going away
+                self.unsubscribe(subscription)
+
+    def close(self):
+        if self.broadcast is not None:
+            self.broadcast.close()
+
+
+_event_bus: Optional[EventBus] = None
+_event_bus_lock = threading.Lock()
+
+
+def _make_broadcast():
+    mode = os.getenv("EVENTS_BROADCAST", "").lower()
+    if mode != "postgres":
+        return None
+
+    from database.database import engine
+    if engine.dialect.name != "postgresql":
+        print("⚠️  EVENTS_BROADCAST=postgres ignored: database is not PostgreSQL")
+        return None
+    dsn = engine.url.set(drivername="postgresql").render_as_string(
+        hide_password=False)
+    return PostgresBroadcast(dsn)
+
+
+def get_event_bus() -> EventBus:
+    """Process-wide event bus, created on first use"""
+    global _event_bus
+    if _event_bus is None:
+        with _event_bus_lock:
+            if _event_bus is None:
+                _event_bus = EventBus(broadcast=_make_broadcast())
+    return _event_bus
+
+
+def set_event_bus(bus: Optional[EventBus]):
+    """Swap the process-wide bus (tests use this with an InMemoryBroadcast)"""
+    global _event_bus
+    with _event_bus_lock:
+        if _event_bus is not None and _event_bus is not bus:
+            _event_bus.close()
+        _event_bus = bus
+
+
+def template_month(template) -> Optional[str]:
+    """Month key used by the browser screens, which list templates by created_at"""
+    if template is None or template.created_at is None:
+        return None
+    return template.created_at.strftime("%Y-%m")
+
+
+def publish_template_event(event_type: str, template, **extra) -> Dict[str, Any]:
+    """Publish a template-scoped change event"""
+    return get_event_bus().publish(
+        event_type,
+        template_id=template.id,
+        provider=template.provider,
+        month=template_month(template),
+        **extra,
+    )
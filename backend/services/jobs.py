@@ -0,0 +1,121 @@
+"""
+Background jobs with progress tracking in the background_jobs table.
+
+A job row is created by the request, the work runs after the response
+(FastAPI BackgroundTasks) with its own session, and clients poll
+GET /jobs/{id}. Long loops call JobContext.progress() between chunks, which
+commits the progress and stops the job when a cancel was requested.
+"""
+
+import traceback
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from database.models import BackgroundJob
+
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when a cancel was requested"""
+
+
+class JobContext:
+    """Handle a running job uses to report progress"""
+
+    def __init__(self, db: Session, job: BackgroundJob):
+        self.db = db
+        self.job = job
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return self.job.params or {}
+
+    def set_total(self, total: int):
+        self.job.total = total
+        self.db.commit()
+
+    def progress(self, processed: int, result: Optional[Dict[str, Any]] = None):
+        """Commit progress (and any pending work); raise JobCancelled if asked to stop"""
+        self.job.processed = processed
+        if result is not None:
+            self.job.result = result
+        self.db.commit()
+        self.db.refresh(self.job, ["cancel_requested"])
+        if self.job.cancel_requested:
+            raise JobCancelled()
+
+
+def create_job(db: Session, kind: str, params: Dict[str, Any], created_by: Optional[str] = None) -> BackgroundJob:
+    job = BackgroundJob(kind=kind, status="queued", params=params,
+                        created_by=created_by, total=0, processed=0)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def run_job(job_id: int, work: Callable[[JobContext], Dict[str, Any]]):
+    """Execute a queued job; `work` returns the final result"""
+    from database.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        job = db.get(BackgroundJob, job_id)
+        if job is None or job.status != "queued":
+            return
+        if job.cancel_requested:
+            job.status = "cancelled"
+            job.finished_at = datetime.utcnow()
+            db.commit()
+            return
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        db.commit()
+
+        context = JobContext(db, job)
+        try:
+            result = work(context)
+            job.result = result
+            job.status = "completed"
+        except JobCancelled:
+            # Chunks committed before the cancel stay written
+            db.rollback()
+            job.status = "cancelled"
+        job.finished_at = datetime.utcnow()
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Job {job_id} failed: {e}")
+        traceback.print_exc()
+        job = db.get(BackgroundJob, job_id)
+        if job is not None:
+            job.status = "failed"
+            job.error = str(e)
+            job.finished_at = datetime.utcnow()
+            db.commit()
+    finally:
+        db.close()
+
+
+def job_to_dict(job: BackgroundJob, include_result: bool = True) -> Dict[str, Any]:
+    data = {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "params": job.params,
+        "total": job.total,
+        "processed": job.processed,
+        "progress": round(job.processed * 100 / job.total, 1) if job.total else None,
+        "error": job.error,
+        "cancel_requested": job.cancel_requested,
+        "created_by": job.created_by,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+    if include_result:
+        data["result"] = job.result
+    return data
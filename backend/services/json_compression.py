@@ -0,0 +1,157 @@
+"""
+Maintenance of the compressed JSON columns (database/compressed_json.py):
+training a zstd dictionary on the catalogue, converting column storage
+and rewriting rows with the active dictionary.
+"""
+
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import inspect as sa_inspect, select, text
+from sqlalchemy.orm import Session
+
+from database import compressed_json
+from database.compressed_json import CompressedJSON, registry, serialize
+from database.models import Base, CompressionDictionary
+
+DEFAULT_DICT_SIZE = 32 * 1024
+MAX_SAMPLES = 50000
+
+
+def compressed_columns() -> List[Tuple[Any, List[Any]]]:
+    """(table, [CompressedJSON columns]) for every table that has some"""
+    tables = []
+    for table in Base.metadata.sorted_tables:
+        columns = [c for c in table.columns if isinstance(c.type, CompressedJSON)]
+        if columns:
+            tables.append((table, columns))
+    return tables
+
+
+def collect_samples(db: Session, limit: int = MAX_SAMPLES) -> List[bytes]:
+    """Serialized values of every compressed column, up to `limit`"""
+    samples = []
+    for table, columns in compressed_columns():
+        for row in db.execute(select(*columns)).yield_per(1000):
+            for value in row:
+                if value is not None:
+                    samples.append(serialize(value))
+                    if len(samples) >= limit:
+                        return samples
+    return samples
+
+
+def train_dictionary(db: Session, dict_size: int = DEFAULT_DICT_SIZE,
+                     max_samples: int = MAX_SAMPLES) -> CompressionDictionary:
+    """Train, store and activate a new dictionary (commits)"""
+    zstd = compressed_json._zstd()
+    samples = collect_samples(db, max_samples)
+    try:
+        trained = zstd.train_dictionary(dict_size, samples)
+    except zstd.ZstdError as e:
+        raise ValueError(f"Cannot train a dictionary from {len(samples)} values: {e}")
+
+    row = db.get(CompressionDictionary, trained.dict_id())
+    if row is None:
+        row = CompressionDictionary(id=trained.dict_id(), data=trained.as_bytes(),
+                                    samples=len(samples))
+        db.add(row)
+        db.commit()
+    registry.register(row.id, row.data)
+    return row
+
+
+def unconverted_columns(bind) -> List[str]:
+    """
+    PostgreSQL: the compressed columns still typed JSON ("table.column"),
+    i.e. migrate_compress_json.py has not converted them to BYTEA yet.
+    Always empty on SQLite.
+    """
+    if bind.dialect.name != "postgresql":
+        return []
+    inspector = sa_inspect(bind)
+    unconverted = []
+    for table, columns in compressed_columns():
+        types = {c["name"]: str(c["type"]).upper() for c in inspector.get_columns(table.name)}
+        unconverted += [f"{table.name}.{column.name}" for column in columns
+                        if types.get(column.name) != "BYTEA"]
+    return unconverted
+
+
+def convert_column_storage(db: Session, to_binary: bool = True) -> List[str]:
+    """
+    PostgreSQL: switch the compressed columns between JSON and BYTEA.
+    SQLite stores any value in any column, so there is nothing to change.
+    Returns the converted "table.column" names.
+    """
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return []
+    inspector = sa_inspect(bind)
+    converted = []
+    for table, columns in compressed_columns():
+        types = {c["name"]: str(c["type"]).upper() for c in inspector.get_columns(table.name)}
+        for column in columns:
+            is_binary = types.get(column.name) == "BYTEA"
+            if is_binary == to_binary:
+                continue
+            if to_binary:
+                using = f"convert_to({column.name}::text, 'UTF8')"
+                target = "BYTEA"
+            else:
+                using = f"convert_from({column.name}, 'UTF8')::json"
+                target = "JSON"
+            db.execute(text(f"ALTER TABLE {table.name} ALTER COLUMN {column.name} "
+                            f"TYPE {target} USING {using}"))
+            converted.append(f"{table.name}.{column.name}")
+    db.commit()
+    return converted
+
+
+def rewrite_rows(db: Session, compress: bool = True, batch_size: int = 500) -> Dict[str, int]:
+    """
+    Rewrite every compressed column value with the active dictionary
+    (compress=False writes plain JSON). Timestamps with onupdate are kept.
+    Tables with compressed columns have single-column primary keys.
+    Returns rows rewritten per table.
+    """
+    previous = compressed_json.compress_writes
+    compressed_json.compress_writes = compress
+    counts = {}
+    try:
+        for table, columns in compressed_columns():
+            (key,) = table.primary_key.columns
+            # Written back unchanged so onupdate does not stamp them
+            kept = [c for c in table.columns if c.onupdate is not None]
+            counts[table.name] = 0
+            last = None
+            while True:
+                query = select(key, *columns, *kept).order_by(key).limit(batch_size)
+                if last is not None:
+                    query = query.where(key > last)
+                rows = db.execute(query).all()
+                if not rows:
+                    break
+                for row in rows:
+                    values = dict(row._mapping)
+                    last = values.pop(key.name)
+                    db.execute(table.update().where(key == last).values(**values))
+                db.commit()
+                counts[table.name] += len(rows)
+    finally:
+        compressed_json.compress_writes = previous
+    return counts
+
+
+def storage_sizes(db: Session) -> Dict[str, int]:
+    """Stored bytes per compressed column ("table.column")"""
+    if db.get_bind().dialect.name == "postgresql":
+        size = "pg_column_size({})"  # After TOAST compression
+    else:
+        size = "LENGTH(CAST({} AS BLOB))"
+    sizes = {}
+    for table, columns in compressed_columns():
+        for column in columns:
+            total = db.execute(text(
+                f"SELECT SUM({size.format(column.name)}) FROM {table.name}")).scalar()
+            sizes[f"{table.name}.{column.name}"] = int(total or 0)
+    return sizes
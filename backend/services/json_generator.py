@@ -7,11 +7,10 @@ from datetime import datetime
 from typing import Dict, Any, Optional
 from sqlalchemy.orm import Session
 from database.models import BonusTemplate, BonusTranslation
+from services.currency_registry import get_currency_snapshot
 from services.currency_service import (
     LANGUAGE_CURRENCY_VARIANTS,
     LANGUAGES,
-    convert_eur_to_currency,
-    CURRENCY_REFERENCE
 )
 
 
@@ -128,20 +127,21 @@ def generate_bonus_json_with_currencies(template_id: str, db: Session) -> Option
     eur_min_stake = base_json["config"]["minimumStakeToWager"].get("*", 0.5)
     eur_max_stake = base_json["config"]["maximumStakeToWager"].get("*", 5)
 
-    # Convert to all currencies
-    for currency in CURRENCY_REFERENCE.keys():
+    # Convert to all currencies in one batch; the minimum amount is a deposit
+    # and is clamped to each currency's deposit limits
+    snapshot = get_currency_snapshot(db)
+    converted = snapshot.convert_matrix(
+        [[eur_min_amount, eur_max_amount]], clamp_fields=[True, False])
+    values = snapshot.matrix_to_dicts(converted, ["min", "max"])[0]
+    for currency in snapshot.currencies:
         if currency == "EUR":
             continue
 
-        # Convert amounts
-        min_converted = convert_eur_to_currency(eur_min_amount, currency)
-        max_converted = convert_eur_to_currency(eur_max_amount, currency)
-
         # Add to minimumAmount
-        extended_json["trigger"]["minimumAmount"][currency] = min_converted
+        extended_json["trigger"]["minimumAmount"][currency] = values["min"][currency]
 
         # Add to maximumAmount
-        extended_json["config"]["maximumAmount"][currency] = max_converted
+        extended_json["config"]["maximumAmount"][currency] = values["max"][currency]
 
     return extended_json
 
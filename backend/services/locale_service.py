@@ -0,0 +1,134 @@
+"""
+Locale fallback resolution for translated template texts.
+
+Fallback chains are compiled once per set of custom languages:
+    GBP_en -> en -> *
+    pt-BR  -> pt -> *
+    de     -> *
+"*" itself resolves to an explicit "*" translation, then English, then the
+first base language in LANGUAGES order, then any other locale.
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from database.models import CustomLanguage
+from services.currency_service import LANGUAGES, LANGUAGE_CURRENCY_VARIANTS
+
+DEFAULT_LOCALE = "*"
+
+VARIANT_CODES = {v for variants in LANGUAGE_CURRENCY_VARIANTS.values() for v in variants}
+
+
+def translation_key(language: Optional[str], currency: Optional[str]) -> Optional[str]:
+    """
+    Locale a translation row is for. Currency-variant rows may be stored as
+    language="GBP_en", or as language="en" with currency="GBP_en".
+    """
+    if currency in VARIANT_CODES:
+        return currency
+    return language
+
+
+def collect_texts(translations: Iterable) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Explicit name/description per locale (no fallbacks applied)"""
+    names: Dict[str, str] = {}
+    descriptions: Dict[str, str] = {}
+    for translation in translations:
+        key = translation_key(translation.language, translation.currency)
+        if not key:
+            continue
+        if translation.name:
+            names[key] = translation.name
+        if translation.description:
+            descriptions[key] = translation.description
+    return names, descriptions
+
+
+def default_text(texts: Dict[str, str]) -> Optional[str]:
+    """Value for "*": explicit "*", then en, then LANGUAGES order, then any locale"""
+    for code in (DEFAULT_LOCALE, "en", *LANGUAGES):
+        if texts.get(code):
+            return texts[code]
+    for code in sorted(texts):
+        if texts[code]:
+            return texts[code]
+    return None
+
+
+class LocaleResolver:
+    """Compiled fallback chains for every known locale"""
+
+    def __init__(self, custom_languages: Iterable[str] = ()):
+        self.chains: Dict[str, Tuple[str, ...]] = {DEFAULT_LOCALE: (DEFAULT_LOCALE,)}
+        for language in LANGUAGES:
+            self.chains[language] = (language, DEFAULT_LOCALE)
+        for language, variants in LANGUAGE_CURRENCY_VARIANTS.items():
+            for variant in variants:
+                self.chains[variant] = (variant, language, DEFAULT_LOCALE)
+        for code in custom_languages:
+            if code not in self.chains:
+                self.chains[code] = self._chain_for(code)
+        self.locales: List[str] = list(self.chains)
+
+    def _chain_for(self, locale: str) -> Tuple[str, ...]:
+        """Chain for a locale that was not compiled (e.g. an ad-hoc code)"""
+        chain = [locale]
+        if "_" in locale:
+            # CUR_lang variant
+            chain.append(locale.split("_", 1)[1])
+        elif "-" in locale:
+            # lang-REGION
+            chain.append(locale.split("-", 1)[0])
+        for code in chain[1:]:
+            for parent in self.chains.get(code, ()):
+                if parent not in chain:
+                    chain.append(parent)
+        if DEFAULT_LOCALE not in chain:
+            chain.append(DEFAULT_LOCALE)
+        return tuple(chain)
+
+    def chain(self, locale: str) -> Tuple[str, ...]:
+        return self.chains.get(locale) or self._chain_for(locale)
+
+    def resolve(self, texts: Dict[str, str], locale: str) -> Tuple[Optional[str], Optional[str]]:
+        """(text, locale it came from) for one locale"""
+        for code in self.chain(locale):
+            if code == DEFAULT_LOCALE:
+                value = default_text(texts)
+            else:
+                value = texts.get(code)
+            if value:
+                return value, code
+        return None, None
+
+    def resolve_all(self, texts: Dict[str, str]) -> Dict[str, Optional[str]]:
+        """Fully resolved map over every known locale (and any extra explicit ones)"""
+        fallback = default_text(texts)
+        resolved: Dict[str, Optional[str]] = {}
+        for locale in self.locales + [k for k in texts if k not in self.chains]:
+            value = None
+            for code in self.chain(locale):
+                value = fallback if code == DEFAULT_LOCALE else texts.get(code)
+                if value:
+                    break
+            resolved[locale] = value
+        return resolved
+
+
+_resolver_cache: Dict[Tuple[str, ...], LocaleResolver] = {}
+_resolver_lock = threading.Lock()
+
+
+def get_locale_resolver(db: Session) -> LocaleResolver:
+    """Resolver for the current custom languages (compiled once per distinct set)"""
+    codes = tuple(sorted(code for (code,) in db.query(CustomLanguage.code).all()))
+    with _resolver_lock:
+        resolver = _resolver_cache.get(codes)
+        if resolver is None:
+            resolver = LocaleResolver(codes)
+            _resolver_cache.clear()
+            _resolver_cache[codes] = resolver
+    return resolver
@@ -0,0 +1,178 @@
+"""
+Pricing-table lineage for bonus templates.
+
+Per-currency template fields (cost, amounts, stakes, withdrawals) are copied
+from StableConfig pricing tables. A template records where each field came
+from in pricing_sources:
+    {"cost": {"provider": "PRAGMATIC", "table": "cost", "table_id": "1"}}
+and sync_template_derived mirrors it into bonus_template_pricing_sources,
+indexed by (provider, table kind, table id). When a table is saved, only
+the templates found through that index are recomputed.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from database.models import BonusTemplate, BonusTemplatePricingSource, StableConfig
+from services.template_sync import derived_load_options, sync_template_derived
+
+# StableConfig columns holding [{"id", "name", "values"}] tables
+TABLE_KINDS = (
+    "cost",
+    "maximum_amount",
+    "minimum_amount",
+    "minimum_stake_to_wager",
+    "maximum_stake_to_wager",
+    "maximum_withdraw",
+)
+
+# Template columns that can be copied from a table
+PRICED_FIELDS = TABLE_KINDS
+
+TableKey = Tuple[str, str]  # (table kind, table id)
+
+
+def validate_pricing_sources(sources: Optional[Dict[str, Any]]) -> Optional[Dict[str, Dict[str, str]]]:
+    """Normalized pricing_sources; ValueError when an entry cannot be indexed"""
+    if not sources:
+        return None
+    if not isinstance(sources, dict):
+        raise ValueError("pricing_sources must be an object keyed by field")
+    normalized = {}
+    for field, source in sources.items():
+        if field not in PRICED_FIELDS:
+            raise ValueError(f"'{field}' is not a priced field")
+        if not isinstance(source, dict):
+            raise ValueError(f"pricing_sources.{field} must be an object")
+        provider = str(source.get("provider") or "").strip().upper()
+        kind = str(source.get("table") or field).strip()
+        table_id = str(source.get("table_id") or "").strip()
+        if not provider or not table_id:
+            raise ValueError(f"pricing_sources.{field} needs provider and table_id")
+        if kind not in TABLE_KINDS:
+            raise ValueError(f"pricing_sources.{field}: unknown table '{kind}'")
+        normalized[field] = {"provider": provider, "table": kind, "table_id": table_id}
+    return normalized
+
+
+def snapshot_tables(config: Optional[StableConfig]) -> Dict[TableKey, Dict[str, Any]]:
+    """{(kind, table id): values} for every table in a StableConfig row"""
+    tables = {}
+    if config is None:
+        return tables
+    for kind in TABLE_KINDS:
+        for table in getattr(config, kind) or []:
+            if isinstance(table, dict) and table.get("id") is not None:
+                tables[(kind, str(table["id"]))] = dict(table.get("values") or {})
+    return tables
+
+
+def load_pricing_tables(db: Session) -> Dict[str, Dict[TableKey, Dict[str, Any]]]:
+    """{provider: {(kind, table id): values}} for every StableConfig row"""
+    return {(config.provider or "").upper(): snapshot_tables(config)
+            for config in db.query(StableConfig).all()}
+
+
+def source_table_values(source: Optional[Dict[str, Any]],
+                        tables: Dict[str, Dict[TableKey, Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    """Current values of the table a pricing_sources entry points at (None if gone)"""
+    if not source:
+        return None
+    provider = str(source.get("provider") or "").upper()
+    key = (source.get("table"), str(source.get("table_id")))
+    return tables.get(provider, {}).get(key)
+
+
+def changed_tables(before: Dict[TableKey, Dict[str, Any]],
+                   after: Dict[TableKey, Dict[str, Any]]) -> Dict[TableKey, Dict[str, Any]]:
+    """Tables whose values differ after a save (removed tables are not recomputable)"""
+    return {key: values for key, values in after.items()
+            if key in before and before[key] != values}
+
+
+def dependent_templates_query(db: Session, provider: str, tables):
+    """Templates with at least one field sourced from one of `tables`"""
+    by_kind: Dict[str, Set[str]] = {}
+    for kind, table_id in tables:
+        by_kind.setdefault(kind, set()).add(table_id)
+    match = or_(*[
+        and_(BonusTemplatePricingSource.table_kind == kind,
+             BonusTemplatePricingSource.table_id.in_(sorted(ids)))
+        for kind, ids in by_kind.items()
+    ])
+    template_ids = db.query(BonusTemplatePricingSource.template_id).filter(
+        BonusTemplatePricingSource.provider == provider.upper(), match
+    ).distinct()
+    return db.query(BonusTemplate).filter(BonusTemplate.id.in_(template_ids))
+
+
+def apply_table_values(values: Dict[str, Any], current: Any) -> Dict[str, Any]:
+    """Template field for a table's values ("*" follows EUR like the bonus forms)"""
+    base = values.get("EUR")
+    if base is None and isinstance(current, dict):
+        base = current.get("*")
+    return {"*": base, **values} if base is not None else dict(values)
+
+
+def recompute_dependents(db: Session, provider: str,
+                         changed: Dict[TableKey, Dict[str, Any]],
+                         since: Optional[datetime] = None) -> List[str]:
+    """
+    Rewrite the fields of templates sourced from changed tables and commit.
+    Campaigns that ended before `since` (default now) keep their values.
+    Returns the ids of the templates that changed.
+    """
+    if not changed:
+        return []
+    since = since or datetime.utcnow()
+    templates = dependent_templates_query(db, provider, changed).filter(
+        or_(BonusTemplate.schedule_to_at == None,
+            BonusTemplate.schedule_to_at >= since)
+    ).options(*derived_load_options()).order_by(BonusTemplate.id).all()
+
+    provider = provider.upper()
+    updated_ids = []
+    for template in templates:
+        touched = False
+        for link in template.pricing_links:
+            values = changed.get((link.table_kind, link.table_id))
+            if link.provider != provider or values is None:
+                continue
+            current = getattr(template, link.field)
+            new = apply_table_values(values, current)
+            if new != current:
+                setattr(template, link.field, new)
+                touched = True
+        if touched:
+            template.updated_at = datetime.utcnow()
+            sync_template_derived(db, template)
+            updated_ids.append(template.id)
+    db.commit()
+    return updated_ids
+
+
+def infer_pricing_sources(template: BonusTemplate,
+                          configs: List[StableConfig]) -> Dict[str, Dict[str, str]]:
+    """
+    Lineage for a template created before pricing_sources existed: a field is
+    attributed to a table when every currency of the table matches it.
+    Cost tables are looked up under the template's provider, the rest under DEFAULT.
+    """
+    by_provider = {config.provider: snapshot_tables(config) for config in configs}
+    sources = {}
+    for field in PRICED_FIELDS:
+        current = getattr(template, field)
+        if not isinstance(current, dict) or not current:
+            continue
+        provider = (template.provider or "").upper() if field == "cost" else "DEFAULT"
+        candidates = [
+            table_id for (kind, table_id), values in sorted(by_provider.get(provider, {}).items())
+            if kind == field and values
+            and all(current.get(code) == value for code, value in values.items())
+        ]
+        if len(candidates) == 1:
+            sources[field] = {"provider": provider, "table": field, "table_id": candidates[0]}
+    return sources
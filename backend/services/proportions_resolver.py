@@ -0,0 +1,165 @@
+"""
+Game contribution lookups over a proportions set.
+
+Keys are either provider-prefixed games ("SPINOMENAL.1 Reel Egypt"),
+provider-wide entries ("SPINOMENAL" or "SPINOMENAL.*") or categories
+("ROULETTE"). A set is compiled once into a character trie, and a game is
+resolved in one walk over its identifier:
+    1. exact game key          SPINOMENAL.1 Reel Egypt
+    2. provider key            SPINOMENAL / SPINOMENAL.*
+    3. category key            ROULETTE (category given with the game)
+    4. default key             *
+Matching ignores case and surrounding spaces. Compiled tries are cached with
+the parsed set.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from services.proportions_sets import get_cached_set
+
+PROVIDER_SEPARATOR = "."
+WILDCARD = "*"
+_VALUE = object()  # Trie node slot holding (original key, contribution)
+
+
+def _normalize(key: str) -> str:
+    key = key.strip().casefold()
+    if key.endswith(PROVIDER_SEPARATOR + WILDCARD):
+        key = key[:-2]
+    return key
+
+
+def _check_value(key: str, value: Any):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"'{key}': contribution must be a number")
+    if not 0 <= value <= 100:
+        raise ValueError(f"'{key}': contribution {value} is outside 0-100")
+
+
+def normalize_proportions(entries: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Clean a proportions map before it is stored: keys are stripped, and keys
+    that only differ by case or surrounding spaces (the pricing tables have
+    "Foxium.Foxpot " next to "Foxium.Foxpot") are merged into the first one.
+    Returns (entries, warnings); merges that drop a different contribution
+    and keys that are not PROVIDER.Game are warned about, not rejected.
+    ValueError only for what cannot be stored: a non-object map, empty keys
+    and contributions that are not numbers in 0-100.
+    """
+    if not isinstance(entries, dict):
+        raise ValueError("proportions must be an object of key: percentage")
+    cleaned: Dict[str, Any] = {}
+    seen: Dict[str, str] = {}
+    warnings: List[str] = []
+    for key, value in entries.items():
+        if not isinstance(key, str) or not key.strip():
+            raise ValueError("empty proportions key")
+        _check_value(key, value)
+        name = key.strip()
+        normalized = _normalize(name)
+        first = seen.get(normalized)
+        if first is not None:
+            if cleaned[first] != value:
+                warnings.append(f"'{key}' ({value}) duplicates '{first}' ({cleaned[first]}); "
+                                f"kept {cleaned[first]}")
+            continue
+        if PROVIDER_SEPARATOR in name and name != WILDCARD:
+            provider, game = name.split(PROVIDER_SEPARATOR, 1)
+            if not provider.strip() or not game.strip():
+                warnings.append(f"'{key}': expected PROVIDER.Game")
+        seen[normalized] = name
+        cleaned[name] = value
+    return cleaned, warnings
+
+
+class ProportionsTrie:
+    """Compiled proportions set"""
+
+    def __init__(self, entries: Dict[str, Any]):
+        self.root: Dict[Any, Any] = {}
+        self.categories: Dict[str, Tuple[str, float]] = {}
+        self.default: Optional[Tuple[str, float]] = None
+        for key, value in entries.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            if key == WILDCARD:
+                self.default = (key, value)
+                continue
+            normalized = _normalize(key)
+            if PROVIDER_SEPARATOR not in key:
+                # Bare keys are providers or categories; both are looked up
+                self.categories.setdefault(normalized, (key, value))
+            node = self.root
+            for char in normalized:
+                node = node.setdefault(char, {})
+            # Sets stored before normalization may still hold "X" and "X ": first wins
+            node.setdefault(_VALUE, (key, value))
+
+    def resolve(self, game: str, category: Optional[str] = None) -> Dict[str, Any]:
+        """Contribution of one game: walks the identifier once (O(len(game)))"""
+        normalized = _normalize(game)
+        # Game names may contain dots too; the provider ends at the first one
+        provider_end = normalized.find(PROVIDER_SEPARATOR) - 1
+        node = self.root
+        provider_match = None
+        exact = None
+        for i, char in enumerate(normalized):
+            node = node.get(char)
+            if node is None:
+                break
+            if _VALUE in node:
+                if i == len(normalized) - 1:
+                    exact = node[_VALUE]
+                elif i == provider_end:
+                    provider_match = node[_VALUE]
+
+        if exact is not None and provider_end >= 0:
+            return self._result(game, exact, "game")
+        if provider_match is not None:
+            return self._result(game, provider_match, "provider")
+        if exact is not None:
+            # A bare identifier equal to a provider/category key
+            return self._result(game, exact, "provider")
+        if category:
+            match = self.categories.get(_normalize(category))
+            if match is not None:
+                return self._result(game, match, "category")
+        if self.default is not None:
+            return self._result(game, self.default, "default")
+        return {"game": game, "contribution": None, "matched_key": None, "rule": None}
+
+    @staticmethod
+    def _result(game: str, match: Tuple[str, float], rule: str) -> Dict[str, Any]:
+        return {"game": game, "contribution": match[1], "matched_key": match[0], "rule": rule}
+
+    def resolve_many(self, games: Iterable[Any]) -> List[Dict[str, Any]]:
+        """Batch lookup; items are "PROVIDER.Game" strings or {"game", "category"}"""
+        results = []
+        for item in games:
+            if isinstance(item, dict):
+                results.append(self.resolve(item["game"], item.get("category")))
+            else:
+                results.append(self.resolve(item))
+        return results
+
+
+def get_set_resolver(db: Session, set_id: int) -> Optional[ProportionsTrie]:
+    """Compiled trie of a shared set (compiled once, cached with the parsed set)"""
+    cached = get_cached_set(db, set_id)
+    if cached is None:
+        return None
+    resolver = cached.resolver
+    if resolver is None:
+        resolver = ProportionsTrie(dict(cached.entries))
+        cached.resolver = resolver
+    return resolver
+
+
+def get_template_resolver(db: Session, template) -> Optional[ProportionsTrie]:
+    """Resolver for a template's proportions (None when it has none)"""
+    if template.proportions_set_id is not None:
+        return get_set_resolver(db, template.proportions_set_id)
+    entries = template.proportions
+    return ProportionsTrie(entries) if isinstance(entries, dict) and entries else None
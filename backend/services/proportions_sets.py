@@ -0,0 +1,159 @@
+"""
+Shared game proportions sets.
+
+Proportions maps (often hundreds of "PROVIDER.Game": percentage entries) are
+stored once in proportions_sets, identified by a hash of their content, and
+templates reference them by id. Sets never change after they are written,
+so parsed sets are cached in memory by id together with the pre-serialized
+"proportions" fragment the JSON export embeds.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, object_session
+
+from database.models import BonusTemplate, ProportionsSet
+
+CACHE_SIZE = 256
+
+
+def parse_proportions(value: Any) -> Optional[Dict[str, Any]]:
+    """Proportions as a dict (templates may hold a JSON string); None if empty/invalid"""
+    if isinstance(value, str):
+        if not value.strip():
+            return None
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return None
+    if isinstance(value, dict) and value:
+        return value
+    return None
+
+
+def content_hash(entries: Dict[str, Any]) -> str:
+    """Hash of the map in its stored order (the export keeps that order)"""
+    raw = json.dumps(entries, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def render_fragment(entries: Mapping[str, Any]) -> str:
+    """Body of the export's "proportions" object, same format as before sets existed"""
+    return ', '.join(f'"{key}": {value}' for key, value in entries.items())
+
+
+class CachedProportionsSet:
+    """Parsed, read-only view of a set with its rendered fragment"""
+
+    def __init__(self, row: ProportionsSet):
+        self.id = row.id
+        self.content_hash = row.content_hash
+        self.name = row.name
+        self.version = row.version
+        self.entries: Mapping[str, Any] = MappingProxyType(dict(row.entries or {}))
+        self.fragment = render_fragment(self.entries)
+        self.resolver = None  # Lookup trie, compiled by proportions_resolver on first use
+
+
+_cache: "OrderedDict[int, CachedProportionsSet]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_cached_set(db: Session, set_id: int) -> Optional[CachedProportionsSet]:
+    """Parsed set by id (loaded once per process, LRU of CACHE_SIZE sets)"""
+    with _cache_lock:
+        cached = _cache.get(set_id)
+        if cached is not None:
+            _cache.move_to_end(set_id)
+            return cached
+    row = db.get(ProportionsSet, set_id)
+    if row is None:
+        return None
+    cached = CachedProportionsSet(row)
+    with _cache_lock:
+        _cache[set_id] = cached
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return cached
+
+
+def template_set_entries(template: BonusTemplate) -> Optional[Dict[str, Any]]:
+    """Entries of the set a template references (a copy callers may modify)"""
+    if template.proportions_set_id is not None:
+        db = object_session(template)
+        cached = get_cached_set(db, template.proportions_set_id) if db is not None else None
+        if cached is not None:
+            return dict(cached.entries)
+    if template.proportions_set is not None:
+        return dict(template.proportions_set.entries or {})
+    return None
+
+
+def proportions_fragment(template: BonusTemplate) -> Optional[str]:
+    """Pre-serialized proportions for the JSON export (None when the template has none)"""
+    if template.proportions_set_id is not None:
+        db = object_session(template)
+        cached = get_cached_set(db, template.proportions_set_id) if db is not None else None
+        if cached is not None:
+            return cached.fragment or None
+    entries = parse_proportions(template.proportions)
+    return render_fragment(entries) if entries else None
+
+
+def intern_proportions(db: Session, entries: Dict[str, Any], name: Optional[str] = None) -> ProportionsSet:
+    """
+    The set holding exactly `entries`, created if needed. A new set with a
+    name gets the next version of that name. The caller commits.
+    """
+    digest = content_hash(entries)
+    # Sets added earlier in this transaction are not visible to queries yet
+    pending = db.info.setdefault("proportions_sets_added", {})
+    existing = pending.get(digest)
+    if existing is not None and existing in db:
+        return existing
+    existing = db.query(ProportionsSet).filter(
+        ProportionsSet.content_hash == digest).first()
+    if existing is not None:
+        return existing
+
+    version = 1
+    if name:
+        latest = db.query(func.max(ProportionsSet.version)).filter(
+            ProportionsSet.name == name).scalar()
+        pending_versions = [s.version for s in pending.values() if s.name == name and s in db]
+        version = max([latest or 0, *pending_versions]) + 1
+    row = ProportionsSet(content_hash=digest, name=name, version=version,
+                         entries=entries, size=len(entries))
+    db.add(row)
+    pending[digest] = row
+    return row
+
+
+def sync_template_proportions(db: Session, template: BonusTemplate):
+    """Move inline proportions into a shared set (call before commit)"""
+    if template.proportions_inline is None:
+        return
+    entries = parse_proportions(template.proportions_inline)
+    if entries is None:
+        if isinstance(template.proportions_inline, str) and template.proportions_inline.strip():
+            # Unparseable text stays inline (exported as before: without proportions)
+            return
+        template.proportions_inline = None
+        return
+    template.proportions_set = intern_proportions(db, entries)
+    template.proportions_inline = None
+
+
+def set_usage(db: Session, set_ids=None) -> Dict[int, int]:
+    """Number of templates referencing each set (or only `set_ids`)"""
+    query = db.query(BonusTemplate.proportions_set_id, func.count(BonusTemplate.id)).filter(
+        BonusTemplate.proportions_set_id != None)
+    if set_ids is not None:
+        query = query.filter(BonusTemplate.proportions_set_id.in_(list(set_ids)))
+    return dict(query.group_by(BonusTemplate.proportions_set_id).all())
@@ -0,0 +1,188 @@
+"""
+Bulk re-pricing of per-currency template fields.
+
+Every priced field stores {"*": x, "EUR": x, "USD": ..., ...}. Re-pricing
+recomputes the non-EUR currencies already present in a field from its EUR
+(or "*") base with the current rate snapshot, a chunk of templates at a
+time with one batched conversion per chunk.
+
+Fields with pricing_sources lineage hold curated StableConfig table values
+rather than converted EUR amounts: they are refreshed from the current
+values of their table instead, so the same job also catches templates left
+behind by pricing-table changes.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from database.models import BonusTemplate
+from services.currency_registry import CurrencySnapshot, get_currency_snapshot
+from services.event_bus import get_event_bus
+from services.jobs import JobContext
+from services.pricing_lineage import apply_table_values, load_pricing_tables, source_table_values
+from services.template_sync import derived_load_options, sync_template_derived
+
+# (field, deposit amount clamped to deposit limits, rounding step cap)
+REPRICE_FIELDS = [
+    ("minimum_amount", True, None),
+    ("maximum_amount", False, None),
+    ("minimum_stake_to_wager", False, 0.01),
+    ("maximum_stake_to_wager", False, 0.01),
+    ("cost", False, 0.01),
+]
+
+CHUNK_SIZE = 500
+# Dry runs keep at most this many changed cells in the job result
+MAX_DIFF_ENTRIES = 2000
+
+
+def _eur_base(values) -> float:
+    if not isinstance(values, dict):
+        return np.nan
+    base = values.get("EUR", values.get("*"))
+    return float(base) if isinstance(base, (int, float)) and not isinstance(base, bool) else np.nan
+
+
+def affected_templates_query(db: Session, provider: Optional[str] = None,
+                             since: Optional[datetime] = None):
+    """Templates still running or scheduled after `since` (recurring ones included)"""
+    since = since or datetime.utcnow()
+    query = db.query(BonusTemplate).filter(
+        or_(BonusTemplate.schedule_to_at == None,
+            BonusTemplate.schedule_to_at >= since)
+    )
+    if provider:
+        query = query.filter(BonusTemplate.provider == provider.upper())
+    return query
+
+
+def _table_changes(current: Dict[str, Any], updated: Dict[str, Any]) -> List[tuple]:
+    changes = [(currency, current.get(currency), new) for currency, new in updated.items()
+               if current.get(currency) != new]
+    changes += [(currency, old, None) for currency, old in current.items() if currency not in updated]
+    return changes
+
+
+def reprice_chunk(templates: List[BonusTemplate], snapshot: CurrencySnapshot,
+                  fields=REPRICE_FIELDS, tables=None) -> List[Dict[str, Any]]:
+    """
+    New values for one chunk: [{"template": t, "field": f, "values": {...},
+    "changes": [(currency, old, new), ...]}] for every field that changes.
+    Fields sourced from a pricing table take that table's values from
+    `tables` (load_pricing_tables); without `tables`, or when the table is
+    gone, they are left as they are.
+    """
+    names = [name for name, _, _ in fields]
+    matrix = [[_eur_base(getattr(t, name)) for name in names] for t in templates]
+    converted = snapshot.convert_matrix(
+        matrix,
+        clamp_fields=[clamp for _, clamp, _ in fields],
+        field_steps=[step for _, _, step in fields],
+    )
+    fresh = snapshot.matrix_to_dicts(converted, names)
+
+    updates = []
+    for template, values in zip(templates, fresh):
+        sources = template.pricing_sources or {}
+        for name in names:
+            current = getattr(template, name)
+            if not isinstance(current, dict):
+                continue
+            if name in sources:
+                table = source_table_values(sources[name], tables or {})
+                if table is None:
+                    continue
+                updated = apply_table_values(table, current)
+                changes = _table_changes(current, updated)
+                if changes:
+                    updates.append({"template": template, "field": name,
+                                    "values": updated, "changes": changes})
+                continue
+            if not values[name]:
+                continue
+            changes = []
+            updated = dict(current)
+            for currency, old in current.items():
+                if currency in ("*", "EUR") or currency not in values[name]:
+                    continue
+                new = values[name][currency]
+                if not isinstance(old, (int, float)) or abs(old - new) > 1e-9:
+                    updated[currency] = new
+                    changes.append((currency, old, new))
+            if changes:
+                updates.append({"template": template, "field": name,
+                                "values": updated, "changes": changes})
+    return updates
+
+
+def run_repricing(context: JobContext) -> Dict[str, Any]:
+    """Job body: params provider, dry_run, since (ISO), fields"""
+    db = context.db
+    params = context.params
+    dry_run = bool(params.get("dry_run"))
+    since = datetime.fromisoformat(params["since"]) if params.get("since") else None
+    fields = [f for f in REPRICE_FIELDS if not params.get("fields") or f[0] in params["fields"]]
+
+    snapshot = get_currency_snapshot(db)
+    tables = load_pricing_tables(db)
+    base_query = affected_templates_query(db, params.get("provider"), since)
+    context.set_total(base_query.count())
+
+    processed = changed_templates = changed_cells = 0
+    diff: List[Dict[str, Any]] = []
+    last_id = None
+    while True:
+        query = base_query.order_by(BonusTemplate.id)
+        if last_id is not None:
+            query = query.filter(BonusTemplate.id > last_id)
+        if not dry_run:
+            # sync_template_derived diffs these collections
+            query = query.options(*derived_load_options())
+        chunk = query.limit(CHUNK_SIZE).all()
+        if not chunk:
+            break
+        last_id = chunk[-1].id
+
+        updates = reprice_chunk(chunk, snapshot, fields, tables)
+        touched = set()
+        for update in updates:
+            template = update["template"]
+            touched.add(template.id)
+            changed_cells += len(update["changes"])
+            if dry_run:
+                for currency, old, new in update["changes"]:
+                    if len(diff) < MAX_DIFF_ENTRIES:
+                        diff.append({"template_id": template.id, "field": update["field"],
+                                     "currency": currency, "old": old, "new": new})
+            else:
+                setattr(template, update["field"], update["values"])
+        if not dry_run:
+            for template in chunk:
+                if template.id in touched:
+                    template.updated_at = datetime.utcnow()
+                    sync_template_derived(db, template)
+        changed_templates += len(touched)
+        processed += len(chunk)
+
+        # Commits this chunk's writes together with the progress
+        context.progress(processed, {"changed_templates": changed_templates,
+                                     "changed_cells": changed_cells})
+
+    result = {
+        "dry_run": dry_run,
+        "rates_version": snapshot.version,
+        "templates": processed,
+        "changed_templates": changed_templates,
+        "changed_cells": changed_cells,
+    }
+    if dry_run:
+        result["diff"] = diff
+        result["diff_truncated"] = changed_cells > len(diff)
+    elif changed_templates:
+        get_event_bus().publish("templates.repriced", provider=params.get("provider"),
+                                count=changed_templates)
+    return result
@@ -0,0 +1,470 @@
+"""
+Schedule parsing and expansion.
+
+Templates store schedule_from/schedule_to as the strings the forms send
+("21-11-2025 10:00"); parse_schedule_datetime() normalizes them to naive UTC.
+
+The schedule engine compiles the other schedule kinds used by the bonus JSON
+once into matchers and expands them over date ranges:
+- "day" schedules: weekday lists, e.g. {"type": "day", "value": ["friday"]}
+- "date" schedules: days of the month, e.g. ["01", "15"]
+- Quartz cron triggers, e.g. "00 00 09 ? * * *" (5-field unix cron also accepted)
+Compiled matchers are memoized, and expand_calendar() evaluates each distinct
+schedule once per range no matter how many templates share it.
+"""
+
+import calendar
+import os
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# Timezone the schedule strings are entered in when a template doesn't say
+DEFAULT_SCHEDULE_TIMEZONE = os.getenv("SCHEDULE_TIMEZONE", "UTC")
+
+SCHEDULE_FORMATS = [
+    "%d-%m-%Y %H:%M",      # "21-11-2025 10:00" - what the forms send
+    "%d-%m-%Y %H:%M:%S",
+    "%d-%m-%Y",
+    "%d.%m.%Y %H:%M",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d",
+]
+
+
+@lru_cache(maxsize=128)
+def _zone(tz_name: Optional[str]):
+    try:
+        return ZoneInfo(tz_name or DEFAULT_SCHEDULE_TIMEZONE)
+    except (ZoneInfoNotFoundError, ValueError):
+        return timezone.utc
+
+
+def parse_schedule_datetime(value: Optional[str], tz_name: Optional[str] = None) -> Optional[datetime]:
+    """
+    Parse a schedule string into a naive UTC datetime.
+    Naive inputs are interpreted in tz_name (default SCHEDULE_TIMEZONE).
+    Returns None for empty or unparseable values.
+    """
+    if not value or not isinstance(value, str):
+        return None
+    value = value.strip()
+
+    parsed = None
+    for fmt in SCHEDULE_FORMATS:
+        try:
+            parsed = datetime.strptime(value, fmt)
+            break
+        except ValueError:
+            continue
+
+    if parsed is None:
+        # ISO 8601, possibly with an offset ("2025-11-21T10:00:00Z")
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=_zone(tz_name))
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def template_timezone(template) -> Optional[str]:
+    """Timezone stored with the template, if any"""
+    if getattr(template, "schedule_timezone", None):
+        return template.schedule_timezone
+    extra = getattr(template, "config_extra", None)
+    if isinstance(extra, dict) and extra.get("timezone"):
+        return extra["timezone"]
+    return None
+
+
+def schedule_window(template) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Normalized (from, to) UTC window of a template"""
+    tz_name = template_timezone(template)
+    return (
+        parse_schedule_datetime(template.schedule_from, tz_name),
+        parse_schedule_datetime(template.schedule_to, tz_name),
+    )
+
+
+# ============= SCHEDULE ENGINE =============
+
+MONTH_NAMES = {name.upper(): i for i, name in enumerate(calendar.month_abbr) if name}
+# Quartz numbering: 1 = SUN ... 7 = SAT
+QUARTZ_DAY_NAMES = {"SUN": 1, "MON": 2, "TUE": 3,
+                    "WED": 4, "THU": 5, "FRI": 6, "SAT": 7}
+WEEKDAY_NAMES = {name.lower(): i for i, name in enumerate(calendar.day_name)}
+
+
+def _quartz_to_weekday(value: int) -> int:
+    """Quartz day-of-week (1 = Sunday) to Python weekday (0 = Monday)"""
+    return (value + 5) % 7
+
+
+def _parse_value(token: str, names: Optional[Dict[str, int]]) -> int:
+    token = token.strip().upper()
+    if names and token in names:
+        return names[token]
+    if not token.isdigit():
+        raise ValueError(f"Invalid cron value '{token}'")
+    return int(token)
+
+
+def _parse_field(field: str, low: int, high: int, names: Optional[Dict[str, int]] = None) -> frozenset:
+    """Parse one cron field (lists, ranges, wrap-around ranges, steps) into allowed values"""
+    values = set()
+    for part in field.split(","):
+        step = 1
+        has_step = "/" in part
+        if has_step:
+            part, step_text = part.split("/", 1)
+            step = _parse_value(step_text, None)
+            if step <= 0:
+                raise ValueError(f"Invalid cron step in '{field}'")
+
+        if part in ("*", "?", ""):
+            start, end = low, high
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            start, end = _parse_value(start_text, names), _parse_value(end_text, names)
+        else:
+            start = _parse_value(part, names)
+            end = high if has_step else start
+
+        if not (low <= start <= high and low <= end <= high):
+            raise ValueError(
+                f"Cron value out of range {low}-{high} in '{field}'")
+        if start <= end:
+            sequence = list(range(start, end + 1))
+        else:
+            # Wrap-around range such as FRI-MON
+            sequence = list(range(start, high + 1)) + \
+                list(range(low, end + 1))
+        values.update(sequence[::step])
+    return frozenset(values)
+
+
+class CronExpression:
+    """
+    Compiled Quartz cron expression: "sec min hour day-of-month month day-of-week [year]".
+
+    Supports *, ?, lists, ranges, steps, month/day names, and the Quartz
+    specials L, L-n, LW and nW (day of month) and nL and n#k (day of week).
+    5-field unix expressions ("min hour dom month dow", 0 = Sunday) are also accepted.
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        fields = expression.split()
+        if len(fields) == 5:
+            seconds, minutes, hours, dom, months, dow, years = [
+                "0"] + fields + ["*"]
+            unix = True
+        elif len(fields) in (6, 7):
+            seconds, minutes, hours, dom, months, dow = fields[:6]
+            years = fields[6] if len(fields) == 7 else "*"
+            unix = False
+        else:
+            raise ValueError(
+                f"Cron expression must have 5, 6 or 7 fields: '{expression}'")
+
+        self.seconds = sorted(_parse_field(seconds, 0, 59))
+        self.minutes = sorted(_parse_field(minutes, 0, 59))
+        self.hours = sorted(_parse_field(hours, 0, 23))
+        self.months = _parse_field(months.upper(), 1, 12, MONTH_NAMES)
+        self.years = None if years in (
+            "*", "?") else _parse_field(years, 1970, 2199)
+
+        self._parse_day_of_month(dom.upper())
+        self._parse_day_of_week(dow.upper(), unix)
+
+        # Times of day are the same for every matching date - build them once
+        self.times = [time(h, m, s)
+                      for h in self.hours for m in self.minutes for s in self.seconds]
+
+    def _parse_day_of_month(self, field: str):
+        self.dom_any = field in ("*", "?")
+        self.dom_days = frozenset()
+        self.dom_last_offset = None
+        self.dom_last_weekday = False
+        self.dom_nearest_weekday = None
+        if self.dom_any:
+            return
+        if field == "LW":
+            self.dom_last_weekday = True
+        elif field == "L":
+            self.dom_last_offset = 0
+        elif field.startswith("L-"):
+            self.dom_last_offset = _parse_value(field[2:], None)
+            if self.dom_last_offset > 30:
+                raise ValueError(f"Cron value out of range 0-30 in '{field}'")
+        elif field.endswith("W"):
+            self.dom_nearest_weekday = _parse_value(field[:-1], None)
+            if not 1 <= self.dom_nearest_weekday <= 31:
+                raise ValueError(f"Cron value out of range 1-31 in '{field}'")
+        else:
+            self.dom_days = _parse_field(field, 1, 31)
+
+    def _parse_day_of_week(self, field: str, unix: bool):
+        self.dow_any = field in ("*", "?")
+        self.dow_days = frozenset()
+        self.dow_last = None
+        self.dow_nth = None
+        if self.dow_any:
+            return
+        if unix:
+            # 0 and 7 are both Sunday in unix cron
+            names = {k: v - 1 for k, v in QUARTZ_DAY_NAMES.items()}
+            days = _parse_field(field, 0, 7, names)
+            self.dow_days = frozenset((d + 6) % 7 for d in days)
+        elif "#" in field:
+            day_text, nth_text = field.split("#", 1)
+            day, nth = _parse_value(day_text, QUARTZ_DAY_NAMES), _parse_value(nth_text, None)
+            if not (1 <= day <= 7 and 1 <= nth <= 5):
+                raise ValueError(f"Invalid nth weekday '{field}'")
+            self.dow_nth = (_quartz_to_weekday(day), nth)
+        elif field.endswith("L") and len(field) > 1:
+            day = _parse_value(field[:-1], QUARTZ_DAY_NAMES)
+            if not 1 <= day <= 7:
+                raise ValueError(f"Cron value out of range 1-7 in '{field}'")
+            self.dow_last = _quartz_to_weekday(day)
+        else:
+            self.dow_days = frozenset(_quartz_to_weekday(d) for d in _parse_field(
+                field, 1, 7, QUARTZ_DAY_NAMES))
+
+    def _matches_day_of_month(self, d: date, last_day: int) -> bool:
+        if d.day in self.dom_days:
+            return True
+        if self.dom_last_offset is not None:
+            return d.day == last_day - self.dom_last_offset
+        if self.dom_last_weekday:
+            last = date(d.year, d.month, last_day)
+            while last.weekday() >= 5:
+                last -= timedelta(days=1)
+            return d == last
+        if self.dom_nearest_weekday is not None:
+            target = date(d.year, d.month, min(
+                self.dom_nearest_weekday, last_day))
+            # Saturday moves to Friday and Sunday to Monday, without leaving the month
+            if target.weekday() == 5:
+                target += timedelta(days=-1 if target.day > 1 else 2)
+            elif target.weekday() == 6:
+                target += timedelta(days=1 if target.day < last_day else -2)
+            return d == target
+        return False
+
+    def _matches_day_of_week(self, d: date, last_day: int) -> bool:
+        weekday = d.weekday()
+        if weekday in self.dow_days:
+            return True
+        if self.dow_last is not None:
+            return weekday == self.dow_last and d.day + 7 > last_day
+        if self.dow_nth is not None:
+            return weekday == self.dow_nth[0] and (d.day - 1) // 7 + 1 == self.dow_nth[1]
+        return False
+
+    def matches_date(self, d: date) -> bool:
+        if d.month not in self.months:
+            return False
+        if self.years is not None and d.year not in self.years:
+            return False
+        if self.dom_any and self.dow_any:
+            return True
+        last_day = calendar.monthrange(d.year, d.month)[1]
+        if self.dom_any:
+            return self._matches_day_of_week(d, last_day)
+        if self.dow_any:
+            return self._matches_day_of_month(d, last_day)
+        # Both restricted (unix style): either may match
+        return self._matches_day_of_month(d, last_day) or self._matches_day_of_week(d, last_day)
+
+
+class DayMatcher:
+    """Compiled "day" (weekday list) or "date" (day-of-month list) schedule"""
+
+    def __init__(self, weekdays: Iterable[int] = (), month_days: Iterable[int] = (), last_day: bool = False):
+        self.weekdays = frozenset(weekdays)
+        self.month_days = frozenset(month_days)
+        self.last_day = last_day
+
+    def matches_date(self, d: date) -> bool:
+        if d.weekday() in self.weekdays or d.day in self.month_days:
+            return True
+        return self.last_day and d.day == calendar.monthrange(d.year, d.month)[1]
+
+
+@lru_cache(maxsize=4096)
+def compile_cron(expression: str) -> CronExpression:
+    """Parse a cron expression once; identical expressions share one matcher"""
+    return CronExpression(expression.strip())
+
+
+def _value_key(value: Any) -> Tuple[str, ...]:
+    if value is None:
+        return ()
+    if isinstance(value, str):
+        return tuple(v.strip() for v in value.split(",") if v.strip())
+    return tuple(str(v).strip() for v in value)
+
+
+@lru_cache(maxsize=4096)
+def compile_day_schedule(schedule_type: str, value_key: Tuple[str, ...]) -> Optional[DayMatcher]:
+    """Compile a "day"/"weekly" or "date" schedule value into a matcher (None for other types)"""
+    if schedule_type in ("day", "weekly"):
+        weekdays = []
+        for name in value_key:
+            key = name.lower()
+            if key not in WEEKDAY_NAMES:
+                raise ValueError(f"Invalid weekday '{name}'")
+            weekdays.append(WEEKDAY_NAMES[key])
+        return DayMatcher(weekdays=weekdays)
+    if schedule_type == "date":
+        days = []
+        last_day = False
+        for text in value_key:
+            if text.upper() == "L":
+                last_day = True
+            elif text.isdigit() and 1 <= int(text) <= 31:
+                days.append(int(text))
+            else:
+                raise ValueError(f"Invalid day of month '{text}'")
+        return DayMatcher(month_days=days, last_day=last_day)
+    return None
+
+
+def validate_schedule(schedule_type: Optional[str], schedule_value: Any, trigger_schedule: Optional[str]):
+    """Raise ValueError if the schedule value or trigger cron cannot be compiled"""
+    if schedule_type:
+        compile_day_schedule(schedule_type, _value_key(schedule_value))
+    if trigger_schedule:
+        compile_cron(trigger_schedule)
+
+
+def _to_utc(local: datetime, zone, conversions: Dict) -> datetime:
+    """Local wall-clock time to naive UTC, memoized per expansion run"""
+    key = (zone, local)
+    converted = conversions.get(key)
+    if converted is None:
+        converted = local.replace(tzinfo=zone).astimezone(
+            timezone.utc).replace(tzinfo=None)
+        conversions[key] = converted
+    return converted
+
+
+def _schedule_key(template) -> Tuple:
+    return (
+        template.schedule_type or "period",
+        _value_key(getattr(template, "schedule_value", None)),
+        template_timezone(template) or DEFAULT_SCHEDULE_TIMEZONE,
+        (getattr(template, "trigger_schedule", None) or "").strip(),
+    )
+
+
+def _matching_dates(matcher, dates: List[date], masks: Dict) -> frozenset:
+    """Dates of the range a compiled matcher accepts, computed once per matcher per run"""
+    matched = masks.get(matcher)
+    if matched is None:
+        matched = frozenset(d for d in dates if matcher.matches_date(d))
+        masks[matcher] = matched
+    return matched
+
+
+def _expand_schedule(key: Tuple, range_from: datetime, range_to: datetime, dates: List[date],
+                     masks: Dict, conversions: Dict) -> Optional[List[Tuple[datetime, datetime]]]:
+    """
+    Occurrences (UTC start, end) of one distinct schedule over the range.
+    Cron triggers give instants on the days the schedule allows; day/date
+    schedules give whole local days. Returns None for plain period schedules.
+    """
+    schedule_type, value_key, tz_name, cron_text = key
+    day_matcher = compile_day_schedule(schedule_type, value_key)
+    cron = compile_cron(cron_text) if cron_text else None
+    if day_matcher is None and cron is None:
+        return None
+
+    allowed = None
+    for matcher in (day_matcher, cron):
+        if matcher is not None:
+            matched = _matching_dates(matcher, dates, masks)
+            allowed = matched if allowed is None else allowed & matched
+
+    zone = _zone(tz_name)
+    occurrences = []
+    for d in dates:
+        if d not in allowed:
+            continue
+        if cron is not None:
+            for t in cron.times:
+                instant = _to_utc(datetime.combine(d, t), zone, conversions)
+                if range_from <= instant <= range_to:
+                    occurrences.append((instant, instant))
+        else:
+            start = _to_utc(datetime.combine(d, time.min), zone, conversions)
+            end = _to_utc(datetime.combine(
+                d + timedelta(days=1), time.min), zone, conversions)
+            if start <= range_to and end >= range_from:
+                occurrences.append((start, end))
+    return occurrences
+
+
+def expand_calendar(templates: Iterable[Any], range_from: datetime, range_to: datetime,
+                    max_occurrences: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Expand the schedules of many templates over [range_from, range_to] (naive UTC).
+
+    Templates are grouped by distinct schedule, each distinct schedule is
+    expanded once, and the result is clipped to every template's own
+    schedule_from_at/schedule_to_at window. Templates with no occurrence in the
+    range are left out. Each template needs the schedule columns as attributes.
+    """
+    # Local dates covering the range in any timezone (pad a day on each side)
+    first = (range_from - timedelta(days=1)).date()
+    last = (range_to + timedelta(days=1)).date()
+    dates = [first + timedelta(days=i)
+             for i in range((last - first).days + 1)]
+
+    expanded: Dict[Tuple, Any] = {}
+    masks: Dict = {}
+    conversions: Dict = {}
+    results = []
+    for template in templates:
+        window_from = template.schedule_from_at
+        window_to = template.schedule_to_at
+        entry = {"template_id": template.id, "occurrences": [],
+                 "truncated": False}
+
+        try:
+            key = _schedule_key(template)
+            if key not in expanded:
+                expanded[key] = _expand_schedule(
+                    key, range_from, range_to, dates, masks, conversions)
+            occurrences = expanded[key]
+        except ValueError as e:
+            entry["error"] = str(e)
+            results.append(entry)
+            continue
+
+        if occurrences is None:
+            # Plain period: the window itself is the occurrence
+            if window_from and window_to and window_from <= range_to and window_to >= range_from:
+                occurrences = [(window_from, window_to)]
+            else:
+                occurrences = []
+        elif window_from or window_to:
+            occurrences = [
+                (start, end) for start, end in occurrences
+                if (window_to is None or start <= window_to) and (window_from is None or end >= window_from)
+            ]
+
+        if not occurrences:
+            continue
+        if max_occurrences is not None and len(occurrences) > max_occurrences:
+            occurrences = occurrences[:max_occurrences]
+            entry["truncated"] = True
+        entry["occurrences"] = occurrences
+        results.append(entry)
+    return results
@@ -0,0 +1,94 @@
+"""
+Derived data kept in sync with bonus templates.
+Every handler that writes a template calls sync_template_derived() before
+committing, so normalized columns and index tables never drift from the
+source fields (schedule window, segment/country and pricing-table links,
+columnar currency values, shared proportions sets, analytics rollups,
+duplicate-detection content hash).
+"""
+
+from sqlalchemy.orm import Session, selectinload
+
+from database.models import (BonusTemplate, BonusTemplateCountry,
+                             BonusTemplatePricingSource, BonusTemplateSegment)
+from services.analytics_rollups import sync_template_rollup
+from services.currency_values import sync_currency_values
+from services.duplicate_service import sync_content_hash
+from services.proportions_sets import sync_template_proportions
+from services.schedule_service import schedule_window
+
+
+def derived_load_options():
+    """Eager loads for the collections sync_template_derived diffs (bulk writers)"""
+    return (
+        selectinload(BonusTemplate.segment_links),
+        selectinload(BonusTemplate.country_links),
+        selectinload(BonusTemplate.pricing_links),
+        selectinload(BonusTemplate.currency_values),
+        selectinload(BonusTemplate.translations),
+    )
+
+
+def sync_template_derived(db: Session, template: BonusTemplate):
+    """Recompute every derived column/table for one template (call before commit)"""
+    template.schedule_from_at, template.schedule_to_at = schedule_window(
+        template)
+    _sync_links(template.segment_links, BonusTemplateSegment, "segment",
+                template.segments)
+    _sync_links(template.country_links, BonusTemplateCountry, "country",
+                [str(c).upper() for c in template.restricted_countries or []])
+    _sync_pricing_links(template)
+    sync_currency_values(template)
+    sync_template_proportions(db, template)
+    sync_template_rollup(db, template)
+    sync_content_hash(template)
+
+
+def _sync_links(links: list, model, field: str, values):
+    """Make an association collection match a JSON list (only changed rows are written)"""
+    wanted = {str(v).strip() for v in (values or []) if str(v).strip()}
+    for link in list(links):
+        if getattr(link, field) in wanted:
+            wanted.discard(getattr(link, field))
+        else:
+            links.remove(link)
+    for value in sorted(wanted):
+        links.append(model(**{field: value}))
+
+
+def _sync_pricing_links(template: BonusTemplate):
+    """Make bonus_template_pricing_sources match template.pricing_sources"""
+    wanted = {}
+    for field, source in (template.pricing_sources or {}).items():
+        if isinstance(source, dict) and source.get("provider") and source.get("table_id"):
+            wanted[field] = (str(source["provider"]).upper(),
+                             source.get("table") or field, str(source["table_id"]))
+    for link in list(template.pricing_links):
+        target = wanted.pop(link.field, None)
+        if target is None:
+            template.pricing_links.remove(link)
+        elif (link.provider, link.table_kind, link.table_id) != target:
+            link.provider, link.table_kind, link.table_id = target
+    for field, (provider, kind, table_id) in sorted(wanted.items()):
+        template.pricing_links.append(BonusTemplatePricingSource(
+            field=field, provider=provider, table_kind=kind, table_id=table_id))
+
+
+def backfill_templates(db: Session, batch_size: int = 500) -> int:
+    """Recompute derived data for every template; returns the number processed"""
+    processed = 0
+    last_id = None
+    while True:
+        query = db.query(BonusTemplate).options(
+            *derived_load_options()).order_by(BonusTemplate.id)
+        if last_id is not None:
+            query = query.filter(BonusTemplate.id > last_id)
+        batch = query.limit(batch_size).all()
+        if not batch:
+            break
+        for template in batch:
+            sync_template_derived(db, template)
+        db.commit()
+        processed += len(batch)
+        last_id = batch[-1].id
+    return processed
@@ -0,0 +1,213 @@
+"""
+Content-addressed translation memory.
+
+Every distinct translation name/description has one translation_memory
+entry, keyed by the sha256 of its text; BonusTranslation rows reference it
+through name_hash/description_hash (and still keep their text inline). Looking up a source string is a hash plus two
+indexed lookups, whatever the catalogue size. Entries are inserted with
+ON CONFLICT DO NOTHING, so concurrent saves of the same text do not collide.
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import distinct, func, or_, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, aliased
+
+from database.models import BonusTranslation, TranslationMemory
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def store_texts(db: Session, texts: Dict[str, str], chunk_size: int = 500):
+    """
+    Make sure every {hash: text} has a memory entry. Inserts use ON CONFLICT
+    DO NOTHING, so two requests saving the same text at once both succeed;
+    the entry is in the table afterwards either way.
+    """
+    if not texts:
+        return
+    table = TranslationMemory.__table__
+    now = datetime.utcnow()
+    rows = [{"hash": digest, "text": text, "size": len(text.encode("utf-8")), "created_at": now}
+            for digest, text in texts.items()]
+
+    dialect = db.get_bind().dialect.name
+    for i in range(0, len(rows), chunk_size):
+        chunk = rows[i:i + chunk_size]
+        if dialect in ("sqlite", "postgresql"):
+            insert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+            db.execute(insert(table).values(chunk).on_conflict_do_nothing(index_elements=["hash"]))
+        else:
+            existing = {row.hash for row in db.query(TranslationMemory.hash).filter(
+                TranslationMemory.hash.in_([row["hash"] for row in chunk])).all()}
+            missing = [row for row in chunk if row["hash"] not in existing]
+            if missing:
+                db.execute(table.insert(), missing)
+
+
+def remember_text(db: Session, text: Optional[str]) -> Optional[str]:
+    """Store a text in the memory (once) and return its hash"""
+    if not text:
+        return None
+    digest = text_hash(text)
+    store_texts(db, {digest: text})
+    return digest
+
+
+def remember_translation(db: Session, translation: BonusTranslation):
+    """Point a translation at the memory entries for its texts (call before commit)"""
+    translation.name_hash = remember_text(db, translation.name)
+    translation.description_hash = remember_text(db, translation.description)
+
+
+def remember_translations(db: Session, translations: Iterable[BonusTranslation], chunk_size: int = 500):
+    """remember_translation for many rows, with one insert per chunk of texts"""
+    translations = list(translations)
+    texts = {}
+    for translation in translations:
+        for text in (translation.name, translation.description):
+            if text:
+                texts.setdefault(text_hash(text), text)
+    store_texts(db, texts, chunk_size)
+
+    for translation in translations:
+        translation.name_hash = text_hash(translation.name) if translation.name else None
+        translation.description_hash = text_hash(
+            translation.description) if translation.description else None
+
+
+def suggest_translations(db: Session, source: str, source_language: Optional[str] = None,
+                         language: Optional[str] = None, limit: int = 5) -> Dict[str, Any]:
+    """
+    Existing translations of a source string: every template that used the
+    text (as name or description, optionally in source_language) and what its
+    other languages say, ranked by how often each rendering was used.
+    """
+    digest = text_hash(source)
+    source_rows = aliased(BonusTranslation)
+    query = db.query(
+        BonusTranslation.language,
+        TranslationMemory.text,
+        # A row can match several source rows of its template
+        func.count(distinct(BonusTranslation.id)),
+    ).join(
+        source_rows, source_rows.template_id == BonusTranslation.template_id
+    ).join(
+        TranslationMemory,
+        or_(
+            # A name suggests names, a description suggests descriptions
+            (source_rows.name_hash == digest) & (
+                TranslationMemory.hash == BonusTranslation.name_hash),
+            (source_rows.description_hash == digest) & (
+                TranslationMemory.hash == BonusTranslation.description_hash),
+        ),
+    ).filter(
+        or_(source_rows.name_hash == digest,
+            source_rows.description_hash == digest),
+        BonusTranslation.id != source_rows.id,
+    )
+    if source_language:
+        query = query.filter(source_rows.language == source_language)
+    if language:
+        query = query.filter(BonusTranslation.language == language)
+    rows = query.group_by(BonusTranslation.language, TranslationMemory.text).all()
+
+    suggestions: Dict[str, list] = {}
+    for lang, text, count in rows:
+        suggestions.setdefault(lang, []).append({"text": text, "count": count})
+    for lang in suggestions:
+        suggestions[lang].sort(key=lambda s: -s["count"])
+        del suggestions[lang][limit:]
+
+    return {
+        "hash": digest,
+        "known": db.get(TranslationMemory, digest) is not None,
+        "suggestions": dict(sorted(suggestions.items())),
+    }
+
+
+def storage_report(db: Session) -> Dict[str, Any]:
+    """
+    How much translation text is duplicated. bonus_translations still holds
+    every name/description inline, so the memory is an index on top of it:
+    inline_bytes is what the rows store, unique_bytes what they would store
+    with each text once, duplicated_bytes the difference, and memory_bytes
+    the extra space the memory table itself takes.
+    """
+    name_text = aliased(TranslationMemory)
+    description_text = aliased(TranslationMemory)
+    rows, inline_bytes, description_bytes = db.query(
+        func.count(BonusTranslation.id),
+        func.coalesce(func.sum(name_text.size), 0),
+        func.coalesce(func.sum(description_text.size), 0),
+    ).outerjoin(
+        name_text, name_text.hash == BonusTranslation.name_hash
+    ).outerjoin(
+        description_text, description_text.hash == BonusTranslation.description_hash
+    ).one()
+    inline_bytes += description_bytes
+
+    referenced = db.query(BonusTranslation.name_hash.label("hash")).union(
+        db.query(BonusTranslation.description_hash)).subquery()
+    unique_texts, unique_bytes = db.query(
+        func.count(TranslationMemory.hash),
+        func.coalesce(func.sum(TranslationMemory.size), 0),
+    ).filter(TranslationMemory.hash.in_(select(referenced.c.hash))).one()
+
+    entries, memory_bytes = db.query(
+        func.count(TranslationMemory.hash),
+        func.coalesce(func.sum(TranslationMemory.size), 0),
+    ).one()
+    unindexed = db.query(func.count(BonusTranslation.id)).filter(
+        BonusTranslation.name_hash == None).scalar()
+
+    return {
+        "translations": rows,
+        "unindexed_translations": unindexed,
+        "memory_entries": entries,
+        "unique_texts": unique_texts,
+        "inline_bytes": inline_bytes,
+        "unique_bytes": unique_bytes,
+        "duplicated_bytes": inline_bytes - unique_bytes,
+        "memory_bytes": memory_bytes,
+        "dedup_ratio": round(inline_bytes / unique_bytes, 2) if unique_bytes else None,
+    }
+
+
+def backfill_translation_memory(db: Session, batch_size: int = 500) -> int:
+    """Index every existing translation; returns the number processed"""
+    processed = 0
+    last_id = 0
+    while True:
+        batch = db.query(BonusTranslation).filter(
+            BonusTranslation.id > last_id
+        ).order_by(BonusTranslation.id).limit(batch_size).all()
+        if not batch:
+            break
+        for translation in batch:
+            remember_translation(db, translation)
+        db.commit()
+        processed += len(batch)
+        last_id = batch[-1].id
+    return processed
+
+
+def prune_translation_memory(db: Session) -> int:
+    """Delete memory entries no translation references any more"""
+    referenced = db.query(BonusTranslation.name_hash).filter(
+        BonusTranslation.name_hash != None
+    ).union(
+        db.query(BonusTranslation.description_hash).filter(
+            BonusTranslation.description_hash != None)
+    )
+    deleted = db.query(TranslationMemory).filter(
+        ~TranslationMemory.hash.in_(referenced)
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
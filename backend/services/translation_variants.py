@@ -0,0 +1,176 @@
+"""
+Currency-variant fan-out for translations.
+
+Copies base-language translations (e.g. "en") to every currency variant of
+that language from LANGUAGE_CURRENCY_VARIANTS (e.g. "GBP_en"), optionally
+rewriting EUR amounts in the text with the currency reference rates
+("€300" -> "£300"). Amounts are parsed and written with the base language's
+separators ("1.000,50 €" in German, "1 000,50 €" in French); ones that do
+not fit them are left unchanged rather than guessed.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from database.models import BonusTemplate, BonusTranslation
+from services.currency_registry import get_currency_snapshot
+from services.currency_service import CURRENCY_SYMBOLS, LANGUAGE_CURRENCY_VARIANTS
+from services.duplicate_service import sync_content_hash
+from services.translation_memory import remember_translation
+
+# Decimal and grouping separators per language ("1,000.50" vs "1.000,50" vs
+# "1 000,50"); languages not listed write amounts the English way
+SPACES = " \u00a0\u202f"
+NUMBER_FORMATS = {
+    "en": (".", ","),
+    "de": (",", "."), "es": (",", "."), "pt": (",", "."), "it": (",", "."),
+    "nl": (",", "."), "tr": (",", "."), "az": (",", "."),
+    "fr": (",", SPACES), "pl": (",", SPACES), "ru": (",", SPACES), "no": (",", SPACES),
+    "sv": (",", SPACES), "fi": (",", SPACES), "cs": (",", SPACES),
+}
+
+# Digits with any separators in between; parse_amount decides what they mean
+_NUMBER = r"\d+(?:[.,\u00a0\u202f]\d+|[ ]\d{3}(?!\d))*"
+# "€300", "€ 1,000", "300€", "300 EUR", "EUR 300"
+EUR_AMOUNT = re.compile(
+    rf"€\s?(?P<a>{_NUMBER})|(?P<b>{_NUMBER})\s?(?:€|EUR\b)|\bEUR\s?(?P<c>{_NUMBER})"
+)
+
+
+def variant_currency(variant: str) -> str:
+    """'GBP_en' -> 'GBP'"""
+    return variant.split("_", 1)[0]
+
+
+def number_format(language: str) -> Tuple[str, str]:
+    """(decimal separator, grouping separators) of a language or variant ('fr', 'CAD_fr')"""
+    return NUMBER_FORMATS.get(language.split("_")[-1].lower(), NUMBER_FORMATS["en"])
+
+
+def parse_amount(raw: str, language: str = "en") -> Optional[Tuple[float, bool, str]]:
+    """
+    (amount, has decimals, grouping separator used) of a number written the
+    `language` way; None when it does not fit that convention ("1.000" in
+    French, "0,50" in English), so the caller can leave it alone
+    """
+    decimal, grouping = number_format(language)
+    whole, _, fraction = raw.rpartition(decimal) if decimal in raw else (raw, "", "")
+    # Amounts have at most two decimals: "1.000" in English is a typo, not 1.0
+    if decimal in whole or len(fraction) > 2:
+        return None
+    separators = {c for c in whole if not c.isdigit()}
+    if len(separators) > 1 or not separators <= set(grouping):
+        return None
+    group = separators.pop() if separators else ""
+    if group:
+        parts = whole.split(group)
+        if not 1 <= len(parts[0]) <= 3 or any(len(part) != 3 for part in parts[1:]):
+            return None
+        whole = "".join(parts)
+    if not whole.isdigit():
+        return None
+    amount = float(f"{whole}.{fraction}" if fraction else whole)
+    return amount, bool(fraction), group
+
+
+def format_amount(amount: float, currency: str, decimals: bool, grouped: bool,
+                  language: str = "en", group: Optional[str] = None) -> str:
+    """Amount with the currency symbol, written the `language` way"""
+    decimal, grouping = number_format(language)
+    number = f"{amount:,.2f}" if decimals else f"{round(amount):,}"
+    separator = (group or grouping[0]) if grouped else ""
+    number = number.translate(str.maketrans({",": separator, ".": decimal}))
+    symbol = CURRENCY_SYMBOLS.get(currency)
+    return f"{symbol}{number}" if symbol else f"{number} {currency}"
+
+
+def substitute_amounts(text: Optional[str], currency: str, language: str = "en") -> Optional[str]:
+    """
+    Rewrite EUR amounts in a `language` text into `currency` (unknown
+    currencies and amounts that do not fit the language's number format are
+    left as-is)
+    """
+    rate = get_currency_snapshot().rate(currency)
+    if not text or currency == "EUR" or rate is None:
+        return text
+
+    def replace(match):
+        raw = match.group("a") or match.group("b") or match.group("c")
+        parsed = parse_amount(raw, language)
+        if parsed is None:
+            return match.group(0)
+        eur, decimals, group = parsed
+        return format_amount(eur * rate, currency, decimals=decimals, grouped=bool(group),
+                             language=language, group=group)
+
+    return EUR_AMOUNT.sub(replace, text)
+
+
+def fan_out_variants(
+    db: Session,
+    templates: List[BonusTemplate],
+    languages: Optional[Iterable[str]] = None,
+    variants: Optional[Iterable[str]] = None,
+    substitute: bool = True,
+    overwrite: bool = False,
+) -> Dict[str, Any]:
+    """
+    Create/update currency-variant translations for many templates.
+
+    Existing translations are loaded in one query and new rows are added in
+    one batch; the caller commits (one transaction for the whole run).
+    """
+    wanted_languages = set(languages) if languages else set(LANGUAGE_CURRENCY_VARIANTS)
+    wanted_variants = set(variants) if variants else None
+
+    by_template: Dict[str, Dict[str, BonusTranslation]] = {t.id: {} for t in templates}
+    if by_template:
+        for translation in db.query(BonusTranslation).filter(
+                BonusTranslation.template_id.in_(list(by_template))).all():
+            by_template[translation.template_id][translation.language] = translation
+
+    created: List[BonusTranslation] = []
+    results = []
+    totals = {"created": 0, "updated": 0, "skipped": 0}
+    for template in templates:
+        existing = by_template[template.id]
+        summary = {"template_id": template.id, "created": [], "updated": [], "skipped": []}
+        for language in sorted(wanted_languages):
+            base = existing.get(language)
+            if base is None:
+                continue
+            for variant in LANGUAGE_CURRENCY_VARIANTS.get(language, []):
+                if wanted_variants is not None and variant not in wanted_variants:
+                    continue
+                currency = variant_currency(variant)
+                name = substitute_amounts(
+                    base.name, currency, language) if substitute else base.name
+                description = substitute_amounts(
+                    base.description, currency, language) if substitute else base.description
+
+                current = existing.get(variant)
+                if current is None:
+                    row = BonusTranslation(template_id=template.id, language=variant,
+                                           currency=variant, name=name, description=description)
+                    remember_translation(db, row)
+                    created.append(row)
+                    existing[variant] = row
+                    summary["created"].append(variant)
+                elif overwrite:
+                    current.name = name
+                    current.description = description
+                    current.currency = variant
+                    remember_translation(db, current)
+                    summary["updated"].append(variant)
+                else:
+                    summary["skipped"].append(variant)
+        for key in totals:
+            totals[key] += len(summary[key])
+        if summary["created"] or summary["updated"]:
+            sync_content_hash(template, existing.values())
+            results.append(summary)
+
+    db.add_all(created)
+    return {"templates": len(templates), **totals, "changed_templates": results}
@@ -0,0 +1,107 @@
+"""
+Shared fixtures: the app against a throwaway SQLite database.
+
+database.database reads DATABASE_URL at import time, so it is set here,
+before anything from the app is imported.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+_tmp_dir = tempfile.mkdtemp(prefix="campeon_tests_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'test.db')}"
+
+
+@pytest.fixture(scope="session")
+def app():
+    from main import app
+    return app
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    from fastapi.testclient import TestClient
+
+    with TestClient(app) as test_client:  # Runs the lifespan (init_db)
+        yield test_client
+
+
+@pytest.fixture
+def db(client):
+    from database.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def _token_headers(username: str, role: str):
+    from api.auth import create_access_token, hash_password
+    from database.database import SessionLocal
+    from database.models import User
+
+    db = SessionLocal()
+    try:
+        if not db.query(User).filter(User.username == username).first():
+            db.add(User(username=username, password_hash=hash_password("Test123!"),
+                        role=role, is_active=True))
+            db.commit()
+    finally:
+        db.close()
+    return {"Authorization": f"Bearer {create_access_token({'sub': username})}"}
+
+
+@pytest.fixture(scope="session")
+def admin_headers(client):
+    return _token_headers("test.admin", "admin")
+
+
+@pytest.fixture(scope="session")
+def translation_headers(client):
+    return _token_headers("test.translation", "Translation Team")
+
+
+@pytest.fixture(scope="session")
+def optimization_headers(client):
+    return _token_headers("test.optimization", "Optimization Team")
+
+
+def template_payload(template_id: str, **overrides) -> dict:
+    """Reload template as the forms submit it"""
+    payload = {
+        "id": template_id,
+        "schedule_type": "period",
+        "schedule_from": "21-11-2025 10:00",
+        "schedule_to": "28-11-2025 22:59",
+        "trigger_name": {"*": "Reload"},
+        "trigger_description": {"*": ""},
+        "trigger_type": "deposit",
+        "trigger_iterations": 1,
+        "trigger_duration": "7d",
+        "minimum_amount": {"*": 25, "EUR": 25, "GBP": 25},
+        "restricted_countries": [],
+        "segments": [],
+        "percentage": 100,
+        "wagering_multiplier": 15,
+        "minimum_stake_to_wager": {"*": 0.5, "EUR": 0.5},
+        "maximum_stake_to_wager": {"*": 5, "EUR": 5},
+        "maximum_amount": {"*": 300, "EUR": 300, "GBP": 300},
+        "maximum_withdraw": {"*": 3, "EUR": 3},
+        "proportions": {"ROULETTE": 20, "PRAGMATIC.Sweet Bonanza": 100},
+        "category": "games",
+        "provider": "PRAGMATIC",
+        "brand": "PRAGMATIC",
+        "bonus_type": "reload",
+        "config_type": "bonus",
+        "expiry": "7d",
+    }
+    payload.update(overrides)
+    return payload
@@ -0,0 +1,56 @@
+from tests.conftest import template_payload
+
+URL = "/api/bonus-templates/active"
+
+# Windows in 2031 keep the other tests' templates out of the results
+TEMPLATES = {
+    "ACTIVE EARLY": ("01-06-2031 10:00", "07-06-2031 22:59", "UTC"),
+    "ACTIVE LATE": ("07-06-2031 22:59", "14-06-2031 22:59", "UTC"),
+    # 10:00 in Berlin (summer time) is 08:00 UTC
+    "ACTIVE BERLIN": ("20-06-2031 10:00", "20-06-2031 12:00", "Europe/Berlin"),
+}
+
+
+def _create(client, headers):
+    for template_id, (start, end, timezone) in TEMPLATES.items():
+        if client.get(f"/api/bonus-templates/{template_id}", headers=headers).status_code == 200:
+            continue
+        response = client.post("/api/bonus-templates", headers=headers, json=template_payload(
+            template_id, schedule_from=start, schedule_to=end, schedule_timezone=timezone))
+        assert response.status_code == 201, response.text
+
+
+def _ids(client, headers, **params):
+    response = client.get(URL, headers=headers, params=params)
+    assert response.status_code == 200, response.text
+    return [item["id"] for item in response.json()["items"]]
+
+
+def test_active_at(client, admin_headers):
+    _create(client, admin_headers)
+    assert _ids(client, admin_headers, at="2031-06-03T12:00:00") == ["ACTIVE EARLY"]
+    # Both ends are inclusive
+    assert _ids(client, admin_headers, at="01-06-2031 10:00") == ["ACTIVE EARLY"]
+    assert _ids(client, admin_headers, at="07-06-2031 22:59") == ["ACTIVE EARLY", "ACTIVE LATE"]
+    assert _ids(client, admin_headers, at="01-06-2031 09:59") == []
+
+    # Windows are stored in UTC
+    assert _ids(client, admin_headers, at="2031-06-20T08:30:00Z") == ["ACTIVE BERLIN"]
+    assert _ids(client, admin_headers, at="2031-06-20T10:30:00+02:00") == ["ACTIVE BERLIN"]
+    assert _ids(client, admin_headers, at="2031-06-20T10:30:00") == []
+
+    item = client.get(URL, headers=admin_headers, params={"at": "20-06-2031 09:00"}).json()["items"][0]
+    assert item["schedule_from"] == "20-06-2031 10:00"
+    assert item["schedule_from_at"] == "2031-06-20T08:00:00"
+
+
+def test_active_between(client, admin_headers):
+    _create(client, admin_headers)
+    assert _ids(client, admin_headers, between="2031-06-05,2031-06-30") == [
+        "ACTIVE EARLY", "ACTIVE LATE", "ACTIVE BERLIN"]
+    assert _ids(client, admin_headers, between="2031-06-05,2031-06-30", skip=1, limit=1) == ["ACTIVE LATE"]
+    assert _ids(client, admin_headers, between="2031-06-15,2031-06-20T07:59:00") == []
+
+    for params in ({"between": "2031-06-05"}, {"between": "2031-06-30,2031-06-05"},
+                   {"at": "2031-06-05", "between": "2031-06-05,2031-06-30"}, {"at": "tomorrow"}):
+        assert client.get(URL, headers=admin_headers, params=params).status_code == 400, params
@@ -0,0 +1,86 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from database import database
+from services import currency_registry, proportions_sets
+from tests.conftest import template_payload
+
+URL = "/api/bonus-templates/BUNDLE TEST/bundle"
+
+
+@contextmanager
+def count_queries():
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(database.engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(database.engine, "before_cursor_execute", record)
+
+
+def _create(client, headers):
+    if client.get("/api/bonus-templates/BUNDLE TEST", headers=headers).status_code == 200:
+        return
+    response = client.post("/api/bonus-templates", headers=headers, json=template_payload("BUNDLE TEST"))
+    assert response.status_code == 201, response.text
+    response = client.post("/api/bonus-templates/BUNDLE TEST/translations", headers=headers,
+                           json={"language": "de", "name": "Bündel"})
+    assert response.status_code == 201, response.text
+
+
+def test_include_selects_sections(client, admin_headers):
+    _create(client, admin_headers)
+    full = client.get(URL, headers=admin_headers).json()
+    assert set(full) == {"id", "template", "translations", "json", "stable_config"}
+    assert [t["language"] for t in full["translations"]] == ["de"]
+    assert full["template"]["proportions"] == {"ROULETTE": 20, "PRAGMATIC.Sweet Bonanza": 100}
+
+    only = client.get(URL, headers=admin_headers, params={"include": "translations, json"}).json()
+    assert set(only) == {"id", "translations", "json"}
+    assert only["json"] == full["json"]
+
+    response = client.get(URL, headers=admin_headers, params={"include": "template,bogus"})
+    assert response.status_code == 400
+    assert "bogus" in response.json()["detail"]
+    assert client.get("/api/bonus-templates/NO SUCH/bundle", headers=admin_headers).status_code == 404
+
+
+def test_etag_and_not_modified(client, admin_headers):
+    _create(client, admin_headers)
+    first = client.get(URL, headers=admin_headers)
+    etag = first.headers["ETag"]
+    assert client.get(URL, headers=admin_headers).headers["ETag"] == etag
+
+    cached = client.get(URL, headers={**admin_headers, "If-None-Match": f'"other", {etag}'})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag and not cached.content
+
+    # Other sections, other representation
+    partial = client.get(URL, headers={**admin_headers, "If-None-Match": etag},
+                         params={"include": "template"})
+    assert partial.status_code == 200 and partial.headers["ETag"] != etag
+
+    response = client.patch("/api/bonus-templates/BUNDLE TEST", headers=admin_headers,
+                            json={"notes": "changed"})
+    assert response.status_code == 200, response.text
+    changed = client.get(URL, headers={**admin_headers, "If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+
+
+def test_bundle_loads_in_two_queries(client, admin_headers, monkeypatch):
+    _create(client, admin_headers)
+    client.get(URL, headers=admin_headers)  # Warm the currency snapshot
+    monkeypatch.setattr(currency_registry, "RELOAD_CHECK_SECONDS", 10 ** 9)
+    proportions_sets._cache.clear()  # The set is not cached: it must come with the template
+
+    with count_queries() as statements:
+        response = client.get(URL, headers=admin_headers)
+    assert response.status_code == 200
+    queries = [s for s in statements if "users" not in s]  # Authentication
+    assert len(queries) == 2, queries
+    assert "proportions_sets" in queries[0] and "bonus_translations" in queries[0]
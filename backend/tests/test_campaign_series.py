@@ -0,0 +1,188 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from database.models import BonusTemplate
+from services.campaign_series import (
+    MAX_SERIES_SIZE,
+    _add_months,
+    create_series,
+    fill_placeholders,
+    occurrences,
+    parse_duration,
+    series_windows,
+)
+from tests.conftest import template_payload
+
+BASE = "SERIES BASE"
+URL = f"/api/bonus-templates/{BASE}/series"
+
+
+def _create_base(client, headers):
+    if client.get(f"/api/bonus-templates/{BASE}", headers=headers).status_code == 200:
+        return
+    response = client.post("/api/bonus-templates", headers=headers,
+                           json=template_payload(BASE, trigger_type="series_test"))
+    assert response.status_code == 201, response.text
+    response = client.post(f"/api/bonus-templates/{BASE}/translations", headers=headers,
+                           json={"language": "de", "name": "Reload {date}",
+                                 "description": "Woche {week}, bis {date_to}"})
+    assert response.status_code == 201, response.text
+
+
+def test_weekly_with_weekdays():
+    start = datetime(2026, 1, 7, 10, 0)  # Wednesday
+    starts = occurrences(start, "weekly", weekdays=["Monday", " thursday "], count=4)
+    # Monday of the first week is before start and skipped
+    assert starts == [datetime(2026, 1, 8, 10), datetime(2026, 1, 12, 10),
+                      datetime(2026, 1, 15, 10), datetime(2026, 1, 19, 10)]
+
+    every_other = occurrences(start, "weekly", interval=2, weekdays=["monday"], count=2)
+    assert every_other == [datetime(2026, 1, 19, 10), datetime(2026, 2, 2, 10)]
+
+    with pytest.raises(ValueError):
+        occurrences(start, "weekly", weekdays=["someday"], count=1)
+
+
+def test_until_is_inclusive():
+    start = datetime(2026, 1, 5, 10, 0)
+    assert occurrences(start, "daily", until=datetime(2026, 1, 7, 10, 0))[-1] == datetime(2026, 1, 7, 10)
+    assert occurrences(start, "daily", until=datetime(2026, 1, 7, 9, 59))[-1] == datetime(2026, 1, 6, 10)
+    assert occurrences(start, "daily", until=start - timedelta(minutes=1)) == []
+    # count and until together: whichever ends the series first
+    assert len(occurrences(start, "weekly", count=3, until=datetime(2026, 12, 31))) == 3
+    assert len(occurrences(start, "weekly", count=30, until=datetime(2026, 1, 19, 10))) == 3
+
+
+def test_occurrences_validation():
+    start = datetime(2026, 1, 5, 10, 0)
+    for kwargs in ({"frequency": "yearly", "count": 1}, {"interval": 0, "count": 1}, {}):
+        with pytest.raises(ValueError):
+            occurrences(start, **kwargs)
+    with pytest.raises(ValueError):
+        occurrences(start, "daily", count=MAX_SERIES_SIZE + 1)
+    assert len(occurrences(start, "daily", count=MAX_SERIES_SIZE)) == MAX_SERIES_SIZE
+
+
+def test_months_clamp_to_month_end():
+    start = datetime(2026, 1, 31, 10, 0)
+    assert _add_months(start, 1) == datetime(2026, 2, 28, 10)
+    assert _add_months(datetime(2028, 1, 31), 1) == datetime(2028, 2, 29)
+    assert _add_months(start, 3) == datetime(2026, 4, 30, 10)
+    assert _add_months(start, 11) == datetime(2026, 12, 31, 10)
+    assert _add_months(start, 12) == datetime(2027, 1, 31, 10)
+    # Every occurrence is computed from the start, so the 31st comes back
+    assert occurrences(start, "monthly", count=3) == [
+        datetime(2026, 1, 31, 10), datetime(2026, 2, 28, 10), datetime(2026, 3, 31, 10)]
+
+
+def test_parse_duration():
+    assert parse_duration("7d") == timedelta(days=7)
+    assert parse_duration("6d23h59m") == timedelta(days=7) - timedelta(minutes=1)
+    assert parse_duration("36h") == timedelta(hours=36)
+    assert parse_duration("1d 12h") == timedelta(hours=36)
+    for value in ("", "7", "7w", "7d junk", "0d", None):
+        with pytest.raises(ValueError):
+            parse_duration(value)
+
+
+def test_fill_placeholders():
+    values = {"date": "05.01.26", "n": "1"}
+    assert fill_placeholders("Reload {date} #{n}", values) == "Reload 05.01.26 #1"
+    assert fill_placeholders({"*": "{date}", "de": "am {date}"}, values) == {"*": "05.01.26", "de": "am 05.01.26"}
+    assert fill_placeholders("{unknown} stays", values) == "{unknown} stays"
+    assert fill_placeholders(None, values) is None
+    assert fill_placeholders(5, values) == 5
+
+
+def test_duration_longer_than_step():
+    rule = {"start": "05-01-2026 10:00", "frequency": "daily", "duration": "7d", "count": 3}
+    with pytest.raises(ValueError, match="allow_overlap"):
+        series_windows(rule)
+    assert len(series_windows({**rule, "allow_overlap": True})) == 3
+    # Windows may end exactly where the next one starts, and one window never overlaps
+    assert len(series_windows({**rule, "duration": "1d"})) == 3
+    assert len(series_windows({**rule, "count": 1})) == 1
+    # With weekdays the shortest gap counts
+    with pytest.raises(ValueError):
+        series_windows({"start": "05-01-2026 10:00", "weekdays": ["monday", "tuesday"],
+                        "duration": "2d", "count": 4})
+    # Default: a week minus a minute
+    windows = series_windows({"start": "05-01-2026 10:00", "count": 2})
+    assert windows[0][1] == datetime(2026, 1, 12, 9, 59)
+
+
+def test_create_series(client, db, admin_headers):
+    _create_base(client, admin_headers)
+    base = db.query(BonusTemplate).filter(BonusTemplate.id == BASE).one()
+    rule = {"start": "05-01-2026 10:00", "duration": "23h59m", "count": 3, "frequency": "daily"}
+    copies = create_series(db, base, rule, "{base} unit {n}")
+    try:
+        assert [c.id for c in copies] == [f"{BASE} unit 1", f"{BASE} unit 2", f"{BASE} unit 3"]
+        assert copies[1].schedule_from == "06-01-2026 10:00"
+        assert copies[1].schedule_to == "07-01-2026 09:59"
+        assert copies[1].schedule_from_at is not None
+        assert copies[1].proportions_set_id == base.proportions_set_id
+        [translation] = copies[1].translations
+        assert translation.name == "Reload 06.01.26"
+        assert translation.description == "Woche 2, bis 07.01.26"
+
+        with pytest.raises(ValueError, match="same id"):
+            create_series(db, base, rule, "{base} fixed")
+    finally:
+        db.rollback()
+
+
+def test_endpoint_streams_ndjson(client, db, admin_headers):
+    _create_base(client, admin_headers)
+    body = {"recurrence": {"start": "05-01-2026 10:00", "count": 3}, "id_pattern": "{base} W{week}"}
+    response = client.post(URL, headers=admin_headers, json=body)
+    assert response.status_code == 201, response.text
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.headers["X-Series-Count"] == "3"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["id"] for line in lines] == [f"{BASE} W2", f"{BASE} W3", f"{BASE} W4"]
+    assert lines[0] == {"id": f"{BASE} W2", "schedule_from": "05-01-2026 10:00",
+                        "schedule_to": "12-01-2026 09:59", "trigger_name": {"*": "Reload"},
+                        "translations": 1}
+    assert db.query(BonusTemplate).filter(BonusTemplate.id.like(f"{BASE} W%")).count() == 3
+
+    # Any existing id: nothing is created
+    body["recurrence"]["count"] = 5
+    response = client.post(URL, headers=admin_headers, json=body)
+    assert response.status_code == 409
+    assert response.json()["detail"]["existing"] == [f"{BASE} W2", f"{BASE} W3", f"{BASE} W4"]
+    assert db.query(BonusTemplate).filter(BonusTemplate.id.like(f"{BASE} W%")).count() == 3
+
+    assert client.post("/api/bonus-templates/NO SUCH/series", headers=admin_headers,
+                       json=body).status_code == 404
+    body["recurrence"] = {"start": "05-01-2026 10:00", "frequency": "daily", "count": 3}
+    response = client.post(URL, headers=admin_headers, json=body)
+    assert response.status_code == 400
+    assert "allow_overlap" in response.json()["detail"]
+
+
+def test_check_conflicts_compares_the_copies(client, db, admin_headers):
+    _create_base(client, admin_headers)
+    body = {"recurrence": {"start": "02-03-2026 10:00", "frequency": "daily", "count": 3,
+                           "allow_overlap": True},
+            "id_pattern": "{base} overlap {n}"}
+    response = client.post(URL, headers=admin_headers, params={"check_conflicts": "true"}, json=body)
+    assert response.status_code == 409, response.text
+    pairs = {(c["with_template_id"], c["template_id"]) for c in response.json()["detail"]["conflicts"]}
+    assert (f"{BASE} overlap 1", f"{BASE} overlap 2") in pairs
+    assert (f"{BASE} overlap 3", f"{BASE} overlap 1") in pairs
+    assert db.query(BonusTemplate).filter(BonusTemplate.id.like(f"{BASE} overlap%")).count() == 0
+
+    # The same rule without overlapping windows passes the check
+    body["recurrence"].update(duration="23h59m", allow_overlap=False)
+    response = client.post(URL, headers=admin_headers, params={"check_conflicts": "true"}, json=body)
+    assert response.status_code == 201, response.text
+
+    # ...and a second series over the same days collides with the first one
+    body["id_pattern"] = "{base} again {n}"
+    response = client.post(URL, headers=admin_headers, params={"check_conflicts": "true"}, json=body)
+    assert response.status_code == 409
+    assert {c["template_id"] for c in response.json()["detail"]["conflicts"]} == {
+        f"{BASE} overlap 1", f"{BASE} overlap 2", f"{BASE} overlap 3"}
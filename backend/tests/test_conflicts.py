@@ -0,0 +1,81 @@
+import random
+import time
+from datetime import datetime, timedelta
+
+from services.conflict_service import ConflictIndex, _segments_overlap
+from tests.conftest import template_payload
+
+START = datetime(2026, 1, 1)
+
+
+def descriptor(template_id, start_day, days, segments=(), trigger_type="deposit", countries=()):
+    return {
+        "id": template_id,
+        "trigger_type": trigger_type,
+        "segments": sorted(set(segments)),
+        "restricted_countries": sorted(set(countries)),
+        "provider": "PRAGMATIC",
+        "from": START + timedelta(days=start_day),
+        "to": START + timedelta(days=start_day + days),
+    }
+
+
+def brute_force_pairs(descriptors):
+    pairs = set()
+    for i, a in enumerate(descriptors):
+        for b in descriptors[i + 1:]:
+            if (a["trigger_type"] == b["trigger_type"] and a["from"] <= b["to"]
+                    and b["from"] <= a["to"] and _segments_overlap(a["segments"], b["segments"])):
+                pairs.add(frozenset((a["id"], b["id"])))
+    return pairs
+
+
+def test_report_matches_brute_force():
+    rng = random.Random(7)
+    descriptors = [
+        descriptor(f"T{i}", rng.randrange(60), rng.randrange(1, 10),
+                   rng.sample(["vip", "new", "churn", "high"], rng.randrange(3)),
+                   trigger_type=rng.choice(["deposit", "login"]))
+        for i in range(300)
+    ]
+    report = ConflictIndex(descriptors).report()
+    found = [frozenset((c["template_id"], c["with_template_id"])) for c in report]
+
+    assert len(found) == len(set(found))  # Each pair once, whatever it shares
+    assert set(found) == brute_force_pairs(descriptors)
+
+
+def test_report_segments_and_excluded_countries():
+    report = ConflictIndex([
+        descriptor("A", 0, 7, ["vip", "new"], countries=["BR"]),
+        descriptor("B", 3, 7, ["new", "vip"], countries=["AU"]),
+        descriptor("C", 5, 7),
+    ]).report()
+    by_pair = {(c["template_id"], c["with_template_id"]): c for c in report}
+
+    assert set(by_pair) == {("A", "B"), ("A", "C"), ("B", "C")}
+    assert by_pair[("A", "B")]["segments"] == ["new", "vip"]
+    assert by_pair[("A", "B")]["excluded_countries"] == ["AU", "BR"]
+    assert by_pair[("B", "C")]["segments"] == ["*"]
+
+
+def test_report_scales_with_disjoint_segments():
+    # 4000 simultaneous campaigns, each for its own segment: no conflicts,
+    # and no pairwise comparison either
+    descriptors = [descriptor(f"S{i}", 0, 30, [f"segment {i}"]) for i in range(4000)]
+    start = time.perf_counter()
+    assert ConflictIndex(descriptors).report() == []
+    assert time.perf_counter() - start < 2
+
+
+def test_excluded_countries_are_uppercased(client, admin_headers):
+    for template_id, countries in (("CONFLICT A", ["br", " au"]), ("CONFLICT B", ["BR"])):
+        response = client.post("/api/bonus-templates", headers=admin_headers, json=template_payload(
+            template_id, trigger_type="conflict-test", restricted_countries=countries))
+        assert response.status_code in (200, 201), response.text
+
+    response = client.get("/api/bonus-templates/conflicts?trigger_type=conflict-test",
+                          headers=admin_headers)
+    assert response.status_code == 200, response.text
+    (conflict,) = response.json()["conflicts"]
+    assert conflict["excluded_countries"] == ["AU", "BR"]
@@ -0,0 +1,72 @@
+import math
+
+import numpy as np
+
+from database.models import CurrencyReference
+from services.currency_registry import CurrencySnapshot, reload_currency_snapshot
+
+# currency, eur_rate, min_deposit, max_deposit, rounding_step
+SNAPSHOT = CurrencySnapshot([
+    ("EUR", 1.0, 10, 1000, 1.0),
+    ("GBP", 0.9, 10, None, 1.0),
+    ("BTC", 0.00002, None, None, 0.0001),
+    ("TND", 3.0, 30, 3000, 0.1),
+], source="test")
+
+
+def test_sub_unit_steps_leave_no_float_artifacts():
+    assert SNAPSHOT.convert(0.1, "TND") == 0.3
+    assert SNAPSHOT.convert_all(0.1)["TND"] == 0.3
+    converted = SNAPSHOT.convert_matrix([[0.1, 0.7]], currencies=["TND"])
+    assert converted[0, :, 0].tolist() == [0.3, 2.1]
+    assert SNAPSHOT.matrix_to_dicts(converted, ["a", "b"], ["TND"]) == [
+        {"a": {"TND": 0.3}, "b": {"TND": 2.1}}]
+
+
+def test_deposits_are_clamped_to_each_currency_limits():
+    converted = SNAPSHOT.convert_matrix([[5, 5], [5000, 5000]], clamp_fields=[True, False])
+    deposits = SNAPSHOT.matrix_to_dicts(converted, ["deposit", "bonus"])
+    assert deposits[0]["deposit"] == {"EUR": 10, "GBP": 10, "BTC": 0.0001, "TND": 30}
+    assert deposits[0]["bonus"] == {"EUR": 5, "GBP": 4, "BTC": 0.0001, "TND": 15}
+    # GBP and BTC have no maximum
+    assert deposits[1]["deposit"] == {"EUR": 1000, "GBP": 4500, "BTC": 0.1, "TND": 3000}
+
+
+def test_field_steps_cap_the_rounding_step():
+    converted = SNAPSHOT.convert_matrix([[0.12, 0.12]], field_steps=[None, 0.01],
+                                        currencies=["EUR", "GBP"])
+    assert converted[0].tolist() == [[0.0, 0.0], [0.12, 0.11]]
+
+
+def test_missing_values_stay_missing():
+    converted = SNAPSHOT.convert_matrix([[float("nan"), 20]], clamp_fields=[True, False])
+    assert np.isnan(converted[0, 0]).all()
+    [row] = SNAPSHOT.matrix_to_dicts(converted, ["deposit", "bonus"])
+    assert row["deposit"] == {}
+    assert row["bonus"]["GBP"] == 18
+    one_field = SNAPSHOT.convert_matrix([20, math.nan], currencies=["GBP"])
+    assert one_field.shape == (2, 1, 1) and np.isnan(one_field[1, 0, 0])
+
+
+def test_reload_picks_up_rate_changes(client, db, admin_headers):
+    def convert():
+        response = client.post("/api/currencies/convert", headers=admin_headers, json={
+            "fields": ["bonus"], "rows": [[100], [None]], "currencies": ["GBP"]})
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    gbp = db.query(CurrencyReference).filter(CurrencyReference.currency == "GBP").one()
+    saved = gbp.eur_rate, gbp.rounding_step
+    before = convert()
+    try:
+        gbp.eur_rate, gbp.rounding_step = 0.855, 0.01
+        db.commit()
+        response = client.post("/api/currencies/reload", headers=admin_headers)
+        assert response.status_code == 200, response.text
+        assert response.json()["version"] > before["version"]
+        after = convert()
+        assert after["results"] == [{"bonus": {"GBP": 85.5}}, {"bonus": {}}]
+    finally:
+        gbp.eur_rate, gbp.rounding_step = saved
+        db.commit()
+        reload_currency_snapshot(db)
@@ -0,0 +1,91 @@
+from tests.conftest import template_payload
+
+URL = "/api/analytics/currency-values/query"
+BONUS_TYPE = "currency_values_test"
+
+TEMPLATES = {
+    # id: (provider, EUR maximum_amount, GBP minimum_amount)
+    "CV ONE": ("PRAGMATIC", 300, 20),
+    "CV TWO": ("PRAGMATIC", 400, 40),
+    "CV THREE": ("NETENT", 500, 30),
+}
+
+
+def _create(client, headers):
+    for template_id, (provider, maximum, minimum) in TEMPLATES.items():
+        if client.get(f"/api/bonus-templates/{template_id}", headers=headers).status_code == 200:
+            continue
+        response = client.post("/api/bonus-templates", headers=headers, json=template_payload(
+            template_id, provider=provider, bonus_type=BONUS_TYPE,
+            maximum_amount={"*": maximum, "EUR": maximum},
+            minimum_amount={"*": 25, "EUR": 25, "GBP": minimum}))
+        assert response.status_code == 201, response.text
+
+
+def _query(client, headers, **body):
+    response = client.post(URL, headers=headers, json={"bonus_type": BONUS_TYPE, **body})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_filters_join_per_value(client, optimization_headers):
+    _create(client, optimization_headers)
+    result = _query(client, optimization_headers,
+                    filters=[{"field": "maximum_amount", "op": "gt", "value": 350}])
+    assert result["total"] == 2
+    assert result["templates"] == [
+        {"id": "CV THREE", "values": {"maximum_amount": {"EUR": 500}}},
+        {"id": "CV TWO", "values": {"maximum_amount": {"EUR": 400}}},
+    ]
+
+    # Two filters are two joins: both have to match
+    result = _query(client, optimization_headers, filters=[
+        {"field": "maximum_amount", "op": "gt", "value": 350},
+        {"field": "minimum_amount", "currency": "GBP", "op": "gte", "value": 35},
+    ])
+    assert result["templates"] == [{"id": "CV TWO", "values": {
+        "maximum_amount": {"EUR": 400}, "minimum_amount": {"GBP": 40}}}]
+
+    result = _query(client, optimization_headers, provider="NETENT", limit=1)
+    assert result == {"total": 1, "templates": [{"id": "CV THREE", "values": {}}]}
+
+
+def test_aggregates_grouped_by_column(client, optimization_headers):
+    _create(client, optimization_headers)
+    result = _query(client, optimization_headers, aggregate={
+        "field": "maximum_amount", "group_by": "provider", "functions": ["count", "sum", "avg", "max"]})
+    assert result["aggregates"] == [
+        {"provider": "NETENT", "count": 1, "sum": 500, "avg": 500, "max": 500},
+        {"provider": "PRAGMATIC", "count": 2, "sum": 700, "avg": 350, "max": 400},
+    ]
+
+    # Aggregates only cover the templates the filters match
+    result = _query(client, optimization_headers,
+                    filters=[{"field": "minimum_amount", "currency": "GBP", "op": "lt", "value": 35}],
+                    aggregate={"field": "maximum_amount", "functions": ["min", "max"]})
+    assert result["aggregates"] == [{"min": 300, "max": 500}]
+
+
+def test_values_follow_updates(client, optimization_headers, admin_headers):
+    _create(client, admin_headers)
+    response = client.patch("/api/bonus-templates/CV ONE", headers=admin_headers,
+                            json={"maximum_amount": {"*": 450, "EUR": 450}})
+    assert response.status_code == 200, response.text
+    try:
+        result = _query(client, optimization_headers,
+                        filters=[{"field": "maximum_amount", "op": "gte", "value": 450}])
+        assert [t["id"] for t in result["templates"]] == ["CV ONE", "CV THREE"]
+    finally:
+        client.patch("/api/bonus-templates/CV ONE", headers=admin_headers,
+                     json={"maximum_amount": {"*": 300, "EUR": 300}})
+
+
+def test_invalid_queries(client, optimization_headers, translation_headers):
+    for body in ({"filters": [{"field": "name", "value": 1}]},
+                 {"filters": [{"field": "cost", "op": "like", "value": 1}]},
+                 {"aggregate": {"field": "cost", "group_by": "id"}},
+                 {"aggregate": {"field": "cost", "functions": ["median"]}},
+                 {"limit": 0}):
+        response = client.post(URL, headers=optimization_headers, json=body)
+        assert response.status_code == 400, body
+    assert client.post(URL, headers=translation_headers, json={}).status_code == 403
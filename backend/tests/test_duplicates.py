@@ -0,0 +1,66 @@
+from tests.conftest import template_payload
+
+# An unusual percentage keeps these apart from the other tests' templates
+PERCENTAGE = 137
+
+
+def _create(client, headers, template_id, name, **overrides):
+    payload = template_payload(template_id, percentage=PERCENTAGE, **overrides)
+    response = client.post("/api/bonus-templates", headers=headers, json=payload,
+                           params={"check_duplicates": "true"})
+    assert response.status_code == 201, response.text
+    response = client.post(f"/api/bonus-templates/{template_id}/translations", headers=headers,
+                           json={"language": "de", "name": name})
+    assert response.status_code == 201, response.text
+
+
+def _duplicates(client, headers, template_id):
+    response = client.get(f"/api/bonus-templates/{template_id}/duplicates", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_hash_ignores_dates_but_not_translations(client, admin_headers):
+    _create(client, admin_headers, "DUP A", "Reload 21.11.25")
+    # Next week's copy: other window, other date in the name, 25.0 for 25
+    _create(client, admin_headers, "DUP B", "Reload  28/11/2025",
+            schedule_from="28-11-2025 10:00", schedule_to="05-12-2025 22:59",
+            minimum_amount={"*": 25.0, "EUR": 25, "GBP": 25})
+    first = _duplicates(client, admin_headers, "DUP A")
+    assert [d["id"] for d in first["duplicates"]] == ["DUP B"]
+    assert _duplicates(client, admin_headers, "DUP B")["content_hash"] == first["content_hash"]
+
+    # Editing a translation's text changes the hash...
+    response = client.post("/api/bonus-templates/DUP B/translations", headers=admin_headers,
+                           json={"language": "de", "name": "Reload 28.11.25 Extra"})
+    assert response.status_code == 201, response.text
+    assert _duplicates(client, admin_headers, "DUP B")["count"] == 0
+
+    # ...and putting it back (with another date) restores it
+    response = client.post("/api/bonus-templates/DUP B/translations", headers=admin_headers,
+                           json={"language": "de", "name": "Reload 2025-12-05"})
+    assert response.status_code == 201, response.text
+    assert _duplicates(client, admin_headers, "DUP B")["content_hash"] == first["content_hash"]
+
+    # A translation only one of them has makes them different
+    response = client.post("/api/bonus-templates/DUP A/translations", headers=admin_headers,
+                           json={"language": "fr", "name": "Recharge"})
+    assert response.status_code == 201, response.text
+    assert _duplicates(client, admin_headers, "DUP A")["count"] == 0
+    response = client.delete("/api/bonus-templates/DUP A/translations/fr", headers=admin_headers)
+    assert response.status_code == 204
+    assert [d["id"] for d in _duplicates(client, admin_headers, "DUP A")["duplicates"]] == ["DUP B"]
+
+
+def test_check_duplicates_on_create(client, admin_headers):
+    payload = template_payload("DUP C", percentage=PERCENTAGE + 1, schedule_from="01-12-2025 10:00")
+    response = client.post("/api/bonus-templates", headers=admin_headers, json=payload,
+                           params={"check_duplicates": "true"})
+    assert response.status_code == 201, response.text
+    assert response.json()["duplicate_of"] == []
+
+    payload.update(id="DUP D", schedule_from="08-12-2025 10:00", percentage=float(PERCENTAGE + 1))
+    response = client.post("/api/bonus-templates", headers=admin_headers, json=payload,
+                           params={"check_duplicates": "true"})
+    assert response.status_code == 201, response.text
+    assert response.json()["duplicate_of"] == ["DUP C"]
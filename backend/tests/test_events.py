@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+from api.events import format_sse, stream_events
+from services.event_bus import EventBus, InMemoryBroadcast, set_event_bus
+from tests.conftest import template_payload
+
+
+class FakeRequest:
+    """Reports a disconnect once `connected` is cleared"""
+
+    def __init__(self):
+        self.connected = True
+
+    async def is_disconnected(self):
+        return not self.connected
+
+
+class FakeSession:
+    def close(self):
+        pass
+
+
+def test_broadcast_fans_out_to_every_attached_bus():
+    async def scenario():
+        broadcast = InMemoryBroadcast()
+        worker_a, worker_b = EventBus(broadcast), EventBus(broadcast)
+        on_a = worker_a.subscribe()
+        on_b = worker_b.subscribe(provider="pragmatic")
+        other_provider = worker_b.subscribe(provider="BETSOFT")
+
+        event = worker_a.publish("template.updated", template_id="T1", provider="PRAGMATIC")
+        received = await asyncio.gather(
+            asyncio.wait_for(on_a.queue.get(), 1), asyncio.wait_for(on_b.queue.get(), 1))
+        await asyncio.sleep(0)
+        return event, received, other_provider.queue.qsize()
+
+    event, received, other = asyncio.run(scenario())
+    assert received == [event, event]
+    assert other == 0
+
+
+def test_stream_frames_events_and_unsubscribes_on_disconnect():
+    bus = EventBus(InMemoryBroadcast())
+    set_event_bus(bus)
+    request = FakeRequest()
+
+    async def scenario():
+        response = stream_events(request, month=None, provider=None,
+                                 template_id="T2", db=FakeSession())
+        body = response.body_iterator
+        hello = await body.__anext__()
+        assert bus.subscriber_count == 1
+
+        bus.publish("template.updated", template_id="OTHER")
+        event = bus.publish("translation.saved", template_id="T2", language="de")
+        frame = await asyncio.wait_for(body.__anext__(), 1)
+
+        request.connected = False
+        bus.publish("template.deleted", template_id="T2")
+        rest = [chunk async for chunk in body]
+        return response, hello, event, frame, rest
+
+    try:
+        response, hello, event, frame, rest = asyncio.run(scenario())
+    finally:
+        set_event_bus(None)
+
+    assert response.media_type == "text/event-stream"
+    assert hello.startswith("retry: 5000\n")
+    assert frame == format_sse(event)
+    lines = frame.split("\n")
+    assert lines[0] == f"id: {event['id']}"
+    assert lines[1] == "event: translation.saved"
+    assert json.loads(lines[2][len("data: "):]) == event
+    assert frame.endswith("\n\n")
+    assert rest == []
+    assert bus.subscriber_count == 0
+
+
+def test_template_writes_publish_events(client, admin_headers):
+    bus = EventBus(InMemoryBroadcast())
+    set_event_bus(bus)
+    seen = []
+    bus.broadcast.attach(seen.append)
+    try:
+        response = client.post("/api/bonus-templates", headers=admin_headers,
+                               json=template_payload("EVENTS TEST 1"))
+        assert response.status_code in (200, 201), response.text
+        response = client.post("/api/bonus-templates/EVENTS TEST 1/translations",
+                               headers=admin_headers,
+                               json={"language": "de", "name": "Reload", "description": ""})
+        assert response.status_code in (200, 201), response.text
+    finally:
+        set_event_bus(None)
+
+    assert [(e["type"], e["template_id"]) for e in seen] == [
+        ("template.created", "EVENTS TEST 1"), ("translation.saved", "EVENTS TEST 1")]
+    assert seen[0]["provider"] == "PRAGMATIC"
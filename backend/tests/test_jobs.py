@@ -0,0 +1,29 @@
+import pytest
+
+from services.jobs import create_job
+
+
+@pytest.fixture
+def pending_jobs(db):
+    return {kind: create_job(db, kind, {}, created_by="test.admin").id
+            for kind in ("repricing", "bonus_sweep")}
+
+
+def _cancel(client, headers, job_id):
+    return client.post(f"/api/jobs/{job_id}/cancel", headers=headers)
+
+
+def test_cancel_needs_the_permission_of_the_job_kind(client, pending_jobs, admin_headers,
+                                                     translation_headers, optimization_headers):
+    for job_id in pending_jobs.values():
+        assert _cancel(client, translation_headers, job_id).status_code == 403
+
+    response = _cancel(client, optimization_headers, pending_jobs["repricing"])
+    assert response.status_code == 403
+    assert "manage_pricing_tables" in response.json()["detail"]
+    response = _cancel(client, optimization_headers, pending_jobs["bonus_sweep"])
+    assert response.status_code == 200 and response.json()["cancel_requested"]
+
+    assert _cancel(client, admin_headers, pending_jobs["repricing"]).status_code == 200
+    job = client.get(f"/api/jobs/{pending_jobs['repricing']}", headers=admin_headers).json()
+    assert job["cancel_requested"]
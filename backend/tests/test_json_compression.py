@@ -0,0 +1,31 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from database import compressed_json, database
+from database.compressed_json import CompressedJSON
+from services import json_compression
+
+
+def test_unconverted_columns_empty_on_sqlite(app):
+    assert json_compression.unconverted_columns(database.engine) == []
+
+
+def test_init_db_refuses_compression_on_json_columns(app, monkeypatch):
+    monkeypatch.setattr(compressed_json, "ENABLED", True)
+    monkeypatch.setattr(json_compression, "unconverted_columns",
+                        lambda bind: ["bonus_templates.cost"])
+    loaded = []
+    monkeypatch.setattr(compressed_json.registry, "load", loaded.append)
+
+    with pytest.raises(RuntimeError, match="migrate_compress_json.py"):
+        database.init_db()
+    assert not loaded
+
+    # The migration itself converts the columns, so it skips the check
+    database.init_db(check_compression=False)
+    assert loaded == [database.engine]
+
+
+def test_new_postgres_columns_are_binary(monkeypatch):
+    monkeypatch.setattr(compressed_json, "ENABLED", True)
+    assert CompressedJSON().compile(dialect=postgresql.dialect()) == "BYTEA"
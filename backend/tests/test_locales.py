@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+from services.locale_service import LocaleResolver, collect_texts, default_text
+from tests.conftest import template_payload
+
+
+def test_chains():
+    resolver = LocaleResolver(["pt-br", "gbp_de", "en"])
+    assert resolver.chain("GBP_en") == ("GBP_en", "en", "*")
+    assert resolver.chain("de") == ("de", "*")
+    assert resolver.chain("*") == ("*",)
+    assert resolver.chain("pt-br") == ("pt-br", "pt", "*")
+    assert resolver.chain("gbp_de") == ("gbp_de", "de", "*")
+    # Not compiled: built on the fly the same way
+    assert resolver.chain("xx-yy") == ("xx-yy", "xx", "*")
+    assert resolver.locales.count("en") == 1
+    assert "pt-br" in resolver.locales
+
+
+def test_default_text_order():
+    assert default_text({"*": "Star", "en": "English"}) == "Star"
+    assert default_text({"de": "Deutsch", "en": "English"}) == "English"
+    assert default_text({"fr": "Français", "de": "Deutsch"}) == "Deutsch"  # LANGUAGES order
+    assert default_text({"zz": "Other", "aa": ""}) == "Other"
+    assert default_text({}) is None
+
+
+def test_resolve_walks_the_chain():
+    resolver = LocaleResolver()
+    texts = {"en": "Reload", "GBP_en": "Reload £", "de": "Aufladung"}
+    assert resolver.resolve(texts, "GBP_en") == ("Reload £", "GBP_en")
+    assert resolver.resolve(texts, "USD_en") == ("Reload", "en")
+    assert resolver.resolve(texts, "fr") == ("Reload", "*")
+    assert resolver.resolve({}, "fr") == (None, None)
+    # Empty texts do not stop the fallback
+    assert resolver.resolve({**texts, "fr": ""}, "fr") == ("Reload", "*")
+
+    resolved = resolver.resolve_all({"de": "Aufladung", "xx": "Extra"})
+    assert resolved["de"] == "Aufladung"
+    assert resolved["en"] == resolved["GBP_en"] == resolved["*"] == "Aufladung"
+    assert resolved["xx"] == "Extra"
+
+
+def test_collect_texts_uses_currency_variants():
+    rows = [SimpleNamespace(language="en", currency="GBP_en", name="Reload £", description=None),
+            SimpleNamespace(language="en", currency=None, name="Reload", description="Deposit"),
+            SimpleNamespace(language="de", currency="EUR", name="", description="Einzahlung")]
+    names, descriptions = collect_texts(rows)
+    assert names == {"GBP_en": "Reload £", "en": "Reload"}
+    assert descriptions == {"en": "Deposit", "de": "Einzahlung"}
+
+
+def test_resolved_endpoint(client, admin_headers):
+    response = client.post("/api/bonus-templates", headers=admin_headers,
+                           json=template_payload("LOCALE TEST"))
+    assert response.status_code == 201, response.text
+    for body in ({"language": "en", "name": "Reload", "description": "Deposit now"},
+                 {"language": "GBP_en", "name": "Reload £"},
+                 {"language": "pt", "name": "Recarga"}):
+        assert client.post("/api/bonus-templates/LOCALE TEST/translations", headers=admin_headers,
+                           json=body).status_code == 201
+    response = client.post("/api/custom-languages", headers=admin_headers,
+                           json={"code": "pt-BR", "name": "Português (Brasil)"})
+    assert response.status_code == 200, response.text
+    try:
+        response = client.get("/api/bonus-templates/LOCALE TEST/resolved", headers=admin_headers,
+                              params={"locale": "GBP_en"})
+        assert response.json() == {
+            "template_id": "LOCALE TEST", "locale": "GBP_en", "chain": ["GBP_en", "en", "*"],
+            "name": "Reload £", "name_source": "GBP_en",
+            "description": "Deposit now", "description_source": "en",
+        }
+        resolved = client.get("/api/bonus-templates/LOCALE TEST/resolved", headers=admin_headers).json()
+        assert resolved["name"]["pt-br"] == "Recarga"
+        assert resolved["name"]["BRL_pt"] == "Recarga"
+        assert resolved["name"]["de"] == "Reload"
+        assert resolved["description"]["pt-br"] == "Deposit now"
+    finally:
+        client.delete("/api/custom-languages/pt-br", headers=admin_headers)
@@ -0,0 +1,100 @@
+import json
+import os
+
+import pytest
+
+from database.models import StableConfig
+from services.proportions_resolver import ProportionsTrie, normalize_proportions
+from tests.conftest import BACKEND_DIR, template_payload
+
+CONFIG_JSON = os.path.join(os.path.dirname(BACKEND_DIR), "config.json")
+
+
+@pytest.fixture(scope="module")
+def live_proportions():
+    """The proportions table of the sample config.json, with its untidy keys"""
+    if not os.path.exists(CONFIG_JSON):
+        pytest.skip("config.json not available")
+    with open(CONFIG_JSON, encoding="utf-8") as f:
+        return json.load(f)["config"]["extra"]["proportions"]
+
+
+def test_normalize_merges_space_and_case_duplicates():
+    cleaned, warnings = normalize_proportions({
+        "Foxium.Foxpot ": 0, "Foxium.Foxpot": 0, "FOXIUM.foxpot": 50,
+        " ROULETTE": 20, "SPINOMENAL.*": 10, "BROKEN.": 5,
+    })
+    assert cleaned == {"Foxium.Foxpot": 0, "ROULETTE": 20, "SPINOMENAL.*": 10, "BROKEN.": 5}
+    assert len(warnings) == 2
+    assert "'FOXIUM.foxpot' (50) duplicates 'Foxium.Foxpot' (0)" in warnings[0]
+    assert "expected PROVIDER.Game" in warnings[1]
+    for bad in ({"X.Game": "50"}, {"X.Game": 101}, {" ": 5}, ["X.Game"]):
+        with pytest.raises(ValueError):
+            normalize_proportions(bad)
+
+
+def test_templates_from_stable_config_tables_save(client, db, admin_headers, live_proportions):
+    # The table as the admin panel stores it, plus a case variant of a live key
+    messy = {**live_proportions, "foxium.foxpot": 25}
+    db.add(StableConfig(provider="PROPORTIONSTEST", cost=[], maximum_amount=[], minimum_amount=[],
+                        minimum_stake_to_wager=[], maximum_stake_to_wager=[], maximum_withdraw=[],
+                        casino_proportions=json.dumps(messy), live_casino_proportions=""))
+    db.commit()
+    config = db.query(StableConfig).filter(StableConfig.provider == "PROPORTIONSTEST").one()
+    proportions = json.loads(config.casino_proportions)  # What the reload form does
+
+    response = client.post("/api/bonus-templates", headers=admin_headers, json=template_payload(
+        "PROPORTIONS LIVE", proportions=proportions))
+    assert response.status_code == 201, response.text
+    created = response.json()
+    assert "Games Global.Blazing Piranhas™ " not in created["proportions"]
+    assert created["proportions"]["Games Global.Blazing Piranhas™"] == 0
+    assert created["proportions"]["Foxium.Foxpot"] == 0
+    assert len(created["proportions"]) == len(proportions) - 2
+    assert created["warnings"] == ["'foxium.foxpot' (25) duplicates 'Foxium.Foxpot' (0); kept 0"]
+
+    response = client.put("/api/bonus-templates/PROPORTIONS LIVE", headers=admin_headers,
+                          json=template_payload("PROPORTIONS LIVE", proportions=proportions))
+    assert response.status_code == 200, response.text
+    response = client.patch("/api/bonus-templates/PROPORTIONS LIVE", headers=admin_headers,
+                            json={"proportions": {**proportions, "ROULETTE": 15}})
+    assert response.status_code == 200, response.text
+    assert response.json()["proportions"]["ROULETTE"] == 15
+
+    response = client.patch("/api/bonus-templates/PROPORTIONS LIVE", headers=admin_headers,
+                            json={"proportions": {"ROULETTE": 150}})
+    assert response.status_code == 400
+
+
+def test_trie_resolution_order(live_proportions):
+    trie = ProportionsTrie({**live_proportions, "SPINOMENAL.*": 40, "EZUGI": 30, "*": 1})
+    resolve = trie.resolve
+    assert resolve("SPINOMENAL.1 Reel Egypt")["rule"] == "game"
+    assert resolve("SPINOMENAL.1 Reel Egypt")["contribution"] == 0
+    assert resolve("spinomenal.1 reel egypt")["matched_key"] == "SPINOMENAL.1 Reel Egypt"
+    # Keys stored with a trailing space still match the game id
+    assert resolve("Foxium.Foxpot")["matched_key"] == "Foxium.Foxpot "
+    assert resolve("SPINOMENAL.Unknown Game") == {
+        "game": "SPINOMENAL.Unknown Game", "contribution": 40, "matched_key": "SPINOMENAL.*",
+        "rule": "provider"}
+    assert resolve("EZUGI.Not Listed")["contribution"] == 30
+    assert resolve("NEWPROVIDER.Roulette Live", category="roulette")["rule"] == "category"
+    assert resolve("NEWPROVIDER.Roulette Live", category="roulette")["contribution"] == 20
+    assert resolve("NEWPROVIDER.Something")["rule"] == "default"
+    assert ProportionsTrie({"ROULETTE": 20}).resolve("X.Y")["rule"] is None
+
+
+def test_resolve_endpoint(client, admin_headers):
+    response = client.post("/api/bonus-templates", headers=admin_headers, json=template_payload(
+        "PROPORTIONS RESOLVE", proportions={"PRAGMATIC.Sweet Bonanza": 100, "PRAGMATIC": 50,
+                                            "BLACKJACK": 10}))
+    assert response.status_code == 201, response.text
+    response = client.post("/api/proportions/resolve", headers=admin_headers, json={
+        "template_id": "PROPORTIONS RESOLVE",
+        "games": [{"game": "PRAGMATIC.Sweet Bonanza"}, {"game": "PRAGMATIC.Gates of Olympus"},
+                  {"game": "EVOLUTION.Blackjack A", "category": "BLACKJACK"},
+                  {"game": "EVOLUTION.Crazy Time"}]})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert [r["contribution"] for r in body["results"]] == [100, 50, 10, None]
+    assert body["matched"] == 3
@@ -0,0 +1,77 @@
+import pytest
+
+from database.models import CurrencyReference, StableConfig
+from services.currency_registry import get_currency_snapshot, reload_currency_snapshot
+from services.repricing import reprice_chunk
+from tests.conftest import template_payload
+
+COST_TABLE = {"EUR": 0.2, "USD": 0.2, "GBP": 0.2}
+
+
+def _add_cost_table(db, provider, values):
+    db.add(StableConfig(
+        provider=provider,
+        cost=[{"id": "1", "name": "Table 1", "values": values}],
+        maximum_amount=[], minimum_amount=[], minimum_stake_to_wager=[],
+        maximum_stake_to_wager=[], maximum_withdraw=[],
+        casino_proportions="", live_casino_proportions="",
+    ))
+    db.commit()
+
+
+def _create(client, headers, template_id, **fields):
+    response = client.post("/api/bonus-templates", headers=headers, json={
+        **template_payload(template_id, provider="REPRICETEST"), **fields})
+    assert response.status_code in (200, 201), response.text
+
+
+def _dry_run(client, headers):
+    response = client.post("/api/repricing/jobs", headers=headers, json={
+        "provider": "REPRICETEST", "since": "2025-01-01T00:00:00", "fields": ["cost"]})
+    assert response.status_code == 202, response.text
+    job = client.get(f"/api/jobs/{response.json()['id']}", headers=headers).json()
+    assert job["status"] == "completed", job
+    return {(d["template_id"], d["currency"]): (d["old"], d["new"]) for d in job["result"]["diff"]}
+
+
+@pytest.fixture
+def gbp_rate(db):
+    gbp = db.query(CurrencyReference).filter(CurrencyReference.currency == "GBP").one()
+    saved = gbp.eur_rate, gbp.rounding_step
+    gbp.eur_rate, gbp.rounding_step = 0.87, 0.01
+    db.commit()
+    reload_currency_snapshot(db)
+    yield
+    gbp.eur_rate, gbp.rounding_step = saved
+    db.commit()
+    reload_currency_snapshot(db)
+
+
+def test_table_sourced_fields_keep_curated_values(client, db, admin_headers, gbp_rate):
+    _add_cost_table(db, "REPRICETEST", dict(COST_TABLE))
+    source = {"cost": {"provider": "REPRICETEST", "table": "cost", "table_id": "1"}}
+    _create(client, admin_headers, "REPRICE SOURCED", cost={"*": 0.2, **COST_TABLE},
+            pricing_sources=source)
+    _create(client, admin_headers, "REPRICE CONVERTED", cost={"*": 0.2, **COST_TABLE})
+
+    diff = _dry_run(client, admin_headers)
+    # Without lineage the GBP value is converted from EUR; with it, the table wins
+    assert diff[("REPRICE CONVERTED", "GBP")] == (0.2, 0.17)
+    assert not [key for key in diff if key[0] == "REPRICE SOURCED"]
+
+    # A table edited behind the templates' back is picked up by the job
+    config = db.query(StableConfig).filter(StableConfig.provider == "REPRICETEST").one()
+    config.cost = [{"id": "1", "name": "Table 1", "values": {**COST_TABLE, "GBP": 0.25}}]
+    db.commit()
+    diff = _dry_run(client, admin_headers)
+    assert diff[("REPRICE SOURCED", "GBP")] == (0.2, 0.25)
+    assert [key for key in diff if key[0] == "REPRICE SOURCED"] == [("REPRICE SOURCED", "GBP")]
+
+
+def test_reprice_chunk_leaves_sourced_fields_without_tables(db):
+    from database.models import BonusTemplate
+
+    template = BonusTemplate(id="CHUNK", cost={"*": 0.2, "EUR": 0.2, "GBP": 0.2},
+                             pricing_sources={"cost": {"provider": "X", "table": "cost",
+                                                       "table_id": "1"}})
+    assert reprice_chunk([template], get_currency_snapshot(db), [("cost", False, 0.01)]) == []
@@ -0,0 +1,53 @@
+from tests.conftest import template_payload
+
+URL = "/api/analytics/rollups"
+BONUS_TYPE = "rollup_test"
+
+
+def _rows(client, headers, group_by="provider"):
+    response = client.get(URL, headers=headers, params={"bonus_type": BONUS_TYPE, "group_by": group_by})
+    assert response.status_code == 200, response.text
+    return response.json()["rows"]
+
+
+def _payload(template_id, **overrides):
+    return template_payload(template_id, bonus_type=BONUS_TYPE, **overrides)
+
+
+def test_rollups_follow_writes(client, admin_headers, optimization_headers):
+    for template_id, percentage in (("ROLLUP A", 100), ("ROLLUP B", 50)):
+        response = client.post("/api/bonus-templates", headers=admin_headers,
+                               json=_payload(template_id, percentage=percentage))
+        assert response.status_code == 201, response.text
+    assert _rows(client, optimization_headers) == [
+        {"provider": "PRAGMATIC", "templates": 2, "avg_percentage": 75.0,
+         "avg_wagering": 15.0, "avg_maximum_amount": 300.0},
+    ]
+
+    # An update replaces the template's contribution instead of adding to it
+    response = client.patch("/api/bonus-templates/ROLLUP B", headers=admin_headers,
+                            json={"percentage": 150, "wagering_multiplier": 25})
+    assert response.status_code == 200, response.text
+    [row] = _rows(client, optimization_headers)
+    assert (row["templates"], row["avg_percentage"], row["avg_wagering"]) == (2, 125.0, 20.0)
+
+    # Changing a dimension moves it to another bucket
+    response = client.put("/api/bonus-templates/ROLLUP B", headers=admin_headers,
+                          json=_payload("ROLLUP B", provider="NETENT", percentage=150))
+    assert response.status_code == 200, response.text
+    assert [(r["provider"], r["templates"], r["avg_percentage"])
+            for r in _rows(client, optimization_headers)] == [("NETENT", 1, 150.0), ("PRAGMATIC", 1, 100.0)]
+
+    # Deleting subtracts it and drops the emptied bucket
+    response = client.delete("/api/bonus-templates/ROLLUP B", headers=admin_headers)
+    assert response.status_code == 204
+    assert [(r["provider"], r["templates"]) for r in _rows(client, optimization_headers)] == [("PRAGMATIC", 1)]
+    [row] = _rows(client, optimization_headers, group_by="bonus_type")
+    assert row == {"bonus_type": BONUS_TYPE, "templates": 1, "avg_percentage": 100.0,
+                   "avg_wagering": 15.0, "avg_maximum_amount": 300.0}
+
+
+def test_rollup_arguments(client, optimization_headers, translation_headers):
+    assert client.get(URL, headers=optimization_headers, params={"group_by": "brand"}).status_code == 400
+    assert client.get(URL, headers=optimization_headers, params={"from_month": "2025-1"}).status_code == 400
+    assert client.get(URL, headers=translation_headers).status_code == 403
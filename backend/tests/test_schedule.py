@@ -0,0 +1,110 @@
+import calendar
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+
+from services.schedule_service import CronExpression, compile_day_schedule, expand_calendar
+
+
+def matching_days(expression, year, month):
+    cron = CronExpression(expression)
+    days = range(1, calendar.monthrange(year, month)[1] + 1)
+    return [day for day in days if cron.matches_date(date(year, month, day))]
+
+
+def template(schedule_type="period", value=None, cron=None, tz=None, window=(None, None)):
+    return SimpleNamespace(id="T", schedule_type=schedule_type, schedule_value=value,
+                           schedule_timezone=tz, trigger_schedule=cron, config_extra=None,
+                           schedule_from_at=window[0], schedule_to_at=window[1])
+
+
+@pytest.mark.parametrize("expression, year, month, days", [
+    ("0 0 9 L * ?", 2026, 2, [28]),                  # Last day of the month
+    ("0 0 9 L-3 * ?", 2026, 1, [28]),                # Three days before the last
+    ("0 0 9 LW * ?", 2026, 5, [29]),                 # May 31 is a Sunday
+    ("0 0 9 LW * ?", 2026, 1, [30]),                 # Jan 31 is a Saturday
+    ("0 0 9 1W * ?", 2026, 8, [3]),                  # Aug 1 is a Saturday: Monday, not July 31
+    ("0 0 9 15W * ?", 2026, 8, [14]),                # Saturday 15th: Friday
+    ("0 0 9 31W * ?", 2026, 5, [29]),                # Sunday 31st: Friday, not June 1
+    ("0 0 9 ? * 6L", 2026, 1, [30]),                 # Last Friday
+    ("0 0 9 ? * 2#1", 2026, 1, [5]),                 # First Monday
+    ("0 0 9 ? * FRI#3", 2026, 1, [16]),              # Third Friday
+    ("0 0 9 ? * FRI-MON", 2026, 2, [1, 2, 6, 7, 8, 9, 13, 14, 15, 16, 20, 21, 22, 23, 27, 28]),
+    ("0 0 9 1/10 * ?", 2026, 1, [1, 11, 21, 31]),    # Step
+    ("0 0 9 1,15 JAN,MAR ?", 2026, 3, [1, 15]),      # Lists and month names
+    ("0 0 9 1,15 JAN,MAR ?", 2026, 2, []),
+    ("0 0 9 * * ? 2027", 2026, 1, []),               # Year field
+])
+def test_quartz_day_rules(expression, year, month, days):
+    assert matching_days(expression, year, month) == days
+
+
+def test_times_and_unix_cron():
+    assert [t.strftime("%H:%M") for t in CronExpression("0 0/20 9-10 * * ?").times] == [
+        "09:00", "09:20", "09:40", "10:00", "10:20", "10:40"]
+    sundays = [4, 11, 18, 25]
+    # 0 and 7 are both Sunday in 5-field unix cron
+    assert matching_days("0 9 * * 0", 2026, 1) == sundays
+    assert matching_days("0 9 * * 7", 2026, 1) == sundays
+    assert matching_days("0 9 * * SUN", 2026, 1) == sundays
+    # Both day fields restricted: either may match
+    assert matching_days("0 9 13 * 5", 2026, 2) == [6, 13, 20, 27]
+
+
+@pytest.mark.parametrize("expression", [
+    "0 0 9 *", "0 0 25 * * ?", "0 0 9 ? * 8", "0 0/0 9 * * ?",
+    "0 0 9 0W * ?", "0 0 9 32W * ?", "0 0 9 L-x * ?", "0 0 9 LX * ?", "0 0 9 ? * 2#6", "0 0 9 ? * 9L",
+])
+def test_invalid_cron(expression):
+    with pytest.raises(ValueError):
+        CronExpression(expression)
+
+
+def test_day_schedules():
+    fridays = compile_day_schedule("day", ("friday", "Sunday"))
+    assert [fridays.matches_date(date(2026, 1, d)) for d in (2, 3, 4)] == [True, False, True]
+    month_days = compile_day_schedule("date", ("01", "L"))
+    assert [d for d in range(1, 29) if month_days.matches_date(date(2026, 2, d))] == [1, 28]
+    assert compile_day_schedule("period", ()) is None
+    with pytest.raises(ValueError):
+        compile_day_schedule("day", ("someday",))
+    with pytest.raises(ValueError):
+        compile_day_schedule("date", ("32",))
+
+
+def test_expansion_across_a_dst_change():
+    # Europe/Berlin moves from UTC+1 to UTC+2 on 29 March 2026
+    start, end = datetime(2026, 3, 27), datetime(2026, 3, 31)
+    [cron] = expand_calendar([template(cron="0 0 9 * * ?", tz="Europe/Berlin")], start, end)
+    assert [s for s, _ in cron["occurrences"]] == [
+        datetime(2026, 3, 27, 8), datetime(2026, 3, 28, 8),
+        datetime(2026, 3, 29, 7), datetime(2026, 3, 30, 7)]
+
+    [sunday] = expand_calendar([template("day", ["sunday"], tz="Europe/Berlin")], start, end)
+    # The local day is 23 hours long
+    assert sunday["occurrences"] == [(datetime(2026, 3, 28, 23), datetime(2026, 3, 29, 22))]
+
+
+def test_expansion_is_clipped_to_the_window():
+    window = (datetime(2026, 1, 10), datetime(2026, 1, 20))
+    [entry] = expand_calendar([template(cron="0 0 12 * * ?", window=window)],
+                              datetime(2026, 1, 1), datetime(2026, 1, 31), max_occurrences=5)
+    assert entry["occurrences"][0][0] == datetime(2026, 1, 10, 12)
+    assert len(entry["occurrences"]) == 5 and entry["truncated"]
+    [period] = expand_calendar([template(window=window)], datetime(2026, 1, 1), datetime(2026, 1, 31))
+    assert period["occurrences"] == [window]
+    [broken] = expand_calendar([template(cron="not a cron")], datetime(2026, 1, 1), datetime(2026, 1, 2))
+    assert "error" in broken
+
+
+def test_calendar_range_limit(client, admin_headers):
+    def calendar(to):
+        return client.get("/api/schedule/calendar", headers=admin_headers,
+                          params={"from": "2026-01-01", "to": to})
+
+    assert calendar("2027-02-05").status_code == 200  # 400 days
+    response = calendar("2027-02-06")
+    assert response.status_code == 400
+    assert "400 days" in response.json()["detail"]
+    assert calendar("2025-12-31").status_code == 400
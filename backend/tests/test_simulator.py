@@ -0,0 +1,63 @@
+import tracemalloc
+
+import numpy as np
+
+from services import bonus_simulator
+from services.bonus_simulator import (
+    BLOCK_SIZE, ROUNDS_PER_PLAYER, draw_player_samples, player_blocks, simulate_currency,
+    simulate_template, template_terms,
+)
+from tests.conftest import template_payload
+
+RELOAD = template_payload("SIM", percentage=200, wagering_multiplier=1,
+                          maximum_amount={"*": 1000}, maximum_withdraw={"*": 10})
+
+
+def test_players_keep_their_draws_whatever_the_run_size():
+    small = draw_player_samples(3, 10)
+    large = draw_player_samples(3, BLOCK_SIZE + 10)
+    for key in small:
+        np.testing.assert_array_equal(small[key], large[key][:10])
+    assert large["rounds"].shape == (BLOCK_SIZE + 10, ROUNDS_PER_PLAYER)
+    assert [len(block["deposit"]) for block in player_blocks(3, BLOCK_SIZE + 10)] == [BLOCK_SIZE, 10]
+
+
+def test_draws_are_generated_per_block(monkeypatch):
+    monkeypatch.setattr(bonus_simulator, "BLOCK_SIZE", 1000)
+    samples = 50_000  # The full rounds matrix would be 40 MB
+    terms = template_terms(RELOAD, "EUR")
+    behaviour = bonus_simulator.resolve_behaviour(None, terms)
+
+    tracemalloc.start()
+    try:
+        simulate_currency(terms, behaviour, seed=1, samples=samples, rate=1.0)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < samples * ROUNDS_PER_PLAYER * 8 / 4
+
+
+def test_cost_is_bonus_money_paid_out():
+    # A tiny bonus with an easy target: most players withdraw less than they deposited
+    stingy = template_payload("SIM 2", percentage=5, wagering_multiplier=1,
+                              maximum_amount={"*": 5}, maximum_withdraw={"*": 0})
+    for template in (RELOAD, stingy):
+        result = simulate_template(template, ["EUR", "GBP"], samples=2000, seed=4)
+        for summary in result["currencies"].values():
+            assert summary["expected_cost"] >= 0
+            assert summary["cost_ratio"] >= 0
+
+
+def test_simulate_endpoint_uses_template_proportions(client, admin_headers):
+    response = client.post("/api/bonus-templates", headers=admin_headers, json=template_payload(
+        "SIM ENDPOINT", proportions={"PRAGMATIC.Sweet Bonanza": 10}))
+    assert response.status_code in (200, 201), response.text
+
+    def simulate(**body):
+        response = client.post("/api/optimization/simulate", headers=admin_headers, json={
+            "template_id": "SIM ENDPOINT", "samples": 2000, **body})
+        assert response.status_code == 200, response.text
+        return response.json()["currencies"]["EUR"]
+
+    # 10% contribution: 10x the turnover of full contribution
+    assert simulate()["completion_rate"] < simulate(behaviour={"contribution": 1})["completion_rate"]
@@ -0,0 +1,60 @@
+import subprocess
+import sys
+import textwrap
+
+from services import bonus_sweep
+from tests.conftest import BACKEND_DIR, template_payload
+
+
+def _run_sweep(client, headers, template_id, **params):
+    response = client.post("/api/optimization/sweeps", headers=headers, json={
+        "template_id": template_id, "percentages": [50, 100], "wagering": [5, 35],
+        "maximum_amounts": [100, 500], "samples": 500, **params})
+    assert response.status_code == 202, response.text
+    job = client.get(f"/api/jobs/{response.json()['id']}", headers=headers).json()
+    assert job["status"] == "completed", job
+    return job["result"]
+
+
+def test_sweeps_share_one_bounded_pool(client, admin_headers):
+    response = client.post("/api/bonus-templates", headers=admin_headers,
+                           json=template_payload("SWEEP TEST"))
+    assert response.status_code in (200, 201), response.text
+
+    first = _run_sweep(client, admin_headers, "SWEEP TEST", workers=64)
+    pool = bonus_sweep.get_sweep_pool()
+    second = _run_sweep(client, admin_headers, "SWEEP TEST")
+
+    assert first["workers"] <= bonus_sweep.SWEEP_WORKERS
+    assert bonus_sweep.get_sweep_pool() is pool
+    assert first["frontier"] == second["frontier"]
+    assert all(point["cost"] >= 0 for point in first["frontier"])
+
+
+def test_workers_do_not_unlink_or_leak_shared_draws():
+    # A fresh interpreter, so resource tracker warnings surface on its stderr
+    script = textwrap.dedent("""
+        import numpy as np
+        from services import bonus_sweep
+        from services.bonus_simulator import draw_player_samples
+
+        blocks, specs = bonus_sweep._share(draw_player_samples(0, 100))
+        terms = {"percentage": 100.0, "wagering_multiplier": 5.0, "minimum_amount": 10.0,
+                 "maximum_amount": 100.0, "minimum_stake": 0.5, "maximum_stake": 5.0,
+                 "maximum_withdraw": 0.0, "cost": 0.0, "multiplier": 0.0, "maximum_bets": 0.0,
+                 "include_amount": 1.0, "cap_calculation": 0.0, "contribution": 1.0}
+        behaviour = {"rtp": 0.96, "volatility": 3.0, "deposit_median": 50.0,
+                     "deposit_sigma": 0.8, "stake_fraction": 0.3, "spins": 10}
+        pool = bonus_sweep.get_sweep_pool()
+        pool.submit(bonus_sweep.evaluate_combinations, terms, behaviour,
+                    [(100.0, 5.0, 100.0)], specs=specs).result()
+        pool.shutdown()
+        for block in blocks:  # Still there after the workers exited
+            block.close()
+            block.unlink()
+        print("ok")
+    """)
+    result = subprocess.run([sys.executable, "-c", script], cwd=BACKEND_DIR,
+                            capture_output=True, text=True, timeout=120)
+    assert result.stdout.strip() == "ok", result.stderr
+    assert "resource_tracker" not in result.stderr, result.stderr
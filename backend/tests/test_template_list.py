@@ -0,0 +1,49 @@
+from tests.conftest import template_payload
+
+URL = "/api/bonus-templates"
+
+TEMPLATES = {
+    "LIST VIP": {"segments": ["list_vip", "list_new"], "restricted_countries": ["qa"]},
+    "LIST NEW": {"segments": ["list_new"], "restricted_countries": []},
+    "LIST ALL": {"segments": [], "restricted_countries": ["QA", "QB"]},
+}
+
+
+def _create(client, headers):
+    for template_id, overrides in TEMPLATES.items():
+        if client.get(f"{URL}/{template_id}", headers=headers).status_code == 200:
+            continue
+        response = client.post(URL, headers=headers, json=template_payload(template_id, **overrides))
+        assert response.status_code == 201, response.text
+
+
+def _ids(client, headers, **params):
+    response = client.get(URL, headers=headers, params={"limit": 10000, **params})
+    assert response.status_code == 200, response.text
+    return [item["id"] for item in response.json() if item["id"].startswith("LIST ")]
+
+
+def test_segment_and_country_filters(client, admin_headers):
+    _create(client, admin_headers)
+    assert _ids(client, admin_headers, segment="list_new") == ["LIST NEW", "LIST VIP"]
+    assert _ids(client, admin_headers, segment="list_vip") == ["LIST VIP"]
+    assert _ids(client, admin_headers, segment="list_none") == []
+
+    # Restricted countries are excluded, case-insensitively
+    assert _ids(client, admin_headers, country="qa") == ["LIST NEW"]
+    assert _ids(client, admin_headers, country="QB") == ["LIST NEW", "LIST VIP"]
+    assert _ids(client, admin_headers, segment="list_new", country="QA") == ["LIST NEW"]
+    assert _ids(client, admin_headers) == ["LIST ALL", "LIST NEW", "LIST VIP"]
+
+
+def test_filters_follow_updates(client, admin_headers):
+    _create(client, admin_headers)
+    payload = template_payload("LIST NEW", segments=["list_moved"], restricted_countries=["QA"])
+    assert client.put(f"{URL}/LIST NEW", headers=admin_headers, json=payload).status_code == 200
+    try:
+        assert _ids(client, admin_headers, segment="list_new") == ["LIST VIP"]
+        assert _ids(client, admin_headers, segment="list_moved") == ["LIST NEW"]
+        assert "LIST NEW" not in _ids(client, admin_headers, country="QA")
+    finally:
+        payload = template_payload("LIST NEW", **TEMPLATES["LIST NEW"])
+        assert client.put(f"{URL}/LIST NEW", headers=admin_headers, json=payload).status_code == 200
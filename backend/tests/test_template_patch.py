@@ -0,0 +1,50 @@
+from tests.conftest import template_payload
+
+
+def test_patch_rejects_derived_columns(client, admin_headers):
+    response = client.post("/api/bonus-templates", headers=admin_headers,
+                           json=template_payload("PATCH TEST"))
+    assert response.status_code in (200, 201), response.text
+    before = response.json()
+
+    for field, value in (("rollup_contribution", {"count": 99}), ("content_hash", "x"),
+                         ("proportions_set_id", 12345), ("schedule_from_at", "2020-01-01T00:00:00")):
+        response = client.patch("/api/bonus-templates/PATCH TEST", headers=admin_headers,
+                                json={"percentage": 150, field: value})
+        assert response.status_code == 400, response.text
+        assert field in response.json()["detail"]
+
+    # The edit modal's payload (with a field the template does not have)
+    response = client.patch("/api/bonus-templates/PATCH TEST", headers=admin_headers, json={
+        "schedule_from": "01-12-2025 10:00", "schedule_to": "08-12-2025 22:59", "timezone": "CET",
+        "percentage": 150, "notes": "edited"})
+    assert response.status_code == 200, response.text
+    after = response.json()
+    assert after["percentage"] == 150
+    assert after["schedule_from"] == "01-12-2025 10:00"
+    assert after["content_hash"] != before["content_hash"]
+
+
+def test_patch_keeps_rollups_in_step(client, admin_headers):
+    def rollup():
+        response = client.get("/api/analytics/rollups?group_by=trigger_type&trigger_type=patch-rollup",
+                              headers=admin_headers)
+        assert response.status_code == 200, response.text
+        return response.json()["rows"]
+
+    response = client.post("/api/bonus-templates", headers=admin_headers, json=template_payload(
+        "PATCH ROLLUP", trigger_type="patch-rollup", percentage=100))
+    assert response.status_code in (200, 201), response.text
+    assert rollup()[0]["avg_percentage"] == 100
+
+    response = client.patch("/api/bonus-templates/PATCH ROLLUP", headers=admin_headers,
+                            json={"percentage": 200})
+    assert response.status_code == 200, response.text
+    assert rollup() == [{"trigger_type": "patch-rollup", "templates": 1,
+                         **{k: v for k, v in rollup()[0].items() if k.startswith("avg_")},
+                         "avg_percentage": 200}]
+
+    response = client.patch("/api/bonus-templates/PATCH ROLLUP", headers=admin_headers,
+                            json={"rollup_contribution": None})
+    assert response.status_code == 400
+    assert rollup()[0]["templates"] == 1
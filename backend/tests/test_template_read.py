@@ -0,0 +1,27 @@
+from tests.conftest import template_payload
+
+INTERNAL = ("proportions_set_id", "proportions_inline", "rollup_contribution",
+            "schedule_from_at", "schedule_to_at")
+
+
+def test_read_matches_create(client, admin_headers):
+    created = client.post("/api/bonus-templates", headers=admin_headers,
+                          json=template_payload("READ TEST"))
+    assert created.status_code in (200, 201), created.text
+    created = created.json()
+
+    read = client.get("/api/bonus-templates/READ TEST", headers=admin_headers)
+    assert read.status_code == 200, read.text
+    read = read.json()
+    assert read["proportions"] == {"ROULETTE": 20, "PRAGMATIC.Sweet Bonanza": 100}
+    assert {k: v for k, v in read.items() if k != "duplicate_of"} == \
+        {k: v for k, v in created.items() if k != "duplicate_of"}
+    assert not [field for field in INTERNAL if field in read]
+
+    bundle = client.get("/api/bonus-templates/READ TEST/bundle?include=template",
+                        headers=admin_headers).json()
+    assert bundle["template"]["proportions"] == read["proportions"]
+    assert not [field for field in INTERNAL if field in bundle["template"]]
+
+    found = client.get("/api/bonus-templates/search?query=READ TEST", headers=admin_headers).json()
+    assert [t["proportions"] for t in found] == [read["proportions"]]
@@ -0,0 +1,81 @@
+from tests.conftest import template_payload
+
+URL = "/api/translations/coverage"
+
+
+def _create(client, headers):
+    translations = {
+        "COVERAGE A": [{"language": "en", "name": "Reload"}, {"language": "de", "name": "Aufladung"}],
+        # A currency variant stored as the currency of an "en" row
+        "COVERAGE B": [{"language": "en", "currency": "GBP_en", "name": "Reload £"}],
+        "COVERAGE C": [],
+    }
+    for template_id, rows in translations.items():
+        if client.get(f"/api/bonus-templates/{template_id}", headers=headers).status_code == 200:
+            continue
+        response = client.post("/api/bonus-templates", headers=headers, json=template_payload(template_id))
+        assert response.status_code == 201, response.text
+        for row in rows:
+            response = client.post(f"/api/bonus-templates/{template_id}/translations",
+                                   headers=headers, json=row)
+            assert response.status_code == 201, response.text
+
+
+def _coverage(client, headers, **params):
+    response = client.get(URL, headers=headers, params={"limit": 10000, **params})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    items = {item["id"]: item for item in body["items"] if item["id"].startswith("COVERAGE")}
+    return body, items
+
+
+def _codes(columns, bits):
+    value = int(bits, 16)
+    return {code for i, code in enumerate(columns) if value >> i & 1}
+
+
+def test_bitsets(client, translation_headers, admin_headers):
+    _create(client, admin_headers)
+    body, items = _coverage(client, translation_headers)
+    columns = body["columns"]
+    assert columns[:3] == ["en", "de", "fi"]
+    assert "GBP_en" in columns
+
+    assert _codes(columns, items["COVERAGE A"]["bits"]) == {"en", "de"}
+    assert _codes(columns, items["COVERAGE B"]["bits"]) == {"GBP_en"}
+    assert items["COVERAGE C"]["bits"] == "0"
+    assert _codes(columns, items["COVERAGE C"]["missing_bits"]) == set(columns)
+    assert items["COVERAGE A"]["present"] == 2
+    assert items["COVERAGE A"]["complete"] == round(200 / len(columns), 1)
+    assert body["column_counts"]["de"] >= 1
+
+    body, items = _coverage(client, translation_headers, variants="false")
+    assert "GBP_en" not in body["columns"]
+    assert items["COVERAGE B"]["bits"] == "0"
+
+
+def test_filters(client, translation_headers, admin_headers):
+    _create(client, admin_headers)
+    _, items = _coverage(client, translation_headers, missing="de")
+    assert {"COVERAGE B", "COVERAGE C"} <= set(items)
+    assert "COVERAGE A" not in items
+
+    # Any of the listed codes missing
+    _, items = _coverage(client, translation_headers, missing="en,de")
+    assert "COVERAGE A" not in items
+    _, items = _coverage(client, translation_headers, missing="en,fi")
+    assert "COVERAGE A" in items
+
+    _, items = _coverage(client, translation_headers, max_complete=1)
+    assert set(items) >= {"COVERAGE C"}
+    assert "COVERAGE A" not in items
+
+    body, _ = _coverage(client, translation_headers, month="1999-01")
+    assert (body["templates"], body["items"]) == (0, [])
+
+    assert client.get(URL, headers=translation_headers, params={"missing": "xx"}).status_code == 400
+    assert client.get(URL, headers=translation_headers, params={"month": "2025-13"}).status_code == 400
+
+    response = client.get(URL, headers=translation_headers, params={"limit": 1})
+    assert len(response.json()["items"]) == 1
+    assert response.json()["has_more"] is True
@@ -0,0 +1,99 @@
+from database.database import SessionLocal
+from database.models import BonusTemplate, BonusTranslation, TranslationMemory
+from services.translation_memory import (
+    backfill_translation_memory, prune_translation_memory, remember_text, store_texts, text_hash,
+)
+from tests.conftest import template_payload
+
+
+def _entries(db, text):
+    return db.query(TranslationMemory).filter(TranslationMemory.hash == text_hash(text)).count()
+
+
+def test_saving_a_text_another_session_stored_first(db):
+    text = "Memory race: 100 free spins"
+    # Another request committed the entry; inserting it again is a no-op
+    other = SessionLocal()
+    try:
+        assert remember_text(other, text) == text_hash(text)
+        other.commit()
+    finally:
+        other.close()
+    store_texts(db, {text_hash(text): text})
+    assert remember_text(db, text) == text_hash(text)
+    db.commit()
+    assert _entries(db, text) == 1
+
+
+def test_texts_are_stored_once_per_call(db):
+    texts = {text_hash(t): t for t in ("Memory batch A", "Memory batch B")}
+    store_texts(db, texts, chunk_size=1)
+    store_texts(db, texts)
+    db.commit()
+    assert [_entries(db, t) for t in texts.values()] == [1, 1]
+    assert remember_text(db, "") is None
+
+
+def _translate(client, headers, template_id, language, name, description=None):
+    response = client.post(f"/api/bonus-templates/{template_id}/translations", headers=headers,
+                           json={"language": language, "name": name, "description": description})
+    assert response.status_code == 201, response.text
+
+
+def _report(client, headers):
+    response = client.get("/api/translations/memory/report", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_report_counts_inline_duplicates(client, admin_headers):
+    before = _report(client, admin_headers)
+    name = "Memory report: Weekend Reload"  # 29 bytes
+    for template_id in ("MEMORY REPORT 1", "MEMORY REPORT 2"):
+        response = client.post("/api/bonus-templates", headers=admin_headers,
+                               json=template_payload(template_id))
+        assert response.status_code in (200, 201), response.text
+        _translate(client, admin_headers, template_id, "en", name)
+
+    after = _report(client, admin_headers)
+    assert after["inline_bytes"] - before["inline_bytes"] == 2 * len(name)
+    assert after["unique_bytes"] - before["unique_bytes"] == len(name)
+    assert after["duplicated_bytes"] - before["duplicated_bytes"] == len(name)
+    assert after["memory_bytes"] - before["memory_bytes"] == len(name)
+    assert "bytes_saved" not in after
+
+
+def test_suggestions_come_from_templates_using_the_text(client, admin_headers):
+    source = "Memory suggest: Friday Spins"
+    for template_id, german in (("MEMORY SUGGEST 1", "Freitags-Freispiele"),
+                                ("MEMORY SUGGEST 2", "Freitags-Freispiele"),
+                                ("MEMORY SUGGEST 3", "Freispiele am Freitag")):
+        response = client.post("/api/bonus-templates", headers=admin_headers,
+                               json=template_payload(template_id))
+        assert response.status_code in (200, 201), response.text
+        _translate(client, admin_headers, template_id, "en", source)
+        _translate(client, admin_headers, template_id, "de", german)
+
+    response = client.get("/api/translations/memory/suggest", headers=admin_headers,
+                          params={"text": source, "source_language": "en"})
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result["known"] and result["hash"] == text_hash(source)
+    assert result["suggestions"] == {"de": [{"text": "Freitags-Freispiele", "count": 2},
+                                            {"text": "Freispiele am Freitag", "count": 1}]}
+
+
+def test_backfill_and_prune(db):
+    template = BonusTemplate(**{k: v for k, v in template_payload("MEMORY BACKFILL").items()
+                                if k not in ("schedule_from", "schedule_to")})
+    db.add(template)
+    db.add(BonusTranslation(template_id="MEMORY BACKFILL", language="en", name="Memory backfill"))
+    store_texts(db, {text_hash("Memory orphan"): "Memory orphan"})
+    db.commit()
+
+    assert backfill_translation_memory(db) >= 1
+    row = db.query(BonusTranslation).filter(BonusTranslation.template_id == "MEMORY BACKFILL").one()
+    assert row.name_hash == text_hash("Memory backfill")
+    assert prune_translation_memory(db) >= 1
+    assert _entries(db, "Memory orphan") == 0
+    assert _entries(db, "Memory backfill") == 1
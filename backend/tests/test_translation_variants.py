@@ -0,0 +1,43 @@
+import pytest
+
+from services import translation_variants
+from services.currency_registry import CurrencySnapshot
+from services.translation_variants import parse_amount, substitute_amounts
+
+
+@pytest.fixture(autouse=True)
+def rates(monkeypatch):
+    snapshot = CurrencySnapshot([("EUR", 1.0, None, None, 1.0), ("GBP", 0.9, None, None, 1.0),
+                                 ("BRL", 6.0, None, None, 1.0), ("CAD", 1.5, None, None, 1.0)],
+                                source="test")
+    monkeypatch.setattr(translation_variants, "get_currency_snapshot", lambda: snapshot)
+
+
+@pytest.mark.parametrize("language, text, expected", [
+    ("en", "Get €1,000.50 and 10 EUR", "Get £900.45 and £9"),
+    ("en", "Up to €1,000", "Up to £900"),
+    ("de", "Bis zu 1.000 € und 0,50 € pro Dreh", "Bis zu £900 und £0,45 pro Dreh"),
+    ("fr", "Jusqu'à 1 000 € et 0,50 €", "Jusqu'à £900 et £0,45"),
+    ("fr", "Jusqu'à 1\u202f000,50 €", "Jusqu'à £900,45"),
+    ("pt", "Bônus de 0,50 € por giro, até 1.000 €", "Bônus de £0,45 por giro, até £900"),
+])
+def test_amounts_follow_the_source_language(language, text, expected):
+    assert substitute_amounts(text, "GBP", language) == expected
+
+
+@pytest.mark.parametrize("language, text", [
+    ("en", "Bono de 0,50 € por giro"),  # Decimal comma in an English text
+    ("en", "1.000 €"),
+    ("fr", "1.000 €"),  # Not a French amount
+    ("de", "1,000 €"),
+    ("pt", "1.00 €"),
+])
+def test_ambiguous_amounts_are_left_alone(language, text):
+    assert substitute_amounts(text, "CAD", language) == text
+
+
+def test_variant_conventions():
+    assert substitute_amounts("Bônus de 0,50 € por giro", "BRL", "pt") == "Bônus de R$3,00 por giro"
+    assert substitute_amounts("Jusqu'à 1 000 €", "CAD", "fr") == "Jusqu'à C$1 500"
+    assert parse_amount("1.234,5", "de") == (1234.5, True, ".")
+    assert parse_amount("1,234.5", "de") is None
@@ -85,26 +85,22 @@ export default function ViewEditBonusModal({ bonusId, mode, onClose, onSave }: P
         try {
             const encodedId = encodeURIComponent(bonusId);
             console.log('Fetching bonus:', bonusId, 'Encoded:', encodedId);
-            const response = await axios.get(`${API_ENDPOINTS.BASE_URL}/api/bonus-templates/${encodedId}`);
-            console.log('Bonus response:', response.data);
-            const data = response.data;
+            // Template + translations in one round trip
+            const response = await axios.get(`${API_ENDPOINTS.BASE_URL}/api/bonus-templates/${encodedId}/bundle`, {
+                params: { include: 'template,translations' }
+            });
+            console.log('Bonus bundle response:', response.data);
+            const data = response.data.template;
             setBonus(data);
 
-            // Fetch translations separately
-            try {
-                const transResponse = await axios.get(`${API_ENDPOINTS.BASE_URL}/api/bonus-templates/${encodedId}/translations`);
-                console.log('Translations response:', transResponse.data);
-                setTranslations(transResponse.data || []);
+            const bundleTranslations = response.data.translations || [];
+            setTranslations(bundleTranslations);
 
-                // Use first translation (usually English) for editable fields
-                if (transResponse.data && transResponse.data.length > 0) {
-                    const firstTrans = transResponse.data[0];
-                    setTriggerName(firstTrans.name || '');
-                    setTriggerDescription(firstTrans.description || '');
-                }
-            } catch (transError) {
-                console.log('No translations found or error fetching translations:', transError);
-                setTranslations([]);
+            // Use first translation (usually English) for editable fields
+            if (bundleTranslations.length > 0) {
+                const firstTrans = bundleTranslations[0];
+                setTriggerName(firstTrans.name || '');
+                setTriggerDescription(firstTrans.description || '');
             }
 
             // Pre-fill other editable fields